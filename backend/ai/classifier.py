@@ -1,23 +1,44 @@
 """
 OpenAI-based message classification
 """
+import asyncio
 import json
 import logging
-from typing import Optional
-from openai import AsyncOpenAI
+import time
+from typing import List, Optional
 
 from backend.models import Classification
-from backend.ai.prompts import CLASSIFICATION_SYSTEM_PROMPT
+from backend.ai.prompts import (
+    CLASSIFICATION_SYSTEM_PROMPT,
+    FUSED_CLASSIFICATION_SYSTEM_PROMPT,
+    BATCH_CLASSIFICATION_SYSTEM_PROMPT
+)
+from backend.ai.title_generator import clean_title
+from backend.ai.usage import new_usage, record_usage
 from backend.config import settings
+from backend.ai.openai_client import openai_client
+from backend.ai.hedging import call_llm
+from backend.deadline import DeadlineExceeded
+from backend.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Per-message cap inside a batch prompt (keeps one long message from crowding out the rest)
+MAX_BATCH_MESSAGE_CHARS = 4000
+
 
 class MessageClassifier:
-    """Classifies Slack messages as relevant/irrelevant and assigns categories"""
+    """
+    Classifies Slack messages as relevant/irrelevant and assigns categories
+    
+    In "fused" mode (CLASSIFICATION_MODE) the same call also writes a candidate
+    ticket title, which the pipeline uses if the message opens a new ticket.
+    """
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, mode: Optional[str] = None):
+        self.client = openai_client
+        self.fused = (mode or settings.CLASSIFICATION_MODE) == "fused"
+        self.usage = new_usage()
     
     async def classify(self, message_text: str) -> Classification:
         """
@@ -25,9 +46,10 @@ class MessageClassifier:
         
         Args:
             message_text: The Slack message text to classify
-            
+        
         Returns:
             Classification object with is_relevant, category, confidence, reasoning
+            (and a candidate title in fused mode)
         """
         try:
             # Truncate very long messages to avoid token limits
@@ -37,18 +59,22 @@ class MessageClassifier:
                 logger.warning(f"Truncating long message from {len(message_text)} to {len(truncated)} chars")
                 message_text = truncated
             
-            response = await self.client.chat.completions.create(
+            system_prompt = FUSED_CLASSIFICATION_SYSTEM_PROMPT if self.fused else CLASSIFICATION_SYSTEM_PROMPT
+            started = time.perf_counter()
+            response = await call_llm("classification", lambda: self.client.chat.completions.create(
                 model="gpt-4o-mini",  # Using gpt-4o-mini which supports JSON mode and is cheaper
                 messages=[
-                    {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT + "\n\nYou MUST respond with valid JSON only."},
+                    {"role": "system", "content": system_prompt + "\n\nYou MUST respond with valid JSON only."},
                     {"role": "user", "content": message_text}
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.3  # Lower temp for consistent classification
-            )
+            ))
+            record_usage(self.usage, response, started)
+            metrics.llm_call("classification")
             
             result = json.loads(response.choices[0].message.content)
-            classification = Classification(**result)
+            classification = self._parse(result, with_title=self.fused)
             
             logger.info(
                 f"Classification: relevant={classification.is_relevant}, "
@@ -57,6 +83,9 @@ class MessageClassifier:
             
             return classification
         
+        except DeadlineExceeded:
+            # Out of time is not "irrelevant": fail the message so it can be retried
+            raise
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse classification JSON: {e}")
             return Classification(
@@ -74,4 +103,64 @@ class MessageClassifier:
                 confidence=0.0,
                 reasoning=f"Classification failed: {str(e)}"
             )
-
+    
+    async def classify_batch(self, message_texts: List[str]) -> List[Classification]:
+        """
+        Classify many messages with one chat call (backfills)
+        
+        Results carry candidate titles like fused mode. If the batch response
+        can't be used (bad JSON, wrong number of results), the messages are
+        classified one by one instead.
+        
+        Args:
+            message_texts: Slack message texts
+        
+        Returns:
+            Classifications, in the same order as message_texts
+        """
+        if len(message_texts) <= 1:
+            return [await self.classify(text) for text in message_texts]
+        
+        try:
+            numbered = "\n\n".join(
+                f"[{i}] {text[:MAX_BATCH_MESSAGE_CHARS]}"
+                for i, text in enumerate(message_texts, start=1)
+            )
+            started = time.perf_counter()
+            response = await call_llm("classification_batch", lambda: self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": BATCH_CLASSIFICATION_SYSTEM_PROMPT + "\n\nYou MUST respond with valid JSON only."},
+                    {"role": "user", "content": numbered}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.3
+            ))
+            record_usage(self.usage, response, started)
+            metrics.llm_call("classification_batch")
+            
+            results = json.loads(response.choices[0].message.content).get("results")
+            if not isinstance(results, list) or len(results) != len(message_texts):
+                raise ValueError(f"expected {len(message_texts)} results, got {len(results or [])}")
+            results = sorted(results, key=lambda r: r.get("index", 0))
+            classifications = [self._parse(dict(result), with_title=True) for result in results]
+            logger.info(
+                f"Batch classification: {len(classifications)} messages, "
+                f"{sum(c.is_relevant for c in classifications)} relevant"
+            )
+            return classifications
+        
+        except Exception as e:
+            logger.warning(f"Batch classification failed, classifying individually: {e}")
+            return list(await asyncio.gather(*(self.classify(text) for text in message_texts)))
+    
+    @staticmethod
+    def _parse(result: dict, with_title: bool) -> Classification:
+        """Classification from a JSON result (title kept only when asked for and relevant)"""
+        result.pop("index", None)
+        title = result.pop("title", None)
+        classification = Classification(**result)
+        # Titles are only trusted from the fused/batch prompts, and only for relevant messages
+        if with_title and classification.is_relevant and isinstance(title, str) and title.strip():
+            classification.title = clean_title(title)
+        return classification
@@ -0,0 +1,97 @@
+"""
+Micro-batching of embedding requests across concurrent callers
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+EmbedManyFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into list requests
+    
+    A batch is sent when it reaches `max_batch_size` inputs or when the oldest
+    queued input has waited `max_wait_seconds`, whichever comes first. Callers
+    asking for the same key while it is queued or in flight share one input.
+    """
+    
+    def __init__(
+        self,
+        embed_many: EmbedManyFn,
+        max_batch_size: int,
+        max_wait_seconds: float
+    ):
+        self.embed_many = embed_many
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: List[Tuple[str, str]] = []
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "coalesced": 0,
+            "requests": 0,
+            "inputs": 0,
+            "max_batch": 0,
+        }
+    
+    async def submit(self, key: str, text: str) -> List[float]:
+        """
+        Queue one text and wait for its embedding
+        
+        Args:
+            key: Identity of the text (callers with equal keys share a result)
+            text: Text to embed
+        
+        Returns:
+            Embedding vector
+        """
+        self.stats["submitted"] += 1
+        future = self._futures.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+            self._queue.append((key, text))
+            if len(self._queue) >= self.max_batch_size:
+                self._flush_now()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.max_wait_seconds, self._flush_now
+                )
+        # Shield: one caller giving up must not cancel the shared result
+        return await asyncio.shield(future)
+    
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+    
+    async def _send(self, batch: List[Tuple[str, str]]) -> None:
+        self.stats["requests"] += 1
+        self.stats["inputs"] += len(batch)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        try:
+            vectors = await self.embed_many([text for _, text in batch])
+            for (key, _), vector in zip(batch, vectors):
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for key, _ in batch:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,180 @@
+"""
+Content-addressed cache for embedding vectors
+Tier 1: in-memory LRU, tier 2: SQLite file of float32 blobs
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different repeats ("Any update? ") share a key"""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def cache_key(model: str, text: str) -> str:
+    """Content address: hash of the model name plus the normalized text"""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """SQLite-backed store of float32 vectors with least-recently-used size eviction"""
+    
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return np.frombuffer(row[0], dtype=np.float32)
+    
+    def put(self, key: str, vector: np.ndarray) -> None:
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT LENGTH(vector) FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                (key, blob, time.time())
+            )
+            self._bytes += len(blob) - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+    
+    def _evict(self) -> None:
+        """Drop least recently used vectors until 90% of max_bytes (lock held)"""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        )
+        doomed = []
+        for key, size in rows:
+            if self._bytes <= target:
+                break
+            doomed.append((key,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        logger.debug(f"Evicted {len(doomed)} embeddings from disk cache")
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache with hit/miss stats"""
+    
+    def __init__(
+        self,
+        memory_items: int = None,
+        disk_path: Optional[str] = None,
+        disk_max_mb: int = None
+    ):
+        if memory_items is None:
+            memory_items = settings.EMBEDDING_CACHE_MEMORY_ITEMS
+        if disk_path is None:
+            disk_path = settings.EMBEDDING_CACHE_PATH
+        if disk_max_mb is None:
+            disk_max_mb = settings.EMBEDDING_CACHE_DISK_MAX_MB
+        
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.disk: Optional[DiskEmbeddingStore] = None
+        if disk_path:
+            try:
+                self.disk = DiskEmbeddingStore(disk_path, disk_max_mb * 1024 * 1024)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk embedding cache unavailable ({disk_path}): {e}")
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+        }
+    
+    async def get(self, key: str) -> Optional[List[float]]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return vector.tolist()
+        
+        if self.disk is not None:
+            try:
+                vector = await asyncio.to_thread(self.disk.get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk embedding cache read failed: {e}")
+                vector = None
+            if vector is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, vector)
+                return vector.tolist()
+        
+        self.stats["misses"] += 1
+        return None
+    
+    async def put(self, key: str, embedding: List[float]) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._remember(key, vector)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.put, key, vector)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk embedding cache write failed: {e}")
+    
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+    
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
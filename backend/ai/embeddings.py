@@ -1,51 +1,128 @@
 """
 OpenAI embedding generation for semantic similarity
 """
+import asyncio
 import logging
-from typing import List
-from openai import AsyncOpenAI
+from typing import Dict, List
 
 from backend.config import settings
+from backend.ai.openai_client import openai_client
+from backend.ai.embedding_cache import EmbeddingCache, cache_key
+from backend.ai.embedding_batcher import EmbeddingBatcher
+from backend.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# ada-002 has an 8191 token limit; rough estimate: 1 token ≈ 4 characters
+MAX_CHARS = 8000 * 4
+
 
 class EmbeddingGenerator:
     """Generates embeddings for messages using OpenAI"""
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, cache: EmbeddingCache = None):
+        self.client = openai_client
         self.model = "text-embedding-ada-002"
+        self.cache = cache or EmbeddingCache()
+        # Concurrent cache misses are coalesced into list requests
+        self.batcher = EmbeddingBatcher(
+            self._embed_many,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_seconds=settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000
+        )
     
     async def generate(self, text: str) -> List[float]:
         """
         Generate embedding vector for text
         
+        Served from the embedding cache when the same (normalized) text was
+        embedded before with the same model. Misses from concurrent callers are
+        micro-batched into a single embeddings request.
+        
         Args:
             text: Text to embed
-            
+        
         Returns:
             List of 1536 float values (embedding vector)
         """
         try:
-            # Truncate if needed (ada-002 has 8191 token limit)
-            # Rough estimate: 1 token ≈ 4 characters
-            MAX_CHARS = 8000 * 4
-            if len(text) > MAX_CHARS:
-                text = text[:MAX_CHARS]
-                logger.warning(f"Truncating text for embedding from {len(text)} chars")
-            
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
+            text = self._truncate(text)
+            key = cache_key(self.model, text)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                logger.debug("Embedding cache hit")
+                return cached
             
-            embedding = response.data[0].embedding
+            embedding = await self.batcher.submit(key, text)
             logger.debug(f"Generated embedding of length {len(embedding)}")
             
+            await self.cache.put(key, embedding)
             return embedding
         
         except Exception as e:
             logger.error(f"Embedding generation error: {e}", exc_info=True)
             raise
-
+    
+    async def generate_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts (backfills, replays)
+        
+        Cache hits are served locally; the distinct misses go through the
+        batcher, i.e. out in as few embeddings requests as the batch size allows.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors, in the same order as texts
+        """
+        try:
+            texts = [self._truncate(text) for text in texts]
+            keys = [cache_key(self.model, text) for text in texts]
+            
+            vectors: Dict[str, List[float]] = {}
+            misses: Dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key in vectors or key in misses:
+                    continue
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    vectors[key] = cached
+                else:
+                    misses[key] = text
+            
+            if misses:
+                embedded = await asyncio.gather(
+                    *(self.batcher.submit(key, text) for key, text in misses.items())
+                )
+                for key, embedding in zip(misses, embedded):
+                    vectors[key] = embedding
+                    await self.cache.put(key, embedding)
+            
+            logger.debug(f"Embedded {len(texts)} texts ({len(misses)} API inputs)")
+            return [vectors[key] for key in keys]
+        
+        except Exception as e:
+            logger.error(f"Batch embedding generation error: {e}", exc_info=True)
+            raise
+    
+    async def _embed_many(self, texts: List[str]) -> List[List[float]]:
+        """One embeddings request for a list of texts (called by the batcher)"""
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=texts
+        )
+        metrics.embedding_request()
+        # Results carry the index of their input
+        embeddings: List[List[float]] = [[] for _ in texts]
+        for item in response.data:
+            embeddings[item.index] = item.embedding
+        return embeddings
+    
+    @staticmethod
+    def _truncate(text: str) -> str:
+        """Truncate if needed to stay under the model's token limit"""
+        if len(text) > MAX_CHARS:
+            logger.warning(f"Truncating text for embedding from {len(text)} chars")
+            text = text[:MAX_CHARS]
+        return text
@@ -4,19 +4,25 @@ Determines if two messages are about the same issue
 """
 import json
 import logging
-from typing import Tuple
-from openai import AsyncOpenAI
+from typing import Any, Dict, List, Optional, Tuple
 
-from backend.config import settings
+from backend.ai.openai_client import openai_client
+from backend.ai.hedging import call_llm
+from backend.deadline import DeadlineExceeded
+from backend.ai.prompts import LISTWISE_GROUPING_SYSTEM_PROMPT
+from backend.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Per-candidate first message budget in listwise prompts
+MAX_DIGEST_CHARS = 300
+
 
 class GroupingClassifier:
     """Uses GPT-4 to determine if messages are about the same issue"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai_client
     
     async def are_same_issue(
         self,
@@ -31,16 +37,19 @@ class GroupingClassifier:
             message1: First message text
             message2: Second message text
             ticket_title: Optional title of existing ticket
-            
+        
         Returns:
             Tuple of (is_same_issue, confidence, reasoning)
+        
+        Raises:
+            DeadlineExceeded: The message deadline passed before an answer
         """
         try:
             prompt = f"""Message 1: "{message1}"
 
 Message 2: "{message2}"
 """
-            
+
             if ticket_title:
                 prompt += f'\nExisting ticket title: "{ticket_title}"\n'
             
@@ -65,8 +74,8 @@ Respond ONLY with valid JSON:
   "confidence": 0.90,
   "reasoning": "Brief explanation of why they are/aren't the same issue"
 }"""
-            
-            response = await self.client.chat.completions.create(
+
+            response = await call_llm("grouping", lambda: self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -74,7 +83,8 @@ Respond ONLY with valid JSON:
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.2
-            )
+            ))
+            metrics.llm_call("grouping")
             
             result = json.loads(response.choices[0].message.content)
             
@@ -89,8 +99,86 @@ Respond ONLY with valid JSON:
             
             return (is_same, confidence, reasoning)
         
+        except DeadlineExceeded:
+            # No verdict: the grouping engine falls back to similarity search
+            logger.warning("Grouping check cut short by the message deadline")
+            raise
         except Exception as e:
             logger.error(f"Grouping classification error: {e}", exc_info=True)
             # On error, default to not same (safer)
             return (False, 0.0, f"Error: {str(e)}")
+    
+    async def find_best_match(
+        self,
+        message: str,
+        candidates: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], float, str]:
+        """
+        Rank all candidate tickets against a message in a single request
+        
+        Args:
+            message: New message text
+            candidates: Dicts with "id", "title" and "first_message", most recent first
+        
+        Returns:
+            Tuple of (best_ticket_id or None, confidence, reasoning)
+        
+        Raises:
+            DeadlineExceeded: The message deadline passed before an answer
+        """
+        if not candidates:
+            return (None, 0.0, "No candidates")
+        
+        try:
+            # Number the candidates instead of sending UUIDs (fewer tokens, easier to echo back)
+            digest = "\n\n".join(
+                f'{i}. Title: "{candidate.get("title", "")}"\n'
+                f'   First message: "{candidate.get("first_message", "")[:MAX_DIGEST_CHARS]}"'
+                for i, candidate in enumerate(candidates, start=1)
+            )
+            prompt = f"""New message: "{message}"
 
+Open tickets:
+{digest}
+
+Which ticket (if any) is about the SAME issue/topic as the new message?"""
+
+            response = await call_llm("grouping", lambda: self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": LISTWISE_GROUPING_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.2
+            ))
+            metrics.llm_call("grouping")
+            
+            result = json.loads(response.choices[0].message.content)
+            
+            choice = result.get("ticket")
+            confidence = float(result.get("confidence") or 0.0)
+            reasoning = result.get("reasoning", "")
+            
+            ticket_id = None
+            if isinstance(choice, (int, str)) and str(choice).isdigit():
+                index = int(choice)
+                if 1 <= index <= len(candidates):
+                    ticket_id = candidates[index - 1].get("id")
+                else:
+                    logger.warning(f"Listwise grouping picked unknown ticket #{choice}")
+            
+            logger.debug(
+                f"Listwise grouping: ticket={ticket_id}, confidence={confidence:.2f}, "
+                f"reasoning={reasoning}"
+            )
+            
+            return (ticket_id, confidence, reasoning)
+        
+        except DeadlineExceeded:
+            logger.warning("Listwise grouping cut short by the message deadline")
+            raise
+        except Exception as e:
+            logger.error(f"Listwise grouping error: {e}", exc_info=True)
+            # On error, default to no match (safer)
+            return (None, 0.0, f"Error: {str(e)}")
@@ -0,0 +1,133 @@
+"""
+Deadline-bounded, optionally hedged LLM calls
+
+`call_llm(stage, request)` runs one chat completion for a pipeline stage:
+
+- It never waits past the message deadline (see backend/deadline.py) and
+  raises DeadlineExceeded instead, which the caller turns into its usual
+  fallback (no grouping match, keyword title, ...)
+- With LLM_HEDGING_ENABLED, a call still running after the stage's observed
+  p95 gets one duplicate; whichever answers first wins and the other is
+  cancelled. At most LLM_HEDGE_MAX_FRACTION of a stage's calls are hedged.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from backend import deadline
+from backend.config import settings
+from backend.metrics import metrics
+
+T = TypeVar("T")
+
+# Calls a stage needs before its p95 is trusted for hedging
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Recent call latencies of one stage"""
+    
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+    
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+    
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+    
+    def may_hedge(self) -> bool:
+        return self.hedges < self.calls * settings.LLM_HEDGE_MAX_FRACTION
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+
+
+def tracker(stage: str) -> LatencyTracker:
+    found = _trackers.get(stage)
+    if found is None:
+        found = _trackers[stage] = LatencyTracker(settings.LLM_LATENCY_WINDOW)
+    return found
+
+
+def expected_seconds(stage: str) -> Optional[float]:
+    """Observed p95 of a stage (None until enough calls were seen)"""
+    return tracker(stage).p95()
+
+
+async def call_llm(stage: str, request: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run `request()` within the message deadline, hedging it if it runs long
+    
+    Args:
+        stage: Latency bucket (classification, grouping, title, ...)
+        request: Starts the call; invoked a second time for a hedge
+    
+    Raises:
+        DeadlineExceeded: No answer before the deadline
+    """
+    stats = tracker(stage)
+    stats.calls += 1
+    budget = deadline.remaining()
+    if budget is not None and budget <= 0:
+        _raise_deadline(stage)
+    
+    started = time.monotonic()
+    primary = asyncio.ensure_future(request())
+    pending = {primary}
+    try:
+        hedge_after = stats.p95() if settings.LLM_HEDGING_ENABLED else None
+        if hedge_after is not None and (budget is None or hedge_after < budget) and stats.may_hedge():
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                stats.hedges += 1
+                metrics.hedge(stage, "sent")
+                pending.add(asyncio.ensure_future(request()))
+        
+        while pending:
+            timeout = None if budget is None else max(0.0, budget - (time.monotonic() - started))
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                _raise_deadline(stage)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                break
+            if not pending:
+                raise done.pop().exception()
+        else:
+            succeeded = [primary]
+        
+        winner = succeeded[0]
+        result = winner.result()
+        stats.record(time.monotonic() - started)
+        if winner is not primary:
+            metrics.hedge(stage, "won")
+        return result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _raise_deadline(stage: str) -> None:
+    metrics.degradation(f"{stage}_deadline")
+    raise deadline.DeadlineExceeded(f"No time left for {stage}")
+
+
+def _metric_samples() -> List[Any]:
+    return [
+        ("llm_latency_p95_seconds", "gauge", "Observed p95 of LLM calls per stage (hedge threshold)",
+         {"stage": stage}, stats.p95())
+        for stage, stats in _trackers.items()
+        if stats.p95() is not None
+    ]
+
+
+metrics.register_collector(_metric_samples)
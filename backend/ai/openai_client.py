@@ -0,0 +1,387 @@
+"""
+Shared, rate-limit-aware OpenAI client
+
+Every component (classifier, embeddings, grouping classifier, title
+generator) sends its requests through the one `openai_client` below:
+
+- One pooled, keep-alive HTTP transport instead of a client per component
+- Per-model token buckets for requests/minute and tokens/minute; a request
+  waits for its estimated tokens before it is sent, and the buckets follow
+  the x-ratelimit-* headers OpenAI returns with every response
+- Per-model AIMD concurrency: the in-flight limit grows by one per window
+  of successful calls and is halved on a 429
+- Retries with exponential backoff and full jitter for 429s, timeouts,
+  connection errors and 5xx (Retry-After is honoured when present)
+
+Under a burst, requests queue in the limiter instead of all hitting the API
+at once and failing together.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from backend.config import settings
+from backend.metrics import metrics, stats_samples
+
+logger = logging.getLogger(__name__)
+
+# Rough estimate used before a request is sent: 1 token ≈ 4 characters
+CHARS_PER_TOKEN = 4
+# Completion budget assumed when a chat request sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 256
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Response headers of the request made by the current task (see _capture_headers)
+_response_headers: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar(
+    "openai_response_headers", default=None
+)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds from an x-ratelimit-reset-* header ("1s", "6m0s", "20ms")"""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def estimate_tokens(kind: str, request: Dict[str, Any]) -> int:
+    """Tokens a request will count against the tokens/minute limit"""
+    if kind == "embeddings":
+        texts = request.get("input") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        return max(1, sum(len(text) for text in texts) // CHARS_PER_TOKEN)
+    prompt_chars = sum(len(str(message.get("content") or "")) for message in request.get("messages", []))
+    return prompt_chars // CHARS_PER_TOKEN + (request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute, holding at most a minute's worth
+    
+    `reserve` lets the level go negative: each caller gets a place in line
+    and sleeps until its units have refilled, so waiters are served in order
+    without a lock.
+    """
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # Set after a 429: nothing is sent before this
+    
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+    
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units; returns how long the caller must wait for them"""
+        now = time.monotonic()
+        self._refill(now)
+        # A single request larger than the bucket would never fit: let it drain the bucket
+        amount = min(amount, self.capacity)
+        self.level -= amount
+        wait = -self.level * 60 / self.capacity if self.level < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+    
+    def refund(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+    
+    def sync(self, limit: Optional[float], remaining: Optional[float], reset_seconds: Optional[float]) -> None:
+        """Align with the server's view from x-ratelimit-* headers"""
+        now = time.monotonic()
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None and remaining < self.level:
+            self.level = float(remaining)
+        if remaining == 0 and reset_seconds:
+            self.block(reset_seconds)
+    
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on requests in flight
+    
+    +1 after `limit` consecutive successes (additive increase), halved on a
+    throttle (multiplicative decrease, at most once per `cooldown_seconds`
+    so a wave of 429s from one burst counts once).
+    """
+    
+    def __init__(self, initial: int, minimum: int, maximum: int, cooldown_seconds: float = 1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.cooldown_seconds = cooldown_seconds
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._changed = asyncio.Condition()
+    
+    async def acquire(self) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+    
+    async def release(self) -> None:
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+    
+    def increase(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+    
+    def decrease(self) -> bool:
+        """Halve the limit; False if it was already cut within the cooldown"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return False
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit / 2)
+        return True
+
+
+class ModelLimiter:
+    """Request and token buckets plus adaptive concurrency for one model"""
+    
+    def __init__(self, model: str):
+        self.model = model
+        self.requests = TokenBucket(settings.OPENAI_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(settings.OPENAI_TOKENS_PER_MINUTE)
+        self.concurrency = AdaptiveConcurrency(
+            initial=settings.OPENAI_INITIAL_CONCURRENCY,
+            minimum=settings.OPENAI_MIN_CONCURRENCY,
+            maximum=settings.OPENAI_MAX_CONCURRENCY
+        )
+    
+    async def acquire(self, tokens: int) -> float:
+        """Wait for budget and a concurrency slot; returns the seconds waited"""
+        started = time.monotonic()
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self.concurrency.acquire()
+        return time.monotonic() - started
+    
+    def observe_headers(self, headers: Optional[Dict[str, str]]) -> None:
+        if not headers:
+            return
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            bucket.sync(
+                _number(headers.get(f"x-ratelimit-limit-{kind}")),
+                _number(headers.get(f"x-ratelimit-remaining-{kind}")),
+                parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+            )
+    
+    def throttled(self, retry_after: Optional[float]) -> None:
+        """A 429: back off concurrency and hold both buckets until Retry-After"""
+        if self.concurrency.decrease():
+            logger.warning(
+                f"OpenAI rate limited ({self.model}): concurrency -> {int(self.concurrency.limit)}"
+            )
+        if retry_after:
+            self.requests.block(retry_after)
+            self.tokens.block(retry_after)
+
+
+class _Endpoint:
+    """`create(**kwargs)` routed through the limiter (mirrors the SDK attribute path)"""
+    
+    def __init__(self, owner: "SharedOpenAIClient", kind: str):
+        self._owner = owner
+        self._kind = kind
+    
+    async def create(self, **kwargs) -> Any:
+        return await self._owner.request(self._kind, **kwargs)
+
+
+class SharedOpenAIClient:
+    """
+    Drop-in for the parts of AsyncOpenAI the bot uses
+    
+    `openai_client.chat.completions.create(...)` and
+    `openai_client.embeddings.create(...)` behave like the SDK calls, plus
+    rate limiting, adaptive concurrency and retries. `client` is the
+    underlying AsyncOpenAI (SDK retries are off; retrying happens here).
+    """
+    
+    def __init__(self, client: Any = None):
+        self.client = client or AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                event_hooks={"response": [_capture_headers]}
+            )
+        )
+        self.max_retries = settings.OPENAI_MAX_RETRIES
+        self.retry_base_seconds = settings.OPENAI_RETRY_BASE_SECONDS
+        self.retry_max_seconds = settings.OPENAI_RETRY_MAX_SECONDS
+        self.chat = SimpleNamespace(completions=_Endpoint(self, "chat"))
+        self.embeddings = _Endpoint(self, "embeddings")
+        self.limiters: Dict[str, ModelLimiter] = {}
+        self.stats: Dict[str, float] = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failed": 0,
+            "limiter_wait_seconds": 0.0,
+        }
+        metrics.register_collector(self._metric_samples)
+    
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self.limiters.get(model)
+        if limiter is None:
+            limiter = self.limiters[model] = ModelLimiter(model)
+        return limiter
+    
+    async def request(self, kind: str, **kwargs) -> Any:
+        """
+        Send one chat completion or embeddings request
+        
+        Args:
+            kind: "chat" or "embeddings"
+            **kwargs: Arguments of the SDK create() call (model is required)
+        
+        Returns:
+            The SDK response
+        
+        Raises:
+            The last error once retries are exhausted (or any non-retryable error)
+        """
+        limiter = self.limiter(kwargs["model"])
+        tokens = estimate_tokens(kind, kwargs)
+        create = self.client.chat.completions.create if kind == "chat" else self.client.embeddings.create
+        
+        for attempt in range(self.max_retries + 1):
+            self.stats["limiter_wait_seconds"] += await limiter.acquire(tokens)
+            headers: Dict[str, str] = {}
+            token = _response_headers.set(headers)
+            try:
+                self.stats["requests"] += 1
+                response = await create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                response_headers = _error_headers(e)
+                limiter.observe_headers(response_headers)
+                retry_after = _retry_after(response_headers)
+                if isinstance(e, openai.RateLimitError):
+                    self.stats["rate_limited"] += 1
+                    limiter.throttled(retry_after)
+                if attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+                # Jitter on top of Retry-After too, so throttled callers don't retry in lockstep
+                delay = (retry_after or 0) + self._backoff(attempt)
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"OpenAI {kind} request failed ({type(e).__name__}), "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+            else:
+                limiter.observe_headers(headers)
+                limiter.concurrency.increase()
+                self._settle_tokens(limiter, tokens, response)
+                return response
+            finally:
+                _response_headers.reset(token)
+                await limiter.concurrency.release()
+            await asyncio.sleep(delay)
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+    
+    @staticmethod
+    def _settle_tokens(limiter: ModelLimiter, estimated: int, response: Any) -> None:
+        """Give back what the estimate over-reserved once real usage is known"""
+        usage = getattr(response, "usage", None)
+        used = getattr(usage, "total_tokens", None) or (
+            (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+        )
+        if used and used < estimated:
+            limiter.tokens.refund(estimated - used)
+    
+    def _metric_samples(self) -> List[Any]:
+        samples = stats_samples("openai_client_total", "counter", "Shared OpenAI client events", self.stats, "event")
+        for model, limiter in self.limiters.items():
+            samples.append((
+                "openai_concurrency_limit", "gauge", "Adaptive in-flight limit per model",
+                {"model": model}, int(limiter.concurrency.limit)
+            ))
+            samples.append((
+                "openai_in_flight", "gauge", "Requests in flight per model",
+                {"model": model}, limiter.concurrency.in_flight
+            ))
+        return samples
+    
+    async def close(self) -> None:
+        if hasattr(self.client, "close"):
+            await self.client.close()
+
+
+async def _capture_headers(response: httpx.Response) -> None:
+    """httpx response hook: hand rate-limit headers to the request's task"""
+    headers = _response_headers.get()
+    if headers is not None:
+        headers.update(
+            (key, value) for key, value in response.headers.items()
+            if key.startswith("x-ratelimit-") or key.startswith("retry-after")
+        )
+
+
+def _error_headers(error: Exception) -> Dict[str, str]:
+    response = getattr(error, "response", None)
+    return dict(response.headers) if response is not None else {}
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    retry_after_ms = _number(headers.get("retry-after-ms"))
+    if retry_after_ms:
+        return retry_after_ms / 1000
+    return _number(headers.get("retry-after"))
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# Global shared client - used by every AI component
+openai_client = SharedOpenAIClient()
+
+
+async def close_openai_client() -> None:
+    """Close pooled HTTP connections (call on shutdown)"""
+    await openai_client.close()
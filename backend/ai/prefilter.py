@@ -0,0 +1,178 @@
+"""
+Local pre-filter that rejects obvious chit-chat before any network call
+Rules first, then a small n-gram Naive Bayes model trained on a bundled seed corpus
+"""
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from backend.models import Classification
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEED_CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "prefilter_seed.json")
+
+# Whole-message phrases that are never worth a ticket (compared after normalization)
+CHIT_CHAT_PHRASES = {
+    "thanks", "thank you", "thank you so much", "thanks so much", "thx", "ty", "tysm",
+    "ok", "okay", "k", "kk", "ok thanks", "ok cool", "cool", "cool cool", "cool thanks",
+    "sounds good", "sounds great", "got it", "gotcha", "sure", "sure thing",
+    "yes", "yep", "yup", "yeah", "no worries", "np",
+    "lol", "lmao", "haha", "hahaha", "nice", "awesome", "perfect", "great", "great thanks",
+    "will do", "on it", "done", "agreed", "exactly", "true", "fair enough",
+    "hi", "hey", "hello", "hey there", "hi all", "hi everyone", "hello everyone",
+    "good morning", "morning", "good afternoon", "good evening", "gm",
+    "have a good weekend", "have a great weekend", "see you tomorrow", "see you",
+    "catch you later", "talk soon", "bye", "cheers", "brb", "omw",
+    "appreciate it", "much appreciated", "congrats", "welcome",
+}
+
+# Messages mentioning any of these always go to the LLM (never rejected by the model)
+ISSUE_SIGNALS = re.compile(
+    r"\b(broken|break|bug|error|errors|crash|crashes|fail|failed|failing|issue|problem|"
+    r"doesn'?t|does not|can'?t|cannot|won'?t|not working|stuck|slow|down|help|how|"
+    r"why|when|where|what|add|need|feature|request|support|update|fix|still|again)\b"
+)
+
+# "Me too" replies: another affected user, which should attach to the open ticket.
+# Never rejected, however short (checked on the normalized text)
+AFFECTED_USER_SIGNALS = re.compile(
+    r"(?:^|\s)\+1(?:\s|$)|\b(same|me too|too|also|any luck|any news|any update|anyone else)\b"
+)
+
+SLACK_MARKUP = re.compile(r"<[^>]+>|:[a-z0-9_+\-]+:")
+NON_WORD = re.compile(r"[^\w\s+']", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop Slack markup (mentions, links, :emoji:) and punctuation"""
+    text = SLACK_MARKUP.sub(" ", text.lower())
+    text = NON_WORD.sub(" ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def ngram_features(text: str) -> List[str]:
+    """Word unigrams/bigrams plus character trigrams of the normalized text"""
+    words = text.split()
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    padded = f" {text} "
+    features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return features
+
+
+class NgramNaiveBayes:
+    """Multinomial Naive Bayes over n-gram features (label 1 = chit-chat)"""
+    
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.counts: Dict[int, Counter] = {0: Counter(), 1: Counter()}
+        self.totals: Dict[int, int] = {0: 0, 1: 0}
+        self.priors: Dict[int, float] = {0: 0.5, 1: 0.5}
+        self.vocab_size = 0
+    
+    def fit(self, texts: List[str], labels: List[int]) -> "NgramNaiveBayes":
+        docs = Counter(labels)
+        for text, label in zip(texts, labels):
+            self.counts[label].update(ngram_features(normalize(text)))
+        self.totals = {label: sum(c.values()) for label, c in self.counts.items()}
+        self.vocab_size = len(set(self.counts[0]) | set(self.counts[1]))
+        self.priors = {label: docs[label] / len(labels) for label in (0, 1)}
+        return self
+    
+    def predict_proba(self, text: str) -> float:
+        """P(chit-chat | text)"""
+        features = ngram_features(normalize(text))
+        scores = {}
+        for label in (0, 1):
+            denominator = self.totals[label] + self.alpha * self.vocab_size
+            scores[label] = math.log(self.priors[label]) + sum(
+                math.log((self.counts[label][f] + self.alpha) / denominator) for f in features
+            )
+        # Softmax over the two log scores
+        delta = max(-50.0, min(50.0, scores[0] - scores[1]))
+        return 1.0 / (1.0 + math.exp(delta))
+
+
+class ChitChatPrefilter:
+    """
+    Rejects obviously irrelevant messages with zero network calls
+    
+    Tuned for precision: anything it is unsure about goes to the LLM classifier.
+    "Me too" replies ("same here", "+1", "any luck?") always go through: on
+    this bot they are how further affected users show up on a ticket.
+    """
+    
+    def __init__(
+        self,
+        model_threshold: float = None,
+        max_words: int = None,
+        use_model: bool = True
+    ):
+        self.model_threshold = model_threshold or settings.PREFILTER_MODEL_THRESHOLD
+        self.max_words = max_words or settings.PREFILTER_MAX_WORDS
+        self.model: Optional[NgramNaiveBayes] = self._train() if use_model else None
+        self.stats: Dict[str, int] = {
+            "checked": 0,
+            "rule_rejections": 0,
+            "model_rejections": 0,
+        }
+    
+    @staticmethod
+    def _train() -> Optional[NgramNaiveBayes]:
+        try:
+            with open(SEED_CORPUS_PATH, encoding="utf-8") as f:
+                examples = json.load(f)["examples"]
+            return NgramNaiveBayes().fit(
+                [e["text"] for e in examples],
+                [e["label"] for e in examples]
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Pre-filter model unavailable, using rules only: {e}")
+            return None
+    
+    def check(self, message_text: str) -> Optional[Classification]:
+        """
+        Pre-classify a message locally
+        
+        Args:
+            message_text: The Slack message text
+        
+        Returns:
+            A not-relevant Classification if the message is obvious chit-chat,
+            None if it needs the LLM classifier
+        """
+        self.stats["checked"] += 1
+        text = normalize(message_text)
+        
+        if not text:
+            return self._reject("rule_rejections", 1.0, "emoji/punctuation only")
+        if AFFECTED_USER_SIGNALS.search(text):
+            return None
+        if text in CHIT_CHAT_PHRASES:
+            return self._reject("rule_rejections", 1.0, f"chit-chat phrase '{text}'")
+        
+        if (
+            self.model is not None
+            and len(text.split()) <= self.max_words
+            and not ISSUE_SIGNALS.search(text)
+        ):
+            probability = self.model.predict_proba(message_text)
+            if probability >= self.model_threshold:
+                return self._reject("model_rejections", probability, f"n-gram model p={probability:.2f}")
+        
+        return None
+    
+    def _reject(self, counter: str, confidence: float, reason: str) -> Classification:
+        self.stats[counter] += 1
+        return Classification(
+            is_relevant=False,
+            category=None,
+            confidence=confidence,
+            reasoning=f"Pre-filter: {reason}"
+        )
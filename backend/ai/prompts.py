@@ -54,3 +54,56 @@ Respond ONLY with valid JSON:
   "reasoning": "Brief explanation"
 }"""
 
+FUSED_CLASSIFICATION_SYSTEM_PROMPT = CLASSIFICATION_SYSTEM_PROMPT.split("Respond ONLY with valid JSON:")[0] + """ALSO write a candidate ticket title in case this message opens a new ticket:
+- SHORT and concise (max 60 characters, ideally 3-6 words), title case, no quotes, no period at the end
+- Focus on the KEY problem/request only, drop filler like "I just wanted to check in regarding..."
+- Bugs: "What" + "Where" (e.g., "Mobile Login Button Issue"); features: "Add" + "What" (e.g., "Add CSV Export");
+  support: topic + "Help" (e.g., "Password Reset Help"); questions: the topic (e.g., "Enterprise Pricing")
+- If is_relevant is false, title is null
+
+Respond ONLY with valid JSON:
+{
+  "is_relevant": true/false,
+  "category": "support" | "bug" | "feature" | "question" | null,
+  "confidence": 0.85,
+  "reasoning": "Brief explanation",
+  "title": "Mobile Login Button Issue" | null
+}"""
+
+BATCH_CLASSIFICATION_SYSTEM_PROMPT = FUSED_CLASSIFICATION_SYSTEM_PROMPT.split("Respond ONLY with valid JSON:")[0] + """You get a numbered list of messages ([1], [2], ...). Classify EACH message on its own,
+exactly as if it were the only message - do not let messages influence each other.
+
+Respond ONLY with valid JSON, one result per message, in the same order:
+{
+  "results": [
+    {
+      "index": 1,
+      "is_relevant": true/false,
+      "category": "support" | "bug" | "feature" | "question" | null,
+      "confidence": 0.85,
+      "reasoning": "Brief explanation",
+      "title": "Mobile Login Button Issue" | null
+    }
+  ]
+}"""
+
+LISTWISE_GROUPING_SYSTEM_PROMPT = """You are a message relationship analyzer for a Forward-Deployed Engineer.
+
+You get a NEW message and a numbered list of existing open tickets (title + first message).
+Pick the ONE ticket that is about the SAME issue/topic as the new message, even if worded differently or sent hours/days apart.
+If none of the tickets is about the same issue, answer null.
+
+Examples of SAME issue:
+- "Can you add CSV export?" + ticket "I don't see a button for CSV export" → SAME (both about CSV export feature)
+- "Login button broken" + ticket "The login doesn't work on mobile" → SAME (both about login issue)
+
+Examples of DIFFERENT issues:
+- "Can you add CSV export?" + ticket "The login button is broken" → DIFFERENT (different features)
+- "Export feature broken" + ticket "How do I login?" → DIFFERENT (different topics)
+
+Respond ONLY with valid JSON:
+{
+  "ticket": 3 | null,
+  "confidence": 0.90,
+  "reasoning": "Brief explanation of the choice"
+}"""
@@ -2,21 +2,49 @@
 AI-powered ticket title generator
 Creates concise, descriptive titles based on message context
 """
-import json
 import logging
+import time
 from typing import List
-from openai import AsyncOpenAI
 
-from backend.config import settings
+from backend.ai.openai_client import openai_client
+from backend.ai.hedging import call_llm
+from backend.deadline import DeadlineExceeded
+from backend.ai.usage import new_usage, record_usage
+from backend.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Only the first few messages of a ticket are used as title context
+TITLE_CONTEXT_MESSAGES = 5
+
+
+def clean_title(title: str) -> str:
+    """Strip quotes and trailing period from a model-written title, cap at 60 chars"""
+    title = title.strip()
+    
+    # Remove quotes if present
+    if title.startswith('"') and title.endswith('"'):
+        title = title[1:-1]
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1]
+    
+    # Clean up the title
+    title = title.strip()
+    # Remove trailing periods
+    if title.endswith('.'):
+        title = title[:-1]
+    # Ensure max length (prefer shorter)
+    if len(title) > 60:
+        title = title[:57] + "..."
+    return title
+
 
 class TitleGenerator:
     """Uses GPT-4 to generate concise, descriptive ticket titles"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai_client
+        self.usage = new_usage()
     
     async def generate_title(
         self,
@@ -29,13 +57,13 @@ class TitleGenerator:
         Args:
             messages: List of message texts in the ticket
             category: Ticket category (bug, feature, support, question)
-            
+        
         Returns:
             Concise title (max 80 chars)
         """
         try:
             # Combine messages for context
-            context = "\n\n".join([f"Message {i+1}: {msg}" for i, msg in enumerate(messages[:5])])
+            context = "\n\n".join([f"Message {i+1}: {msg}" for i, msg in enumerate(messages[:TITLE_CONTEXT_MESSAGES])])
             
             system_prompt = """You are a ticket title generator for a Forward-Deployed Engineer dashboard.
 
@@ -67,7 +95,8 @@ Messages:
 
 Generate a concise title:"""
 
-            response = await self.client.chat.completions.create(
+            started = time.perf_counter()
+            response = await call_llm("title", lambda: self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -75,30 +104,18 @@ Generate a concise title:"""
                 ],
                 temperature=0.3,
                 max_tokens=50
-            )
-            
-            title = response.choices[0].message.content.strip()
-            
-            # Remove quotes if present
-            if title.startswith('"') and title.endswith('"'):
-                title = title[1:-1]
-            if title.startswith("'") and title.endswith("'"):
-                title = title[1:-1]
+            ))
+            record_usage(self.usage, response, started)
+            metrics.llm_call("title")
             
-            # Clean up the title
-            title = title.strip()
-            # Remove trailing periods
-            if title.endswith('.'):
-                title = title[:-1]
-            # Ensure max length (prefer shorter)
-            if len(title) > 60:
-                title = title[:57] + "..."
+            title = clean_title(response.choices[0].message.content)
             
             logger.debug(f"Generated title: {title}")
             return title
         
         except Exception as e:
-            logger.error(f"Title generation error: {e}", exc_info=True)
+            # Past the message deadline the keyword fallback below is the expected outcome
+            logger.error(f"Title generation error: {e}", exc_info=not isinstance(e, DeadlineExceeded))
             # Fallback: Extract key words from first message
             if messages:
                 first_msg = messages[0].lower()
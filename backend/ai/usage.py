@@ -0,0 +1,31 @@
+"""
+Per-client accounting of chat completion latency and token usage
+"""
+import time
+from typing import Any, Dict
+
+
+def new_usage() -> Dict[str, float]:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_seconds": 0.0,
+    }
+
+
+def record_usage(usage: Dict[str, float], response: Any, started: float) -> None:
+    """
+    Add one chat completion to a usage dict
+    
+    Args:
+        usage: Dict from new_usage()
+        response: Chat completion response (its `usage` may be missing)
+        started: time.perf_counter() taken before the request
+    """
+    usage["calls"] += 1
+    usage["latency_seconds"] += time.perf_counter() - started
+    tokens = getattr(response, "usage", None)
+    if tokens is not None:
+        usage["prompt_tokens"] += tokens.prompt_tokens or 0
+        usage["completion_tokens"] += tokens.completion_tokens or 0
@@ -0,0 +1,51 @@
+"""
+Local Prometheus scrape endpoint for the bot process
+"""
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from backend.config import settings
+from backend.metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """Serves GET /metrics (Prometheus text format) on the bot's event loop"""
+    
+    def __init__(
+        self,
+        registry: MetricsRegistry = None,
+        host: str = None,
+        port: int = None
+    ):
+        self.registry = registry or metrics
+        self.host = host or settings.METRICS_HOST
+        self.port = port or settings.METRICS_PORT
+        self._runner: Optional[web.AppRunner] = None
+    
+    async def start(self) -> None:
+        """Start listening (no-op when metrics are disabled)"""
+        if not self.registry.enabled or self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"📈 Metrics endpoint on http://{self.host}:{self.port}/metrics")
+    
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={"Content-Type": CONTENT_TYPE}
+        )
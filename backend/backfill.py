@@ -0,0 +1,89 @@
+"""
+FDE Slackbot - Backfill Entry Point
+
+Streams existing channel history through the processing pipeline:
+
+    python -m backend.backfill --export /path/to/slack-export [--channel general ...]
+    python -m backend.backfill --channel C0123456789 [--oldest 1700000000]
+
+Progress is checkpointed; rerunning the same command resumes.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from backend.config import settings
+from backend.database.client import close_async_client
+from backend.ai.openai_client import close_openai_client
+from backend.processing.backfill import BackfillRunner
+from backend.processing.message_processor import MessageProcessor
+
+# Configure logging
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill Slack history into tickets")
+    parser.add_argument("--export", help="Slack export directory (otherwise conversations.history is used)")
+    parser.add_argument("--channel", action="append", default=[],
+                        help="Channel to backfill (ID, or export folder name); repeatable")
+    parser.add_argument("--oldest", help="conversations.history: don't read messages older than this ts")
+    parser.add_argument("--checkpoint", default=settings.BACKFILL_CHECKPOINT_PATH)
+    parser.add_argument("--channels-concurrency", type=int, default=settings.BACKFILL_CHANNEL_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.BACKFILL_BATCH_SIZE)
+    parser.add_argument("--rate", type=float, default=settings.BACKFILL_MAX_MESSAGES_PER_SECOND,
+                        help="Max messages per second across channels (0 = unlimited)")
+    args = parser.parse_args(argv)
+    if not args.export and not args.channel:
+        parser.error("either --export or at least one --channel is required")
+    return args
+
+
+async def main(argv=None):
+    """Backfill entry point"""
+    args = parse_args(argv)
+    slack_client = AsyncWebClient(token=settings.SLACK_BOT_TOKEN)
+    processor = MessageProcessor()
+    runner = BackfillRunner(
+        processor,
+        slack_client,
+        checkpoint_path=args.checkpoint,
+        channel_concurrency=args.channels_concurrency,
+        batch_size=args.batch_size,
+        max_messages_per_second=args.rate
+    )
+    
+    await processor.warm_up(None if args.export else slack_client)
+    try:
+        if args.export:
+            report = await runner.run_export(args.export, args.channel or None)
+        else:
+            report = await runner.run_history(args.channel, oldest_ts=args.oldest)
+        logger.info(f"Backfill finished: {json.dumps(report)}")
+    finally:
+        await processor.close()
+        await close_async_client()
+        await close_openai_client()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Backfill interrupted - rerun to resume from the checkpoint")
@@ -0,0 +1,133 @@
+"""
+Benchmark: fused vs separate classification + title calls
+
+Runs the relevant messages of fixtures/prefilter_labeled.jsonl through
+MessageClassifier and GroupingEngine._create_ticket (every message opens a
+new ticket, the case the fused call targets) against a fake chat client.
+The fake answers with canned JSON and simulates latency as a fixed
+per-request cost plus a per-output-token cost, so fewer sequential calls
+and extra output tokens both show up. Tokens are estimated from the prompt
+and answer text (≈4 chars per token).
+
+Reports chat completions, prompt/completion tokens and mean wall-clock
+latency per new ticket for CLASSIFICATION_MODE=separate and fused.
+
+Usage (from project root):
+    python -m backend.benchmarks.classification_modes [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from backend.benchmarks.common import configure_env, estimate_tokens
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "prefilter_labeled.jsonl")
+
+
+class FakeChatClient:
+    """Stands in for AsyncOpenAI chat completions with token-proportional latency"""
+    
+    def __init__(self, request_ms: float, per_output_token_ms: float):
+        self.request_ms = request_ms
+        self.per_output_token_ms = per_output_token_ms
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    async def _create(self, messages, **kwargs):
+        system = messages[0]["content"]
+        text = messages[-1]["content"]
+        classification = {
+            "is_relevant": True,
+            "category": "bug",
+            "confidence": 0.9,
+            "reasoning": "Reports something not working as expected",
+        }
+        if "candidate ticket title" in system:
+            content = json.dumps({**classification, "title": "Export Button Not Working"})
+        elif "ticket title generator" in system:
+            content = "Export Button Not Working"
+        else:
+            content = json.dumps(classification)
+        
+        prompt_tokens = estimate_tokens(system + text)
+        completion_tokens = estimate_tokens(content)
+        await asyncio.sleep(
+            (self.request_ms + self.per_output_token_ms * completion_tokens) / 1000
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        )
+
+
+async def _run(request_ms: float, per_output_token_ms: float) -> Dict[str, Any]:
+    from backend.ai.classifier import MessageClassifier
+    from backend.processing.grouping_engine import GroupingEngine
+    
+    with open(FIXTURES, encoding="utf-8") as f:
+        texts = [e["text"] for e in map(json.loads, filter(str.strip, f)) if e["relevant"]]
+    
+    async def create_ticket(ticket_data):
+        return {"id": "t", **ticket_data}
+    
+    report = {}
+    for mode in ("separate", "fused"):
+        client = FakeChatClient(request_ms, per_output_token_ms)
+        classifier = MessageClassifier(mode=mode)
+        classifier.client = client
+        engine = GroupingEngine()
+        engine.title_generator.client = client
+        engine.ticket_repo.create = create_ticket
+        engine.ticket_index.ready = False
+        
+        elapsed = 0.0
+        for i, text in enumerate(texts):
+            start = time.perf_counter()
+            classification = await classifier.classify(text)
+            await engine._create_ticket(
+                text, [0.0], classification.category, "C_BENCH", f"{i}.0", classification.title
+            )
+            elapsed += time.perf_counter() - start
+        
+        n = len(texts)
+        usage = {
+            key: classifier.usage[key] + engine.title_generator.usage[key]
+            for key in classifier.usage
+        }
+        report[mode] = {
+            "new_tickets": n,
+            "calls_per_ticket": usage["calls"] / n,
+            "prompt_tokens_per_ticket": round(usage["prompt_tokens"] / n, 1),
+            "completion_tokens_per_ticket": round(usage["completion_tokens"] / n, 1),
+            "mean_latency_ms": round(elapsed / n * 1000, 1),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--request-ms", type=float, default=300.0, help="Fixed latency per request")
+    parser.add_argument("--token-ms", type=float, default=10.0, help="Latency per output token")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+    
+    configure_env()
+    report = asyncio.run(_run(args.request_ms, args.token_ms))
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for mode, row in report.items():
+        print(
+            f"{mode:>8}: calls={row['calls_per_ticket']:.1f} "
+            f"prompt_tokens={row['prompt_tokens_per_ticket']:.0f} "
+            f"completion_tokens={row['completion_tokens_per_ticket']:.0f} "
+            f"latency={row['mean_latency_ms']:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
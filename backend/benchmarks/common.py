@@ -0,0 +1,26 @@
+"""
+Shared helpers for benchmarks
+"""
+import os
+from typing import Optional
+
+
+def configure_env(supabase_url: Optional[str] = None) -> None:
+    """
+    Provide placeholder settings so backend modules import without a .env
+    
+    Must run before any backend module is imported (settings load at import).
+    """
+    if supabase_url:
+        os.environ["SUPABASE_URL"] = supabase_url
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:1")
+    os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+    os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-bench")
+    os.environ.setdefault("SLACK_APP_TOKEN", "xapp-bench")
+    os.environ.setdefault("FDE_SLACK_USER_ID", "U_BENCH")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (1 token ≈ 4 characters), same heuristic the pipeline uses"""
+    return max(1, len(text) // 4)
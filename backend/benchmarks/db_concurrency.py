@@ -0,0 +1,131 @@
+"""
+Benchmark: repository throughput under concurrent events
+
+Runs N concurrent "events" against a local PostgREST stand-in (an aiohttp
+server with a fixed per-request latency, running on its own thread) and
+compares the old blocking data-access path (synchronous supabase client
+called from async code) with the async repository layer.
+
+Usage (from project root):
+    python -m backend.benchmarks.db_concurrency --events 50 --latency-ms 40
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+import uuid
+
+from aiohttp import web
+
+from backend.benchmarks.common import configure_env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_stand_in(port: int, latency_s: float) -> None:
+    """Start a minimal PostgREST stand-in on a background thread"""
+    
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency_s)
+        if request.method in ("POST", "PATCH"):
+            body = await request.json()
+            if request.path.startswith("/rest/v1/rpc/"):
+                return web.json_response([])
+            row = dict(body if isinstance(body, dict) else body[0])
+            row.setdefault("id", str(uuid.uuid4()))
+            return web.json_response([row])
+        return web.json_response([])
+    
+    ready = threading.Event()
+    
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handle)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+    
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+
+
+async def _blocking_event(i: int) -> None:
+    """DB calls of one message using the synchronous client (pre-async behaviour)"""
+    from backend.database.client import supabase_client
+    
+    slack_id = f"C_BENCH:{i}.000"
+    supabase_client.table("messages").select("*").eq("slack_message_id", slack_id).execute()
+    supabase_client.table("tickets").select("*").eq("first_message_ts", f"{i}.000").eq(
+        "channel_id", "C_BENCH"
+    ).eq("status", "open").execute()
+    supabase_client.table("tickets").select("*").eq("channel_id", "C_BENCH").eq(
+        "status", "open"
+    ).limit(10).execute()
+    ticket = supabase_client.table("tickets").insert({
+        "title": "bench", "channel_id": "C_BENCH", "first_message_ts": f"{i}.000"
+    }).execute().data[0]
+    supabase_client.table("messages").insert({
+        "ticket_id": ticket["id"], "slack_message_id": slack_id, "text": "bench"
+    }).execute()
+
+
+async def _async_event(i: int, ticket_repo, message_repo) -> None:
+    """DB calls of one message using the async repositories"""
+    slack_id = f"C_BENCH:{i}.000"
+    await message_repo.find_by_slack_id(slack_id)
+    await ticket_repo.find_by_thread(f"{i}.000", "C_BENCH")
+    await ticket_repo.find_recent_tickets("C_BENCH")
+    ticket = await ticket_repo.create({
+        "title": "bench", "channel_id": "C_BENCH", "first_message_ts": f"{i}.000"
+    })
+    await message_repo.create({
+        "ticket_id": ticket["id"], "slack_message_id": slack_id, "text": "bench"
+    })
+
+
+async def _run(events: int) -> None:
+    from backend.database.client import close_async_client
+    from backend.database.messages import MessageRepository
+    from backend.database.tickets import TicketRepository
+    
+    ticket_repo = TicketRepository()
+    message_repo = MessageRepository()
+    
+    results = {}
+    for name, factory in (
+        ("blocking", lambda i: _blocking_event(i)),
+        ("async", lambda i: _async_event(i, ticket_repo, message_repo)),
+    ):
+        start = time.perf_counter()
+        await asyncio.gather(*(factory(i) for i in range(events)))
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        print(f"{name:>9}: {events} events in {elapsed:.2f}s -> {events / elapsed:.1f} events/s")
+    
+    print(f"  speedup: {results['blocking'] / results['async']:.1f}x")
+    await close_async_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=50, help="Concurrent events")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Stand-in latency per request")
+    args = parser.parse_args()
+    
+    port = _free_port()
+    configure_env(f"http://127.0.0.1:{port}")
+    _start_stand_in(port, args.latency_ms / 1000)
+    asyncio.run(_run(args.events))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: embedding micro-batching under burst load
+
+Fires bursts of concurrent EmbeddingGenerator.generate calls (distinct
+texts, cache disabled) against a fake embeddings endpoint with a fixed
+per-request latency, with batching off (max batch size 1) and on.
+
+Usage (from project root):
+    python -m backend.benchmarks.embedding_batching --bursts 5 --burst-size 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from backend.benchmarks.common import configure_env
+
+
+class FakeEmbeddingsAPI:
+    """Stands in for client.embeddings: fixed latency, counts requests and inputs"""
+    
+    def __init__(self, latency_s: float, per_input_s: float):
+        self.latency_s = latency_s
+        self.per_input_s = per_input_s
+        self.requests = 0
+        self.inputs = 0
+    
+    async def create(self, model, input):
+        texts = input if isinstance(input, list) else [input]
+        self.requests += 1
+        self.inputs += len(texts)
+        await asyncio.sleep(self.latency_s + self.per_input_s * len(texts))
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[0.0] * 1536) for i in range(len(texts))
+        ])
+
+
+async def _run_mode(args, max_batch_size: int) -> dict:
+    from backend.ai.embedding_cache import EmbeddingCache
+    from backend.ai.embeddings import EmbeddingGenerator
+    
+    generator = EmbeddingGenerator(cache=EmbeddingCache(memory_items=0, disk_path=""))
+    api = FakeEmbeddingsAPI(args.latency_ms / 1000, args.per_input_ms / 1000)
+    generator.client = SimpleNamespace(embeddings=api)
+    generator.batcher.max_batch_size = max_batch_size
+    generator.batcher.max_wait_seconds = args.max_wait_ms / 1000
+    
+    latencies = []
+    
+    async def one(text: str) -> None:
+        start = time.perf_counter()
+        await generator.generate(text)
+        latencies.append(time.perf_counter() - start)
+    
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for burst in range(args.bursts):
+        # Messages in a burst arrive spread over a few milliseconds
+        tasks = []
+        for i in range(args.burst_size):
+            tasks.append(asyncio.create_task(one(f"burst {burst} message {i}")))
+            await asyncio.sleep(rng.random() * args.arrival_jitter_ms / 1000 / args.burst_size)
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "texts": len(latencies),
+        "requests": api.requests,
+        "inputs_per_request": round(api.inputs / api.requests, 1),
+        "wall_s": round(elapsed, 3),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+    }
+
+
+async def _run(args) -> dict:
+    return {
+        "unbatched": await _run_mode(args, max_batch_size=1),
+        "batched": await _run_mode(args, max_batch_size=args.max_batch_size),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--burst-size", type=int, default=100)
+    parser.add_argument("--arrival-jitter-ms", type=float, default=50.0, help="Spread of one burst")
+    parser.add_argument("--latency-ms", type=float, default=120.0, help="Fake API latency per request")
+    parser.add_argument("--per-input-ms", type=float, default=0.5, help="Extra fake latency per input")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=15.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+    
+    configure_env()
+    report = asyncio.run(_run(args))
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for mode, row in report.items():
+        print(
+            f"{mode:>10}: texts={row['texts']} requests={row['requests']} "
+            f"inputs/request={row['inputs_per_request']} wall={row['wall_s']:.2f}s "
+            f"p50={row['p50_ms']:.0f}ms p95={row['p95_ms']:.0f}ms"
+        )
+    ratio = report["unbatched"]["requests"] / report["batched"]["requests"]
+    print(f"  request reduction: {ratio:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
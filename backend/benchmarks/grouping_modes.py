@@ -0,0 +1,126 @@
+"""
+Benchmark: pairwise vs listwise AI grouping
+
+Replays recorded classifier responses and latencies from
+fixtures/grouping_cases.json through GroupingEngine's pairwise and listwise
+paths, and reports wall-clock latency, chat completion count, estimated
+tokens and agreement with the expected ticket.
+
+Usage (from project root):
+    python -m backend.benchmarks.grouping_modes --time-scale 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from backend.benchmarks.common import configure_env, estimate_tokens
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "grouping_cases.json")
+
+
+class ReplayChatClient:
+    """Stands in for AsyncOpenAI, answering from a recorded fixture case"""
+    
+    def __init__(self, case: Dict[str, Any], candidates, time_scale: float):
+        self.case = case
+        self.candidates = candidates
+        self.time_scale = time_scale
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    async def _create(self, messages, **kwargs):
+        self.calls += 1
+        prompt = "\n".join(m["content"] for m in messages)
+        self.prompt_tokens += estimate_tokens(prompt)
+        
+        if "Open tickets:" in messages[-1]["content"]:
+            recorded = self.case["listwise"]
+        else:
+            # Pairwise prompts carry the candidate title
+            candidate = next(c for c in self.candidates if f'"{c["title"]}"' in prompt)
+            recorded = self.case["pairwise"][candidate["id"]]
+        
+        await asyncio.sleep(recorded["latency_ms"] / 1000 * self.time_scale)
+        content = json.dumps(recorded["response"])
+        self.completion_tokens += estimate_tokens(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+async def _run(time_scale: float) -> Dict[str, Any]:
+    from backend.processing.grouping_engine import GroupingEngine
+    
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+    candidates = fixtures["candidates"]
+    first_messages = {c["id"]: c["first_message"] for c in candidates}
+    tickets = [{"id": c["id"], "title": c["title"]} for c in candidates]
+    
+    async def get_by_ticket(ticket_id):
+        return [{"text": first_messages[ticket_id]}]
+    
+    report = {}
+    for mode in ("pairwise", "listwise"):
+        totals = {"latency_s": 0.0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "correct": 0}
+        for case in fixtures["cases"]:
+            engine = GroupingEngine()
+            client = ReplayChatClient(case, candidates, time_scale)
+            engine.grouping_classifier.client = client
+            engine.message_repo.get_by_ticket = get_by_ticket
+            
+            start = time.perf_counter()
+            if mode == "listwise":
+                ticket = await engine._find_by_listwise(case["message"], tickets)
+            else:
+                ticket = await engine._find_by_pairwise(case["message"], tickets)
+            totals["latency_s"] += time.perf_counter() - start
+            
+            totals["calls"] += client.calls
+            totals["prompt_tokens"] += client.prompt_tokens
+            totals["completion_tokens"] += client.completion_tokens
+            totals["correct"] += int((ticket or {}).get("id") == case["expected"])
+        
+        n = len(fixtures["cases"])
+        report[mode] = {
+            "cases": n,
+            "mean_latency_ms": round(totals["latency_s"] / n * 1000 / time_scale, 1),
+            "calls_per_message": totals["calls"] / n,
+            "prompt_tokens_per_message": totals["prompt_tokens"] / n,
+            "completion_tokens_per_message": totals["completion_tokens"] / n,
+            "accuracy": totals["correct"] / n,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0,
+        help="Multiplier on recorded latencies (reported latency is rescaled back)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+    
+    configure_env()
+    report = asyncio.run(_run(args.time_scale))
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for mode, row in report.items():
+        print(
+            f"{mode:>9}: latency={row['mean_latency_ms']:.0f}ms "
+            f"calls={row['calls_per_message']:.1f} "
+            f"prompt_tokens={row['prompt_tokens_per_message']:.0f} "
+            f"completion_tokens={row['completion_tokens_per_message']:.0f} "
+            f"accuracy={row['accuracy']:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
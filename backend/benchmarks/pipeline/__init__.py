@@ -0,0 +1 @@
+# Offline pipeline benchmark (fakes, workloads, runner)
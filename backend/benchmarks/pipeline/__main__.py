@@ -0,0 +1,250 @@
+"""
+Benchmark: end-to-end MessageProcessor pipeline against local fakes
+
+Replays a synthetic workload (see workloads.py) through IngestionQueue and
+MessageProcessor with OpenAI, Supabase/PostgREST and the Slack Web API
+replaced by in-process fakes with log-normal latencies (see fakes.py).
+Nothing leaves the process.
+
+Reports p50/p95/p99 end-to-end latency (scheduled arrival -> processing
+finished, so queueing and backpressure count), throughput, and external
+calls per stage. With --output the report is written as JSON (one object,
+stable keys) so runs can be compared over time.
+
+Usage (from project root):
+    python -m backend.benchmarks.pipeline --workload bursty --messages 500 --rate 50
+    python -m backend.benchmarks.pipeline --workload duplicates --chat-ms 300,900 \\
+        --set INGEST_PROCEDURE_ENABLED=true --output bench.json
+    python -m backend.benchmarks.pipeline --workload bursty --rate 80 --chat-rps 20
+    python -m backend.benchmarks.pipeline --workload rapid_fire --set COALESCE_WINDOW_SECONDS=2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backend.benchmarks.common import configure_env
+
+# Settings included in every report (what the run was configured with)
+REPORTED_SETTINGS = (
+    "CLASSIFICATION_MODE",
+    "PREFILTER_ENABLED",
+    "AI_GROUPING_MODE",
+    "INGEST_PROCEDURE_ENABLED",
+    "TICKET_WRITE_BEHIND_SECONDS",
+    "INGESTION_WORKERS",
+    "EMBEDDING_BATCH_MAX_SIZE",
+    "EMBEDDING_BATCH_MAX_WAIT_MS",
+    "METRICS_ENABLED",
+    "COALESCE_WINDOW_SECONDS",
+    "DEDUP_EXCLUSIVE_WRITER",
+)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--workload", choices=["bursty", "channels", "duplicates", "rapid_fire"], default="bursty")
+    parser.add_argument("--messages", type=int, default=300, help="Original messages in the workload")
+    parser.add_argument("--rate", type=float, default=30.0, help="Mean arrivals per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chat-ms", default="400,1200", help="Chat completion latency P50[,P95]")
+    parser.add_argument("--embed-ms", default="150,400", help="Embeddings request latency P50[,P95]")
+    parser.add_argument("--db-ms", default="15,60", help="PostgREST request latency P50[,P95]")
+    parser.add_argument("--slack-ms", default="80,250", help="Slack Web API latency P50[,P95]")
+    parser.add_argument("--chat-rps", type=float, default=0,
+                        help="Fake API answers chat requests above this rate with 429 (0 = unlimited)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a backend setting for this run; repeatable")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of a summary")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples)
+    return {
+        "count": len(samples),
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p95": round(float(np.percentile(values, 95)), 1),
+        "p99": round(float(np.percentile(values, 99)), 1),
+        "mean": round(float(values.mean()), 1),
+        "max": round(float(values.max()), 1),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # Backend modules read settings at import time, so they are imported here
+    from backend.config import settings
+    from backend.database import tickets, messages, history
+    from backend.ai.openai_client import openai_client
+    from backend.processing.ingestion import IngestionQueue
+    from backend.processing.message_processor import MessageProcessor
+    from backend.benchmarks.pipeline import fakes, workloads
+    
+    rng = random.Random(args.seed)
+    recorder = fakes.CallRecorder()
+    latencies = {
+        "chat": fakes.LatencyModel.parse(args.chat_ms, random.Random(rng.random())),
+        "embeddings": fakes.LatencyModel.parse(args.embed_ms, random.Random(rng.random())),
+        "db": fakes.LatencyModel.parse(args.db_ms, random.Random(rng.random())),
+        "slack": fakes.LatencyModel.parse(args.slack_ms, random.Random(rng.random())),
+    }
+    db = fakes.FakeSupabase(recorder, latencies["db"])
+    for module in (tickets, messages, history):
+        module.async_supabase_client = db
+    openai = fakes.FakeOpenAI(recorder, latencies["chat"], latencies["embeddings"], args.chat_rps)
+    # Behind the shared client, so rate limiting and retries are part of the run
+    openai_client.client = openai
+    slack = fakes.FakeSlackClient(recorder, latencies["slack"])
+    
+    processor = MessageProcessor()
+    
+    items = workloads.WORKLOADS[args.workload](args.messages, args.rate, seed=args.seed)
+    
+    # End-to-end latency: scheduled arrival -> process_message (or process_burst) returned
+    arrivals: Dict[int, float] = {}
+    samples = {"original": [], "redelivery": []}
+    kinds: Dict[int, str] = {}
+    process_message = processor.process_message
+    
+    async def timed_process(event, slack_client, **kwargs):
+        try:
+            return await process_message(event, slack_client, **kwargs)
+        finally:
+            samples[kinds[id(event)]].append((time.monotonic() - arrivals[id(event)]) * 1000)
+    
+    processor.process_message = timed_process
+    process_burst = processor.process_burst
+    
+    async def timed_burst(events, slack_client):
+        try:
+            return await process_burst(events, slack_client)
+        finally:
+            # A single event went through process_message, which timed it already
+            for event in events if len(events) > 1 else ():
+                samples[kinds[id(event)]].append((time.monotonic() - arrivals[id(event)]) * 1000)
+    
+    processor.process_burst = timed_burst
+    
+    await processor.warm_up()
+    queue = IngestionQueue(processor)
+    await queue.start()
+    
+    started = time.monotonic()
+    for at, event, redelivery in items:
+        delay = started + at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        arrivals[id(event)] = started + at
+        kinds[id(event)] = "redelivery" if redelivery else "original"
+        await queue.submit(event, slack)
+    await queue.stop(drain=True)
+    elapsed = time.monotonic() - started
+    
+    await processor.close()
+    await processor.grouper.ticket_index.stop()
+    
+    return {
+        "schema_version": 1,
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "workload": {
+            "name": args.workload,
+            "messages": args.messages,
+            "events": len(items),
+            "redeliveries": sum(1 for _, _, redelivery in items if redelivery),
+            "rate": args.rate,
+            "seed": args.seed,
+            "chat_rps_limit": args.chat_rps,
+        },
+        "latency_models": {name: model.describe() for name, model in latencies.items()},
+        "settings": {name: getattr(settings, name) for name in REPORTED_SETTINGS},
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_events_per_second": round(len(items) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "all": percentiles(samples["original"] + samples["redelivery"]),
+            "original": percentiles(samples["original"]),
+            "redelivery": percentiles(samples["redelivery"]),
+        },
+        "calls": recorder.report(),
+        "outcome": {
+            "tickets": len(db.tables["tickets"]),
+            "messages_stored": len(db.tables["messages"]),
+            # Inserts rejected by unique constraints (duplicate message / thread ticket)
+            "constraint_violations": db.constraint_violations,
+            "failed": queue.metrics["failed"],
+        },
+        "queue": queue.stats(),
+        "llm_usage": processor.llm_usage(),
+        "openai_client": {
+            **openai_client.stats,
+            "concurrency_limits": {
+                model: int(limiter.concurrency.limit) for model, limiter in openai_client.limiters.items()
+            },
+        },
+    }
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    print(f"Workload: {report['workload']['name']} ({report['workload']['events']} events, "
+          f"{report['workload']['redeliveries']} redeliveries)")
+    print(f"Throughput: {report['throughput_events_per_second']} events/s "
+          f"over {report['elapsed_seconds']}s")
+    for kind in ("all", "original", "redelivery"):
+        stats = latency[kind]
+        if stats["count"]:
+            print(f"Latency [{kind:>10}] p50={stats['p50']}ms p95={stats['p95']}ms "
+                  f"p99={stats['p99']}ms max={stats['max']}ms (n={stats['count']})")
+    print("External calls:")
+    for name, stats in report["calls"].items():
+        print(f"  {name:<40} {stats['calls']:>7}  {stats['simulated_ms']:>12.1f} ms")
+    print(f"Outcome: {report['outcome']}")
+    print(f"OpenAI client: {report['openai_client']}")
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    configure_env()
+    # No disk embedding cache: a run must not reuse vectors from earlier runs
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+    os.environ.setdefault("EVENT_JOURNAL_PATH", "")
+    for override in args.set:
+        key, _, value = override.partition("=")
+        os.environ[key] = value
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+    
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_summary(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+"""
+In-process fakes for OpenAI, Supabase/PostgREST and the Slack Web API
+
+Each fake sleeps for a latency drawn from a LatencyModel and records the
+call in a shared CallRecorder under a "<service>.<stage>" name, so a run
+reports how many external calls every pipeline stage made and how much
+simulated time they cost.
+"""
+import asyncio
+import copy
+import json
+import math
+import random
+import re
+import uuid
+import time
+import zlib
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import openai
+
+from backend.benchmarks.common import estimate_tokens
+
+EMBEDDING_DIM = 1536
+
+WORD = re.compile(r"[a-z']+")
+
+CHIT_CHAT = {"thanks", "thank", "sounds", "good", "morning", "lunch", "weekend", "cheers", "okay"}
+
+
+class LatencyModel:
+    """
+    Log-normal latency given its median and 95th percentile (milliseconds)
+    
+    p95 == p50 gives a constant latency; 0 disables sleeping entirely.
+    """
+    
+    def __init__(self, p50_ms: float, p95_ms: Optional[float] = None, rng: Optional[random.Random] = None):
+        self.p50_ms = p50_ms
+        self.p95_ms = p50_ms if p95_ms is None else max(p95_ms, p50_ms)
+        self.rng = rng or random.Random(0)
+        self.sigma = (
+            (math.log(self.p95_ms) - math.log(self.p50_ms)) / 1.645
+            if self.p50_ms > 0 and self.p95_ms > self.p50_ms else 0.0
+        )
+    
+    @classmethod
+    def parse(cls, spec: str, rng: Optional[random.Random] = None) -> "LatencyModel":
+        """"P50" or "P50,P95" in milliseconds"""
+        parts = [float(part) for part in spec.split(",")]
+        return cls(parts[0], parts[1] if len(parts) > 1 else None, rng)
+    
+    def sample_ms(self) -> float:
+        if self.p50_ms <= 0:
+            return 0.0
+        if self.sigma == 0:
+            return self.p50_ms
+        return self.rng.lognormvariate(math.log(self.p50_ms), self.sigma)
+    
+    async def wait(self) -> float:
+        latency_ms = self.sample_ms()
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+        return latency_ms
+    
+    def describe(self) -> Dict[str, float]:
+        return {"p50_ms": self.p50_ms, "p95_ms": self.p95_ms}
+
+
+class CallRecorder:
+    """Call counts and simulated latency per "<service>.<stage>" name"""
+    
+    def __init__(self):
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.latency_ms: Dict[str, float] = defaultdict(float)
+    
+    def record(self, name: str, latency_ms: float) -> None:
+        self.calls[name] += 1
+        self.latency_ms[name] += latency_ms
+    
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"calls": self.calls[name], "simulated_ms": round(self.latency_ms[name], 1)}
+            for name in sorted(self.calls)
+        }
+
+
+def content_words(text: str) -> List[str]:
+    return [word for word in WORD.findall(text.lower()) if len(word) > 3]
+
+
+def fake_embedding(text: str) -> List[float]:
+    """Deterministic bag-of-words vector: texts sharing words get high cosine similarity"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in content_words(text):
+        digest = zlib.crc32(word.encode())
+        vector[digest % EMBEDDING_DIM] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        vector[0] = 1.0
+        norm = 1.0
+    return (vector / norm).tolist()
+
+
+def _overlap(a: str, b: str) -> int:
+    return len(set(content_words(a)) & set(content_words(b)))
+
+
+class FakeOpenAI:
+    """
+    AsyncOpenAI stand-in (chat completions + embeddings)
+    
+    Chat answers are derived from the prompt type: classification (single,
+    fused or batch), pairwise/listwise grouping and title generation. Messages
+    are relevant unless they are short or chit-chat; grouping says "same" when
+    the texts share at least two content words.
+    
+    With `chat_requests_per_second` set, chat requests beyond that many in
+    any one-second window are answered with a 429 (like the real API under
+    a burst) and recorded as "openai.rate_limited".
+    """
+    
+    def __init__(
+        self,
+        recorder: CallRecorder,
+        chat_latency: LatencyModel,
+        embedding_latency: LatencyModel,
+        chat_requests_per_second: float = 0
+    ):
+        self.recorder = recorder
+        self.chat_latency = chat_latency
+        self.embedding_latency = embedding_latency
+        self.chat_requests_per_second = chat_requests_per_second
+        self._chat_window: deque = deque()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.embeddings = SimpleNamespace(create=self._embed)
+    
+    def _check_rate_limit(self) -> None:
+        if self.chat_requests_per_second <= 0:
+            return
+        now = time.monotonic()
+        while self._chat_window and now - self._chat_window[0] >= 1.0:
+            self._chat_window.popleft()
+        if len(self._chat_window) >= self.chat_requests_per_second:
+            self.recorder.record("openai.rate_limited", 0.0)
+            response = httpx.Response(
+                429,
+                headers={"retry-after-ms": f"{(1.0 - (now - self._chat_window[0])) * 1000:.0f}"},
+                request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            )
+            raise openai.RateLimitError("Rate limit reached", response=response, body=None)
+        self._chat_window.append(now)
+    
+    async def _chat(self, messages, **kwargs):
+        self._check_rate_limit()
+        system = messages[0]["content"]
+        text = messages[-1]["content"]
+        if '"results"' in system:
+            stage, content = "classify_batch", self._classify_batch(text)
+        elif '"is_relevant"' in system:
+            stage, content = "classify", json.dumps(self._classify(text, '"title"' in system))
+        elif '"is_same_issue"' in system:
+            stage, content = "grouping_pairwise", self._pairwise(text)
+        elif '"ticket"' in system:
+            stage, content = "grouping_listwise", self._listwise(text)
+        else:
+            stage, content = "title", self._title(text)
+        
+        latency_ms = await self.chat_latency.wait()
+        self.recorder.record(f"openai.{stage}", latency_ms)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=estimate_tokens(system + text),
+                completion_tokens=estimate_tokens(content)
+            )
+        )
+    
+    async def _embed(self, model: str, input: List[str], **kwargs):
+        latency_ms = await self.embedding_latency.wait()
+        self.recorder.record("openai.embeddings", latency_ms)
+        self.recorder.calls["openai.embedding_inputs"] += len(input)
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=fake_embedding(text)) for i, text in enumerate(input)]
+        )
+    
+    @staticmethod
+    def _classify(text: str, with_title: bool) -> Dict[str, Any]:
+        words = content_words(text)
+        relevant = len(words) >= 3 and not (set(words) & CHIT_CHAT)
+        lower = text.lower()
+        if not relevant:
+            category = None
+        elif any(word in lower for word in ("broken", "error", "fails", "crash")):
+            category = "bug"
+        elif any(word in lower for word in ("please add", "would be great", "feature")):
+            category = "feature"
+        elif "how do" in lower:
+            category = "support"
+        else:
+            category = "question"
+        result = {
+            "is_relevant": relevant,
+            "category": category,
+            "confidence": 0.9,
+            "reasoning": "benchmark fake",
+        }
+        if with_title:
+            result["title"] = " ".join(words[:4]).title() if relevant else None
+        return result
+    
+    def _classify_batch(self, text: str) -> str:
+        parts = re.split(r"(?:^|\n\n)\[(\d+)\] ", text)
+        results = []
+        for i in range(1, len(parts) - 1, 2):
+            results.append({"index": int(parts[i]), **self._classify(parts[i + 1], True)})
+        return json.dumps({"results": results})
+    
+    @staticmethod
+    def _pairwise(text: str) -> str:
+        quoted = re.findall(r'Message \d: "(.*?)"\n', text, re.S)
+        same = len(quoted) == 2 and _overlap(quoted[0], quoted[1]) >= 2
+        return json.dumps({"is_same_issue": same, "confidence": 0.9 if same else 0.8, "reasoning": "benchmark fake"})
+    
+    @staticmethod
+    def _listwise(text: str) -> str:
+        new_message = re.search(r'New message: "(.*?)"\n', text, re.S)
+        best, best_overlap = None, 1
+        for match in re.finditer(r'(\d+)\. Title: "(.*?)"\n\s+First message: "(.*?)"', text, re.S):
+            overlap = _overlap(new_message.group(1) if new_message else "", match.group(2) + " " + match.group(3))
+            if overlap > best_overlap:
+                best, best_overlap = int(match.group(1)), overlap
+        return json.dumps({"ticket": best, "confidence": 0.9, "reasoning": "benchmark fake"})
+    
+    @staticmethod
+    def _title(text: str) -> str:
+        return " ".join(content_words(text)[:4]).title() or "Customer Request"
+
+
+class FakeResult(SimpleNamespace):
+    pass
+
+
+class FakeQuery:
+    """Enough of the PostgREST query builder for the repositories"""
+    
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload: Any = None
+        self.columns = "*"
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.order_by: Optional[Tuple[str, bool]] = None
+        self.row_limit: Optional[int] = None
+        self.row_range: Optional[Tuple[int, int]] = None
+    
+    def select(self, columns: str = "*", **kwargs) -> "FakeQuery":
+        self.columns = columns
+        return self
+    
+    def insert(self, payload) -> "FakeQuery":
+        self.op, self.payload = "insert", payload
+        return self
+    
+    def update(self, payload) -> "FakeQuery":
+        self.op, self.payload = "update", payload
+        return self
+    
+    def eq(self, column: str, value) -> "FakeQuery":
+        self.filters.append(("eq", column, value))
+        return self
+    
+    def gte(self, column: str, value) -> "FakeQuery":
+        self.filters.append(("gte", column, value))
+        return self
+    
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        self.order_by = (column, desc)
+        return self
+    
+    def limit(self, count: int) -> "FakeQuery":
+        self.row_limit = count
+        return self
+    
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.row_range = (start, end)
+        return self
+    
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        for op, column, value in self.filters:
+            if op == "eq" and row.get(column) != value:
+                return False
+            if op == "gte" and (row.get(column) is None or str(row[column]) < str(value)):
+                return False
+        return True
+    
+    async def execute(self) -> FakeResult:
+        latency_ms = await self.db.latency.wait()
+        self.db.recorder.record(f"supabase.{self.table}.{self.op}", latency_ms)
+        return FakeResult(data=self.db.run_query(self))
+
+
+class FakeSupabase:
+    """
+    In-memory tickets/messages tables behind the AsyncClient interface
+    
+    Mirrors the schema behaviour the pipeline relies on: generated ids and
+    timestamps, the unique (channel_id, first_message_ts) and slack_message_id
+    constraints, the increment_ticket_message_count trigger, and the
+    find_similar_tickets / ingest_message functions.
+    """
+    
+    def __init__(self, recorder: CallRecorder, latency: LatencyModel):
+        self.recorder = recorder
+        self.latency = latency
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {
+            "tickets": {},
+            "messages": {},
+            "ticket_history": {},
+        }
+        self.thread_index: Dict[Tuple[str, str], str] = {}
+        self.slack_ids: set = set()
+        self.constraint_violations = 0
+    
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+    
+    def rpc(self, name: str, params: Dict[str, Any]):
+        db = self
+        
+        class _Call:
+            async def execute(self) -> FakeResult:
+                latency_ms = await db.latency.wait()
+                db.recorder.record(f"supabase.rpc.{name}", latency_ms)
+                return FakeResult(data=getattr(db, f"_rpc_{name}")(**params))
+        
+        return _Call()
+    
+    # -- table operations ---------------------------------------------------
+    
+    def run_query(self, query: FakeQuery) -> List[Dict[str, Any]]:
+        rows = self.tables.setdefault(query.table, {})
+        if query.op == "insert":
+            payload = query.payload if isinstance(query.payload, list) else [query.payload]
+            return [self._insert(query.table, dict(row)) for row in payload]
+        if query.op == "update":
+            updated = []
+            for row in rows.values():
+                if query._matches(row):
+                    row.update(copy.deepcopy(query.payload))
+                    if query.table == "tickets":
+                        row["updated_at"] = _now()
+                    updated.append(copy.deepcopy(row))
+            return updated
+        
+        result = [row for row in rows.values() if query._matches(row)]
+        if query.order_by:
+            column, desc = query.order_by
+            result.sort(key=lambda row: str(row.get(column) or ""), reverse=desc)
+        if query.row_range:
+            start, end = query.row_range
+            result = result[start:end + 1]
+        if query.row_limit is not None:
+            result = result[:query.row_limit]
+        if query.columns != "*":
+            columns = [column.strip() for column in query.columns.split(",")]
+            return [{column: row.get(column) for column in columns} for row in result]
+        return [copy.deepcopy(row) for row in result]
+    
+    def _insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        now = _now()
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", now)
+        if table == "tickets":
+            key = (row["channel_id"], row["first_message_ts"])
+            if key in self.thread_index:
+                self.constraint_violations += 1
+                raise Exception('duplicate key value violates unique constraint "unique_thread"')
+            row.setdefault("status", "open")
+            row.setdefault("message_count", 0)
+            row.setdefault("updated_at", now)
+            self.thread_index[key] = row["id"]
+        elif table == "messages":
+            if row["slack_message_id"] in self.slack_ids:
+                self.constraint_violations += 1
+                raise Exception('duplicate key value violates unique constraint "messages_slack_message_id_key"')
+            self.slack_ids.add(row["slack_message_id"])
+            # increment_ticket_message_count trigger
+            ticket = self.tables["tickets"].get(row.get("ticket_id"))
+            if ticket is not None:
+                ticket["message_count"] = ticket.get("message_count", 0) + 1
+                ticket["updated_at"] = now
+                ticket["last_user_id"] = row.get("user_id")
+                ticket["last_user_name"] = row.get("user_name")
+        self.tables[table][row["id"]] = row
+        return copy.deepcopy(row)
+    
+    # -- functions ----------------------------------------------------------
+    
+    def _open_tickets(self, channel_id: str) -> List[Dict[str, Any]]:
+        return [
+            ticket for ticket in self.tables["tickets"].values()
+            if ticket["channel_id"] == channel_id and ticket.get("status") == "open"
+        ]
+    
+    @staticmethod
+    def _similarity(embedding: List[float], ticket: Dict[str, Any]) -> float:
+        vector = ticket.get("embedding")
+        if not vector:
+            return 0.0
+        return float(np.dot(np.asarray(embedding, dtype=np.float32), np.asarray(vector, dtype=np.float32)))
+    
+    def _rpc_find_similar_tickets(
+        self,
+        query_embedding,
+        similarity_threshold,
+        time_window_minutes,
+        channel_filter,
+        max_results
+    ) -> List[Dict[str, Any]]:
+        cutoff = (datetime.now(timezone.utc) - timedelta(minutes=time_window_minutes)).isoformat()
+        scored = []
+        for ticket in self._open_tickets(channel_filter):
+            if ticket["created_at"] < cutoff:
+                continue
+            similarity = self._similarity(query_embedding, ticket)
+            if similarity >= similarity_threshold:
+                scored.append({**copy.deepcopy(ticket), "similarity": similarity})
+        scored.sort(key=lambda ticket: -ticket["similarity"])
+        return scored[:max_results]
+    
+    def _rpc_ingest_message(
+        self,
+        p_slack_message_id,
+        p_channel_id,
+        p_thread_key,
+        p_embedding,
+        p_message,
+        p_ticket_id=None,
+        p_new_ticket=None,
+        p_candidate_hours=24,
+        p_candidate_limit=10
+    ) -> Dict[str, Any]:
+        from backend.processing import ticket_digest
+        
+        if p_slack_message_id in self.slack_ids:
+            return {"status": "duplicate"}
+        
+        tickets = self.tables["tickets"]
+        ticket = tickets.get(p_ticket_id) if p_ticket_id else None
+        if ticket is not None and ticket.get("status") != "open":
+            ticket = None
+        if ticket is None:
+            ticket_id = self.thread_index.get((p_channel_id, p_thread_key))
+            ticket = tickets.get(ticket_id) if ticket_id else None
+            if ticket is not None and ticket.get("status") != "open":
+                ticket = None
+        
+        if ticket is None and p_new_ticket is None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(hours=p_candidate_hours)).isoformat()
+            candidates = [t for t in self._open_tickets(p_channel_id) if t["created_at"] >= cutoff]
+            candidates.sort(key=lambda t: t["updated_at"], reverse=True)
+            return {"status": "candidates", "candidates": [
+                {
+                    **{k: v for k, v in copy.deepcopy(t).items() if k != "embedding"},
+                    "first_message": ticket_digest.first_message_text(t.get("digest")),
+                    "similarity": self._similarity(p_embedding, t),
+                }
+                for t in candidates[:p_candidate_limit]
+            ]}
+        
+        created = False
+        if ticket is None:
+            closed_id = self.thread_index.get((p_channel_id, p_thread_key))
+            if closed_id is not None:
+                closed = {k: v for k, v in copy.deepcopy(tickets[closed_id]).items() if k != "embedding"}
+                return {"status": "closed", "ticket": closed}
+            ticket = self._insert("tickets", {
+                "title": p_new_ticket.get("title"),
+                "category": p_new_ticket.get("category"),
+                "channel_id": p_channel_id,
+                "channel_name": p_message.get("channel_name"),
+                "first_message_ts": p_thread_key,
+                "embedding": p_embedding,
+            })
+            ticket = tickets[ticket["id"]]
+            created = True
+        
+        message = self._insert("messages", {
+            "ticket_id": ticket["id"],
+            "slack_message_id": p_slack_message_id,
+            "channel_id": p_channel_id,
+            **{k: p_message.get(k) for k in ("text", "user_id", "user_name", "thread_ts", "message_ts", "category")},
+        })
+        ticket["digest"] = ticket_digest.append_message(
+            ticket.get("digest"),
+            text=message["text"],
+            user_name=message["user_name"],
+            category=message["category"]
+        )
+        if p_message.get("channel_name"):
+            ticket["channel_name"] = p_message["channel_name"]
+        return {
+            "status": "stored",
+            "created": created,
+            "ticket": {k: v for k, v in copy.deepcopy(ticket).items() if k != "embedding"},
+            "message": message,
+        }
+
+
+class FakeSlackClient:
+    """Slack AsyncWebClient stand-in for the name lookups"""
+    
+    def __init__(self, recorder: CallRecorder, latency: LatencyModel):
+        self.recorder = recorder
+        self.latency = latency
+    
+    async def _call(self, method: str, payload: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        latency_ms = await self.latency.wait()
+        self.recorder.record(f"slack.{method}", latency_ms)
+        return {"ok": True, **payload()}
+    
+    async def users_info(self, user: str, **kwargs):
+        return await self._call("users_info", lambda: {
+            "user": {"id": user, "name": user.lower(), "profile": {"display_name": f"User {user}"}}
+        })
+    
+    async def conversations_info(self, channel: str, **kwargs):
+        return await self._call("conversations_info", lambda: {
+            "channel": {"id": channel, "name": channel.lower()}
+        })
+    
+    async def users_list(self, **kwargs):
+        return await self._call("users_list", lambda: {"members": [], "response_metadata": {}})
+    
+    async def conversations_list(self, **kwargs):
+        return await self._call("conversations_list", lambda: {"channels": [], "response_metadata": {}})
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,198 @@
+"""
+Synthetic Slack message workloads for the pipeline benchmark
+
+A workload is a list of (arrival offset in seconds, event, is_redelivery),
+sorted by arrival. Message timestamps start at the current time, like live
+traffic (so the de-duplication warm-up window covers them). Texts are built from per-topic vocabularies so messages
+about the same topic embed close together (see fakes.fake_embedding) and
+exercise every grouping band; a share of messages is chit-chat.
+"""
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+WorkloadItem = Tuple[float, Dict[str, Any], bool]
+
+TOPICS = [
+    ("login", "mobile", "button", "broken"),
+    ("export", "csv", "download", "fails"),
+    ("invoice", "billing", "amount", "wrong"),
+    ("dashboard", "chart", "loading", "slow"),
+    ("webhook", "delivery", "retry", "error"),
+    ("password", "reset", "email", "missing"),
+    ("search", "results", "filter", "empty"),
+    ("permissions", "admin", "role", "access"),
+    ("report", "schedule", "weekly", "feature"),
+    ("integration", "salesforce", "sync", "crash"),
+]
+
+DETAILS = [
+    "customer", "since", "yesterday", "production", "staging", "today", "again",
+    "multiple", "users", "account", "workspace", "update", "version", "release",
+]
+
+CHIT_CHAT_TEXTS = ["thanks!", "sounds good", "ok", "good morning team", "lunch?", "cheers"]
+
+
+def _text(rng: random.Random, topic: Tuple[str, ...], chit_chat_ratio: float) -> str:
+    if rng.random() < chit_chat_ratio:
+        return rng.choice(CHIT_CHAT_TEXTS)
+    words = list(topic[:rng.randint(3, 4)]) + rng.sample(DETAILS, rng.randint(1, 3))
+    rng.shuffle(words)
+    return "Hey, " + " ".join(words) + " - can someone look?"
+
+
+def _event(channel: str, user: str, ts: float, text: str, thread_ts: str = None) -> Dict[str, Any]:
+    event = {
+        "type": "message",
+        "channel": channel,
+        "user": user,
+        "text": text,
+        "ts": f"{ts:.6f}",
+    }
+    if thread_ts:
+        event["thread_ts"] = thread_ts
+    return event
+
+
+def bursty_threads(
+    messages: int,
+    rate: float,
+    channels: int = 3,
+    burst_size: int = 8,
+    burst_gap_seconds: float = 0.05,
+    chit_chat_ratio: float = 0.15,
+    seed: int = 0
+) -> List[WorkloadItem]:
+    """
+    Threads that receive their replies in tight bursts
+    
+    Thread roots arrive as a Poisson process; each root is followed by up to
+    `burst_size` replies `burst_gap_seconds` apart, so replies of one thread
+    pile up in its ingestion lane.
+    """
+    rng = random.Random(seed)
+    base_ts = float(int(time.time()))
+    items: List[WorkloadItem] = []
+    at = 0.0
+    roots_per_second = rate / (1 + burst_size)
+    while len(items) < messages:
+        at += rng.expovariate(roots_per_second)
+        channel = f"C{rng.randrange(channels):04d}"
+        topic = rng.choice(TOPICS)
+        root_ts = base_ts + at
+        root = _event(channel, f"U{rng.randrange(50):03d}", root_ts, _text(rng, topic, 0.0))
+        items.append((at, root, False))
+        for i in range(1, rng.randint(1, burst_size) + 1):
+            if len(items) >= messages:
+                break
+            reply_at = at + i * burst_gap_seconds
+            items.append((reply_at, _event(
+                channel, f"U{rng.randrange(50):03d}", base_ts + reply_at,
+                _text(rng, topic, chit_chat_ratio), thread_ts=root["ts"]
+            ), False))
+    return sorted(items, key=lambda item: item[0])
+
+
+def many_channels(
+    messages: int,
+    rate: float,
+    channels: int = 200,
+    reply_ratio: float = 0.3,
+    chit_chat_ratio: float = 0.2,
+    seed: int = 0
+) -> List[WorkloadItem]:
+    """
+    Steady Poisson traffic spread over many channels
+    
+    Most messages are new roots (fresh topics per channel), `reply_ratio` of
+    them reply to an earlier root in the same channel.
+    """
+    rng = random.Random(seed)
+    base_ts = float(int(time.time()))
+    roots: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+    items: List[WorkloadItem] = []
+    at = 0.0
+    for _ in range(messages):
+        at += rng.expovariate(rate)
+        channel = f"C{rng.randrange(channels):04d}"
+        user = f"U{rng.randrange(500):03d}"
+        previous = roots.get(channel)
+        if previous and rng.random() < reply_ratio:
+            thread_ts, topic = rng.choice(previous[-5:])
+            event = _event(channel, user, base_ts + at, _text(rng, topic, chit_chat_ratio), thread_ts)
+        else:
+            topic = rng.choice(TOPICS)
+            event = _event(channel, user, base_ts + at, _text(rng, topic, chit_chat_ratio))
+            roots.setdefault(channel, []).append((event["ts"], topic))
+        items.append((at, event, False))
+    return items
+
+
+def rapid_fire(
+    messages: int,
+    rate: float,
+    channels: int = 20,
+    max_burst: int = 5,
+    max_gap_seconds: float = 1.5,
+    seed: int = 0
+) -> List[WorkloadItem]:
+    """
+    Users typing one thought as several consecutive messages
+    
+    Each turn is 1-`max_burst` top-level messages from one user about one
+    topic, up to `max_gap_seconds` apart (what burst coalescing targets);
+    about a third of the turns are a single message.
+    """
+    rng = random.Random(seed)
+    base_ts = float(int(time.time()))
+    items: List[WorkloadItem] = []
+    at = 0.0
+    turns_per_second = rate / ((1 + max_burst) / 2)
+    while len(items) < messages:
+        at += rng.expovariate(turns_per_second)
+        channel = f"C{rng.randrange(channels):04d}"
+        user = f"U{rng.randrange(200):03d}"
+        topic = rng.choice(TOPICS)
+        sent_at = at
+        for _ in range(1 if rng.random() < 0.33 else rng.randint(2, max_burst)):
+            if len(items) >= messages:
+                break
+            items.append((sent_at, _event(channel, user, base_ts + sent_at, _text(rng, topic, 0.1)), False))
+            sent_at += rng.uniform(0.2, max_gap_seconds)
+    return sorted(items, key=lambda item: item[0])
+
+
+def with_redeliveries(
+    items: List[WorkloadItem],
+    probability: float = 0.2,
+    min_delay_seconds: float = 0.0,
+    max_delay_seconds: float = 3.0,
+    seed: int = 0
+) -> List[WorkloadItem]:
+    """
+    Add Slack-style redeliveries: the same event again after a delay
+    
+    Delays start at 0 so some duplicates arrive while the original is still
+    being processed (the in-flight claim path), others after it is stored.
+    """
+    rng = random.Random(seed + 1)
+    redelivered = [
+        (at + rng.uniform(min_delay_seconds, max_delay_seconds), dict(event), True)
+        for at, event, _ in items
+        if rng.random() < probability
+    ]
+    return sorted(items + redelivered, key=lambda item: item[0])
+
+
+def duplicate_redeliveries(messages: int, rate: float, seed: int = 0) -> List[WorkloadItem]:
+    """Many-channel traffic where ~20% of events are delivered twice"""
+    return with_redeliveries(many_channels(messages, rate, channels=20, seed=seed), seed=seed)
+
+
+WORKLOADS = {
+    "bursty": bursty_threads,
+    "channels": many_channels,
+    "duplicates": duplicate_redeliveries,
+    "rapid_fire": rapid_fire,
+}
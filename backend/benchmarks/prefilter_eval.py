@@ -0,0 +1,97 @@
+"""
+Offline evaluation of the local chit-chat pre-filter
+
+Runs ChitChatPrefilter over labeled fixtures (fixtures/prefilter_labeled.jsonl)
+and reports precision and recall of its rejections, for rules only and for
+rules + n-gram model. Fixtures that match a seed corpus example after
+normalization are excluded (and counted), so the model is never scored on
+its own training data.
+
+A rejection is a positive: precision = rejected messages that really are
+irrelevant, recall = irrelevant messages caught before any network call.
+
+Usage (from project root):
+    python -m backend.benchmarks.prefilter_eval [--show-errors] [--json]
+"""
+import argparse
+import json
+import os
+from typing import Any, Dict, List
+
+from backend.benchmarks.common import configure_env
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "prefilter_labeled.jsonl")
+
+
+def evaluate(prefilter, examples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    tp = fp = fn = tn = 0
+    false_rejections, missed = [], []
+    for example in examples:
+        rejected = prefilter.check(example["text"]) is not None
+        irrelevant = not example["relevant"]
+        if rejected and irrelevant:
+            tp += 1
+        elif rejected:
+            fp += 1
+            false_rejections.append(example["text"])
+        elif irrelevant:
+            fn += 1
+            missed.append(example["text"])
+        else:
+            tn += 1
+    return {
+        "precision": round(tp / (tp + fp), 3) if tp + fp else 1.0,
+        "recall": round(tp / (tp + fn), 3) if tp + fn else 0.0,
+        "rejected": tp + fp,
+        "llm_calls_saved_pct": round((tp + fp) / len(examples) * 100, 1),
+        "false_rejections": false_rejections,
+        "missed": missed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--show-errors", action="store_true", help="List misclassified messages")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+    
+    configure_env()
+    from backend.ai.prefilter import SEED_CORPUS_PATH, ChitChatPrefilter, normalize
+    
+    with open(FIXTURES, encoding="utf-8") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+    with open(SEED_CORPUS_PATH, encoding="utf-8") as f:
+        seed = {normalize(example["text"]) for example in json.load(f)["examples"]}
+    overlapping = [example for example in examples if normalize(example["text"]) in seed]
+    examples = [example for example in examples if normalize(example["text"]) not in seed]
+    
+    report = {
+        "examples": len(examples),
+        "excluded_seed_overlap": len(overlapping),
+        "irrelevant": sum(not e["relevant"] for e in examples),
+        "rules_only": evaluate(ChitChatPrefilter(use_model=False), examples),
+        "rules_and_model": evaluate(ChitChatPrefilter(), examples),
+    }
+    
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    print(
+        f"{report['examples']} labeled messages ({report['irrelevant']} irrelevant, "
+        f"{report['excluded_seed_overlap']} excluded as seed corpus duplicates)"
+    )
+    for mode in ("rules_only", "rules_and_model"):
+        row = report[mode]
+        print(
+            f"{mode:>16}: precision={row['precision']:.3f} recall={row['recall']:.3f} "
+            f"rejected={row['rejected']} ({row['llm_calls_saved_pct']}% of traffic skips the LLM)"
+        )
+        if args.show_errors:
+            for text in row["false_rejections"]:
+                print(f"    false rejection: {text}")
+            for text in row["missed"]:
+                print(f"    missed: {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,18 +12,99 @@ class Settings(BaseSettings):
     SLACK_APP_TOKEN: str
     SLACK_SIGNING_SECRET: Optional[str] = None
     FDE_SLACK_USER_ID: str  # Your Slack user ID to filter out your own messages
+    SLACK_NAME_CACHE_TTL_SECONDS: int = 3600  # User/channel name cache lifetime
     
     # OpenAI Configuration
     OPENAI_API_KEY: str
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 5000  # In-memory LRU entries (0 disables)
+    EMBEDDING_CACHE_PATH: Optional[str] = ".cache/embeddings.sqlite3"  # Empty disables disk tier
+    EMBEDDING_CACHE_DISK_MAX_MB: int = 256
+    EMBEDDING_BATCH_MAX_SIZE: int = 64  # Inputs per embeddings request (1 disables batching)
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 15.0  # Max time a text waits for batch-mates
+    CLASSIFICATION_MODE: str = "fused"  # "fused" (classification + title in one call) or "separate"
+    PREFILTER_ENABLED: bool = True  # Reject obvious chit-chat locally before the LLM
+    PREFILTER_MODEL_THRESHOLD: float = 0.9  # Min P(chit-chat) for an n-gram model rejection
+    PREFILTER_MAX_WORDS: int = 8  # Longer messages are never rejected by the model
+    OPENAI_MAX_CONNECTIONS: int = 50  # Shared HTTP pool for every OpenAI request
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_REQUESTS_PER_MINUTE: int = 5000  # Per-model budget until x-ratelimit-* headers say otherwise
+    OPENAI_TOKENS_PER_MINUTE: int = 2000000
+    OPENAI_INITIAL_CONCURRENCY: int = 16  # AIMD in-flight limit per model: start, floor, ceiling
+    OPENAI_MIN_CONCURRENCY: int = 2
+    OPENAI_MAX_CONCURRENCY: int = 64
+    OPENAI_MAX_RETRIES: int = 4  # 429 / timeout / connection / 5xx, exponential backoff with jitter
+    OPENAI_RETRY_BASE_SECONDS: float = 0.5
+    OPENAI_RETRY_MAX_SECONDS: float = 20.0
     
     # Supabase Configuration
     SUPABASE_URL: str
     SUPABASE_KEY: str  # Service role key
+    SUPABASE_MAX_CONNECTIONS: int = 20  # Async HTTP pool size for PostgREST
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    SUPABASE_TIMEOUT_SECONDS: float = 10.0
     
     # Application Settings
     LOG_LEVEL: str = "INFO"
     SIMILARITY_THRESHOLD: float = 0.75  # Lowered from 0.82 for better grouping
     TIME_WINDOW_MINUTES: int = 60  # Increased from 30 to 60 minutes
+    RECENT_TICKETS_HOURS: int = 24  # Lookback for AI grouping candidates
+    AI_GROUPING_MAX_CONCURRENCY: int = 5  # Parallel candidate checks per message
+    AI_GROUPING_MODE: str = "pairwise"  # "pairwise" (one call per ticket) or "listwise" (one call)
+    GROUPING_HIGH_SIMILARITY: float = 0.90  # At/above: group without an LLM call
+    GROUPING_LOW_SIMILARITY: float = 0.75  # Below: new ticket without an LLM call
+    GROUPING_LLM_TOP_K: int = 3  # Ambiguous candidates sent to the grouping classifier
+    TICKET_INDEX_RECONCILE_SECONDS: int = 30  # Sync local ticket index with DB changes
+    TICKET_INDEX_REBUILD_EVERY: int = 20  # Full index reload every N reconciliations
+    THREAD_MAP_MAX_ENTRIES: int = 20000  # Cached thread -> ticket entries
+    THREAD_MAP_NEGATIVE_TTL_SECONDS: int = 300  # How long "thread has no ticket" is trusted
+    MESSAGE_DEADLINE_SECONDS: float = 8.0  # Per-message budget; optional stages are skipped past it (0 = none)
+    LLM_HEDGING_ENABLED: bool = False  # Duplicate a chat call still running after its stage's p95
+    LLM_HEDGE_MAX_FRACTION: float = 0.1  # Max share of a stage's calls that may be hedged
+    LLM_LATENCY_WINDOW: int = 200  # Recent calls per stage behind the observed p95
+    INGEST_PROCEDURE_ENABLED: bool = False  # Store via ingest_message (requires add_ingest_message.sql)
+    TITLE_REFRESH_INTERVAL_SECONDS: float = 30.0  # Debounce window for title regeneration
+    TITLE_REFRESH_MAX_MESSAGES: int = 5  # Regenerate early once this many messages are pending
+    TITLE_REFRESH_MIN_NEW_WORDS: int = 3  # Skip regeneration when the digest barely changed
+    
+    # Ticket Write-Behind
+    TICKET_WRITE_BEHIND_SECONDS: float = 0.0  # Batch digest/title/channel updates (0 = write through)
+    TICKET_WRITE_BEHIND_MAX_PENDING: int = 500  # Pending tickets that force an early flush
+    
+    # Metrics (Prometheus text format on http://METRICS_HOST:METRICS_PORT/metrics)
+    METRICS_ENABLED: bool = False
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9108
+    
+    # Ingestion Queue
+    INGESTION_QUEUE_MAX_SIZE: int = 1000  # Pending events before the listener waits
+    INGESTION_WORKERS: int = 8  # Threads processed in parallel
+    
+    # Burst Coalescing (consecutive messages of one user in one channel/thread run the pipeline once)
+    COALESCE_WINDOW_SECONDS: float = 0.0  # Quiet time that ends a burst; isolated messages wait this long (0 = disabled)
+    COALESCE_MAX_WAIT_SECONDS: float = 5.0  # Longest the first message of a burst is held
+    COALESCE_MAX_MESSAGES: int = 8  # Burst size that is flushed immediately
+    
+    # Event Journal (accepted events survive failures and restarts)
+    EVENT_JOURNAL_PATH: Optional[str] = ".cache/event_journal.sqlite3"  # Empty disables retries and replay
+    EVENT_MAX_ATTEMPTS: int = 5  # Failed attempts before an event is dead-lettered
+    EVENT_RETRY_BASE_SECONDS: float = 10.0  # Backoff doubles per attempt, jittered
+    EVENT_RETRY_MAX_SECONDS: float = 900.0
+    EVENT_RETRY_POLL_SECONDS: float = 1.0
+    
+    # Backfill (python -m backend.backfill)
+    BACKFILL_CHANNEL_CONCURRENCY: int = 4  # Channels processed in parallel
+    BACKFILL_BATCH_SIZE: int = 20  # Messages per batched classification/embedding step
+    BACKFILL_MAX_MESSAGES_PER_SECOND: float = 10.0  # Throughput cap across channels (0 = unlimited)
+    BACKFILL_CHECKPOINT_PATH: str = "backfill_checkpoint.json"
+    
+    # De-duplication Cache
+    DEDUP_CACHE_SIZE: int = 10000  # Recently seen message IDs kept in memory
+    DEDUP_CACHE_TTL_SECONDS: int = 3600
+    DEDUP_BLOOM_CAPACITY: int = 200000
+    DEDUP_BLOOM_ERROR_RATE: float = 0.01
+    DEDUP_WARMUP_HOURS: int = 24  # Message IDs loaded into the bloom filter at startup
+    DEDUP_EXCLUSIVE_WRITER: bool = False  # Nothing else (e.g. backfill) stores messages: bloom negatives skip the DB
     
     class Config:
         env_file = ".env"
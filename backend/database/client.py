@@ -1,12 +1,54 @@
 """
 Supabase client initialization
 """
+from typing import Dict, Union
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from supabase import create_client, Client
 from backend.config import settings
 
-# Global Supabase client
+# Global Supabase client (synchronous - blocks the event loop, avoid in async code)
 supabase_client: Client = create_client(
     settings.SUPABASE_URL,
     settings.SUPABASE_KEY
 )
 
+
+class PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """Async PostgREST client backed by a bounded, keep-alive httpx connection pool"""
+    
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+
+
+# Global async PostgREST client - used by every repository so DB round trips
+# never block the event loop and concurrent messages overlap their I/O
+async_supabase_client: AsyncPostgrestClient = PooledAsyncPostgrestClient(
+    f"{settings.SUPABASE_URL}/rest/v1",
+    headers={
+        **DEFAULT_POSTGREST_CLIENT_HEADERS,
+        "apiKey": settings.SUPABASE_KEY,
+        "Authorization": f"Bearer {settings.SUPABASE_KEY}"
+    },
+    timeout=settings.SUPABASE_TIMEOUT_SECONDS
+)
+
+
+async def close_async_client() -> None:
+    """Close pooled HTTP connections (call on shutdown)"""
+    await async_supabase_client.aclose()
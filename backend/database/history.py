@@ -3,7 +3,7 @@ Ticket history database operations
 """
 import logging
 from typing import List, Dict, Any
-from backend.database.client import supabase_client
+from backend.database.client import async_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,7 @@ class HistoryRepository:
             List of history entries, ordered by created_at DESC
         """
         try:
-            result = supabase_client.table("ticket_history").select("*").eq(
+            result = await async_supabase_client.table("ticket_history").select("*").eq(
                 "ticket_id", ticket_id
             ).order("created_at", desc=True).execute()
             
@@ -64,7 +64,7 @@ class HistoryRepository:
                 "metadata": metadata
             }
             
-            result = supabase_client.table("ticket_history").insert(history_data).execute()
+            result = await async_supabase_client.table("ticket_history").insert(history_data).execute()
             return result.data[0] if result.data else {}
         except Exception as e:
             logger.error(f"Error creating history entry: {e}", exc_info=True)
@@ -2,8 +2,8 @@
 Message database operations
 """
 import logging
-from typing import Dict, Any, Optional
-from backend.database.client import supabase_client
+from typing import Dict, Any, List, Optional
+from backend.database.client import async_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,7 @@ class MessageRepository:
             Message dict or None
         """
         try:
-            result = supabase_client.table("messages").select("*").eq(
+            result = await async_supabase_client.table("messages").select("*").eq(
                 "slack_message_id", slack_message_id
             ).execute()
             
@@ -42,7 +42,7 @@ class MessageRepository:
             Created message dict
         """
         try:
-            result = supabase_client.table("messages").insert(message_data).execute()
+            result = await async_supabase_client.table("messages").insert(message_data).execute()
             return result.data[0] if result.data else {}
         except Exception as e:
             logger.error(f"Error creating message: {e}", exc_info=True)
@@ -59,7 +59,7 @@ class MessageRepository:
             List of message dicts
         """
         try:
-            result = supabase_client.table("messages").select("*").eq(
+            result = await async_supabase_client.table("messages").select("*").eq(
                 "ticket_id", ticket_id
             ).order("created_at", desc=False).execute()
             
@@ -67,4 +67,42 @@ class MessageRepository:
         except Exception as e:
             logger.error(f"Error getting messages by ticket: {e}", exc_info=True)
             return []
-
+    
+    async def get_slack_ids_since(
+        self,
+        since_iso: str,
+        page_size: int = 1000,
+        max_rows: int = 200000
+    ) -> List[str]:
+        """
+        Get Slack message IDs stored since a point in time (for de-dup warm-up)
+        
+        Args:
+            since_iso: ISO timestamp lower bound on created_at
+            page_size: Rows fetched per request
+            max_rows: Hard cap on rows returned
+            
+        Returns:
+            List of slack_message_id strings
+        """
+        slack_ids: List[str] = []
+        try:
+            while len(slack_ids) < max_rows:
+                start = len(slack_ids)
+                result = await async_supabase_client.table("messages").select(
+                    "slack_message_id"
+                ).gte(
+                    "created_at", since_iso
+                ).order("created_at", desc=False).range(
+                    start, start + page_size - 1
+                ).execute()
+                
+                rows = result.data or []
+                slack_ids.extend(row["slack_message_id"] for row in rows)
+                if len(rows) < page_size:
+                    break
+            
+            return slack_ids
+        except Exception as e:
+            logger.error(f"Error getting recent Slack message IDs: {e}", exc_info=True)
+            raise
@@ -3,7 +3,7 @@ Ticket database operations
 """
 import logging
 from typing import List, Optional, Dict, Any
-from backend.database.client import supabase_client
+from backend.database.client import async_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +22,12 @@ class TicketRepository:
         Args:
             thread_ts: Slack thread timestamp
             channel_id: Slack channel ID
-            
+        
         Returns:
             Ticket dict or None
         """
         try:
-            result = supabase_client.table("tickets").select("*").eq(
+            result = await async_supabase_client.table("tickets").select("*").eq(
                 "first_message_ts", thread_ts
             ).eq(
                 "channel_id", channel_id
@@ -40,6 +40,26 @@ class TicketRepository:
             logger.error(f"Error finding ticket by thread: {e}", exc_info=True)
             return None
     
+    async def get_by_id(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get ticket by ID
+        
+        Args:
+            ticket_id: Ticket UUID
+        
+        Returns:
+            Ticket dict or None
+        """
+        try:
+            result = await async_supabase_client.table("tickets").select("*").eq(
+                "id", ticket_id
+            ).execute()
+            
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error getting ticket {ticket_id}: {e}", exc_info=True)
+            return None
+    
     async def find_similar(
         self,
         embedding: List[float],
@@ -57,12 +77,12 @@ class TicketRepository:
             time_window_minutes: How far back to search
             similarity_threshold: Minimum similarity score
             max_results: Maximum number of results
-            
+        
         Returns:
             List of similar ticket dicts
         """
         try:
-            result = supabase_client.rpc(
+            result = await async_supabase_client.rpc(
                 'find_similar_tickets',
                 {
                     'query_embedding': embedding,
@@ -78,18 +98,76 @@ class TicketRepository:
             logger.error(f"Error finding similar tickets: {e}", exc_info=True)
             return []
     
+    async def ingest_message(
+        self,
+        slack_message_id: str,
+        channel_id: str,
+        thread_key: str,
+        embedding: List[float],
+        message: Dict[str, Any],
+        ticket_id: Optional[str] = None,
+        new_ticket: Optional[Dict[str, Any]] = None,
+        candidate_hours: int = 24,
+        candidate_limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Store a message in one round trip (ingest_message stored procedure)
+        
+        De-duplicates, resolves the thread ticket (or the given ticket_id),
+        creates the ticket if new_ticket is given, inserts the message and
+        folds it into the ticket digest - all in one transaction.
+        
+        Args:
+            slack_message_id: De-duplication key "{channel_id}:{ts}"
+            channel_id: Slack channel ID
+            thread_key: Thread root timestamp (thread_ts, or message ts for a root)
+            embedding: Message embedding vector
+            message: text, user_id, user_name, thread_ts, message_ts, category
+                and optionally channel_name
+            ticket_id: Ticket chosen by the grouping engine
+            new_ticket: title/category used if a ticket has to be created
+            candidate_hours: Lookback for candidate tickets
+            candidate_limit: Maximum candidates returned
+        
+        Returns:
+            {"status": "duplicate"},
+            {"status": "stored", "created": bool, "ticket": {...}, "message": {...}} or
+            {"status": "candidates", "candidates": [...]} (nothing written) or
+            {"status": "closed", "ticket": {...}} (nothing written: the thread's
+            ticket is no longer open, so no ticket can be created under thread_key)
+        """
+        try:
+            result = await async_supabase_client.rpc(
+                'ingest_message',
+                {
+                    'p_slack_message_id': slack_message_id,
+                    'p_channel_id': channel_id,
+                    'p_thread_key': thread_key,
+                    'p_embedding': embedding,
+                    'p_message': message,
+                    'p_ticket_id': ticket_id,
+                    'p_new_ticket': new_ticket,
+                    'p_candidate_hours': candidate_hours,
+                    'p_candidate_limit': candidate_limit
+                }
+            ).execute()
+            return result.data
+        except Exception as e:
+            logger.error(f"Error ingesting message {slack_message_id}: {e}", exc_info=True)
+            raise
+    
     async def create(self, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create new ticket
         
         Args:
             ticket_data: Ticket data dict
-            
+        
         Returns:
             Created ticket dict
         """
         try:
-            result = supabase_client.table("tickets").insert(ticket_data).execute()
+            result = await async_supabase_client.table("tickets").insert(ticket_data).execute()
             return result.data[0] if result.data else {}
         except Exception as e:
             logger.error(f"Error creating ticket: {e}", exc_info=True)
@@ -102,12 +180,12 @@ class TicketRepository:
         Args:
             ticket_id: Ticket UUID
             updates: Fields to update
-            
+        
         Returns:
             Updated ticket dict
         """
         try:
-            result = supabase_client.table("tickets").update(updates).eq(
+            result = await async_supabase_client.table("tickets").update(updates).eq(
                 "id", ticket_id
             ).execute()
             return result.data[0] if result.data else {}
@@ -121,12 +199,12 @@ class TicketRepository:
         
         Args:
             limit: Maximum number of tickets to return
-            
+        
         Returns:
             List of ticket dicts with nested messages
         """
         try:
-            result = supabase_client.table("tickets").select(
+            result = await async_supabase_client.table("tickets").select(
                 "*, messages(*)"
             ).order("updated_at", desc=True).limit(limit).execute()
             
@@ -148,7 +226,7 @@ class TicketRepository:
             channel_id: Slack channel ID
             hours: How many hours back to search
             limit: Maximum number of tickets to return
-            
+        
         Returns:
             List of recent ticket dicts
         """
@@ -157,7 +235,7 @@ class TicketRepository:
             cutoff_time = datetime.utcnow() - timedelta(hours=hours)
             cutoff_str = cutoff_time.isoformat()
             
-            result = supabase_client.table("tickets").select("*").eq(
+            result = await async_supabase_client.table("tickets").select("*").eq(
                 "channel_id", channel_id
             ).eq(
                 "status", "open"
@@ -169,4 +247,104 @@ class TicketRepository:
         except Exception as e:
             logger.error(f"Error finding recent tickets: {e}", exc_info=True)
             return []
-
+    
+    async def find_open_near_ts(
+        self,
+        channel_id: str,
+        message_ts: str,
+        hours: int = 24,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Find open tickets in a channel whose thread root is close to a message
+        
+        For historical messages (backfill): "recent" is measured against the
+        message's own ts instead of the clock. Slack ts strings have a fixed
+        width, so they compare in time order as text.
+        
+        Args:
+            channel_id: Slack channel ID
+            message_ts: Slack ts of the message being grouped
+            hours: Max distance between a ticket's first_message_ts and message_ts
+            limit: Maximum number of tickets to return
+        
+        Returns:
+            Ticket dicts, latest thread root first
+        """
+        try:
+            window = hours * 3600
+            result = await async_supabase_client.table("tickets").select("*").eq(
+                "channel_id", channel_id
+            ).eq(
+                "status", "open"
+            ).gte(
+                "first_message_ts", f"{float(message_ts) - window:.6f}"
+            ).lte(
+                "first_message_ts", f"{float(message_ts) + window:.6f}"
+            ).order("first_message_ts", desc=True).limit(limit).execute()
+            
+            return result.data if result.data else []
+        except Exception as e:
+            logger.error(f"Error finding tickets near {message_ts}: {e}", exc_info=True)
+            return []
+    
+    async def find_open_since(
+        self,
+        since_iso: str,
+        page_size: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all open tickets created since a point in time (all channels)
+        
+        Args:
+            since_iso: ISO timestamp lower bound on created_at
+            page_size: Rows fetched per request
+        
+        Returns:
+            List of ticket dicts (including embeddings)
+        """
+        return await self._fetch_pages(
+            lambda: async_supabase_client.table("tickets").select("*").eq(
+                "status", "open"
+            ).gte(
+                "created_at", since_iso
+            ).order("created_at", desc=False),
+            page_size
+        )
+    
+    async def find_updated_since(
+        self,
+        since_iso: str,
+        page_size: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Get tickets of any status updated since a point in time (all channels)
+        
+        Args:
+            since_iso: ISO timestamp lower bound on updated_at
+            page_size: Rows fetched per request
+        
+        Returns:
+            List of ticket dicts (including embeddings)
+        """
+        return await self._fetch_pages(
+            lambda: async_supabase_client.table("tickets").select("*").gte(
+                "updated_at", since_iso
+            ).order("updated_at", desc=False),
+            page_size
+        )
+    
+    async def _fetch_pages(self, build_query, page_size: int) -> List[Dict[str, Any]]:
+        """Run a query page by page until a short page comes back"""
+        rows: List[Dict[str, Any]] = []
+        try:
+            while True:
+                start = len(rows)
+                result = await build_query().range(start, start + page_size - 1).execute()
+                page = result.data or []
+                rows.extend(page)
+                if len(page) < page_size:
+                    return rows
+        except Exception as e:
+            logger.error(f"Error fetching tickets: {e}", exc_info=True)
+            raise
@@ -0,0 +1,48 @@
+"""
+Per-message time budget shared by every pipeline stage
+
+process_message starts a deadline; stages (and the tasks they spawn, which
+inherit the context) ask how much time is left and skip optional work
+instead of overrunning it. Background work runs in a fresh context and has
+no deadline.
+"""
+import contextvars
+import time
+from typing import Optional
+
+# Absolute time.monotonic() by which the current message should be done
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "message_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The current message ran out of its time budget"""
+
+
+def start(seconds: float) -> contextvars.Token:
+    """
+    Give the current context a budget of `seconds` (0 or less: no deadline)
+    
+    Returns:
+        Token for reset()
+    """
+    return _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+
+
+def reset(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget (None when there is no deadline)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def has_time_for(seconds: Optional[float]) -> bool:
+    """Whether work expected to take `seconds` still fits in the budget"""
+    left = remaining()
+    return left is None or left > (seconds or 0.0)
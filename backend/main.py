@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.slack.event_handler import SlackEventHandler
 from backend.config import settings
+from backend.database.client import close_async_client
+from backend.ai.openai_client import close_openai_client
 
 # Configure logging
 logging.basicConfig(
@@ -30,7 +32,11 @@ async def main():
     
     # Initialize and start Slack event handler
     handler = SlackEventHandler()
-    await handler.start()
+    try:
+        await handler.start()
+    finally:
+        await close_async_client()
+        await close_openai_client()
 
 
 if __name__ == "__main__":
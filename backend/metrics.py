@@ -0,0 +1,284 @@
+"""
+Process-local metrics: per-stage latency histograms and counters
+
+Everything is aggregated in memory and rendered in the Prometheus text
+format by backend/api/metrics_server.py. With METRICS_ENABLED off every
+call returns right away (stage timers hand back one shared no-op context
+manager), so instrumented code paths cost an attribute check.
+
+Counters that components already keep in their own `stats` dicts (cache
+hits, dedup checks, grouping bands, queue depth, ...) are not duplicated on
+the hot path: they are registered as collectors and read at scrape time.
+"""
+import bisect
+import contextvars
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.config import settings
+
+PREFIX = "fde_"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# (name, type, help, labels, value) produced by collectors at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+# LLM calls made on behalf of the message being processed (see start_message)
+_message_llm_calls: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "message_llm_calls", default=None
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+    
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series: Dict[LabelKey, List[float]] = {}  # bucket counts..., +Inf count, sum
+    
+    def observe(self, value: float, labels: LabelKey = ()) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(labels + (('le', le),))} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(labels)} {cumulative:g}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set"""
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.series: Dict[LabelKey, float] = {}
+    
+    def inc(self, labels: LabelKey = (), amount: float = 1) -> None:
+        self.series[labels] = self.series.get(labels, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(labels)} {value:g}" for labels, value in sorted(self.series.items()))
+        return lines
+
+
+class _StageTimer:
+    """Times one pipeline stage; an exception leaving the block counts as a stage error"""
+    
+    __slots__ = ("registry", "stage", "started")
+    
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+    
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        labels = (("stage", self.stage),)
+        self.registry.stage_seconds.observe(time.perf_counter() - self.started, labels)
+        if exc_type is not None:
+            self.registry.errors.inc(labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+    
+    def __enter__(self) -> "_NullTimer":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Histograms, counters and scrape-time collectors for the bot process
+    
+    Stages timed in the pipeline: queue_wait, dedup, prefilter,
+    classification, embedding, grouping, enrichment, insert, ticket_update,
+    ingest (stored procedure path) and title_refresh.
+    """
+    
+    def __init__(self, enabled: bool = None):
+        self.enabled = settings.METRICS_ENABLED if enabled is None else enabled
+        self.stage_seconds = Histogram(
+            PREFIX + "stage_duration_seconds", "Time spent per message-processing stage"
+        )
+        self.message_seconds = Histogram(
+            PREFIX + "message_duration_seconds", "End-to-end process_message time by outcome"
+        )
+        self.ack_seconds = Histogram(
+            PREFIX + "slack_ack_seconds", "Socket Mode envelope received -> ack sent",
+            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 3.0)
+        )
+        self.llm_calls_per_message = Histogram(
+            PREFIX + "llm_calls_per_message", "Chat completion calls made for one message",
+            buckets=(0, 1, 2, 3, 4, 5, 8, 12)
+        )
+        self.messages = Counter(PREFIX + "messages_total", "Processed messages by outcome")
+        self.llm_calls = Counter(PREFIX + "llm_calls_total", "Chat completion calls by purpose")
+        self.embedding_requests = Counter(PREFIX + "embedding_requests_total", "Embeddings API requests")
+        self.grouping_paths = Counter(PREFIX + "grouping_path_total", "Grouping decisions by path taken")
+        self.errors = Counter(PREFIX + "errors_total", "Exceptions by stage")
+        self.degradations = Counter(PREFIX + "degradations_total", "Work skipped or cut short by the message deadline")
+        self.hedges = Counter(PREFIX + "llm_hedges_total", "Hedged LLM requests sent and won, by stage")
+        self.redeliveries = Counter(PREFIX + "slack_redeliveries_total", "Slack event redeliveries by reason and action")
+        self.collectors: List[Callable[[], Iterable[Sample]]] = []
+    
+    # -- instrumentation ---------------------------------------------------
+    
+    def stage(self, name: str):
+        """Context manager timing one stage (`with metrics.stage("grouping"): ...`)"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+    
+    def observe_stage(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.stage_seconds.observe(seconds, (("stage", name),))
+    
+    def llm_call(self, purpose: str) -> None:
+        """Count one chat completion (and attribute it to the current message)"""
+        if not self.enabled:
+            return
+        self.llm_calls.inc((("purpose", purpose),))
+        calls = _message_llm_calls.get()
+        if calls is not None:
+            calls[0] += 1
+    
+    def embedding_request(self) -> None:
+        if self.enabled:
+            self.embedding_requests.inc()
+    
+    def grouping_path(self, path: str) -> None:
+        if self.enabled:
+            self.grouping_paths.inc((("path", path),))
+    
+    def error(self, stage: str) -> None:
+        if self.enabled:
+            self.errors.inc((("stage", stage),))
+    
+    def degradation(self, reason: str) -> None:
+        if self.enabled:
+            self.degradations.inc((("reason", reason),))
+    
+    def hedge(self, stage: str, event: str) -> None:
+        if self.enabled:
+            self.hedges.inc((("stage", stage), ("event", event)))
+    
+    def observe_ack(self, seconds: float) -> None:
+        if self.enabled:
+            self.ack_seconds.observe(seconds)
+    
+    def redelivery(self, reason: str, action: str) -> None:
+        if self.enabled:
+            self.redeliveries.inc((("action", action), ("reason", reason)))
+    
+    def start_message(self) -> Optional[Tuple[contextvars.Token, List[int], float]]:
+        """
+        Start measuring one process_message call (None when disabled)
+        
+        LLM calls made until finish_message - including in tasks spawned
+        meanwhile, which share the per-message counter - are attributed to it.
+        """
+        if not self.enabled:
+            return None
+        calls = [0]
+        return _message_llm_calls.set(calls), calls, time.perf_counter()
+    
+    def finish_message(self, scope, outcome: str) -> None:
+        """
+        Record duration, outcome and LLM calls of a message started with start_message
+        
+        Args:
+            scope: Value returned by start_message
+            outcome: stored, duplicate, irrelevant, prefiltered, skipped or failed
+        """
+        if scope is None:
+            return
+        token, calls, started = scope
+        _message_llm_calls.reset(token)
+        labels = (("outcome", outcome),)
+        self.message_seconds.observe(time.perf_counter() - started, labels)
+        self.messages.inc(labels)
+        self.llm_calls_per_message.observe(calls[0])
+    
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Add a callable read at scrape time (for counters kept elsewhere)"""
+        if self.enabled:
+            self.collectors.append(collector)
+    
+    # -- exposition ----------------------------------------------------------
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in (
+            self.stage_seconds, self.message_seconds, self.ack_seconds, self.llm_calls_per_message,
+            self.messages, self.llm_calls, self.embedding_requests,
+            self.grouping_paths, self.errors, self.degradations, self.hedges, self.redeliveries,
+        ):
+            lines.extend(metric.render())
+        
+        collected: Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = {}
+        for collector in self.collectors:
+            for name, kind, help_text, labels, value in collector():
+                entry = collected.setdefault(PREFIX + name, (kind, help_text, []))
+                entry[2].append((labels, value))
+        for name, (kind, help_text, samples) in sorted(collected.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+
+def stats_samples(
+    name: str,
+    kind: str,
+    help_text: str,
+    stats: Dict[str, float],
+    label: str,
+    extra_labels: Optional[Dict[str, str]] = None
+) -> List[Sample]:
+    """One sample per key of a component's stats dict (key becomes the `label` value)"""
+    return [
+        (name, kind, help_text, {**(extra_labels or {}), label: key}, value)
+        for key, value in stats.items()
+        if isinstance(value, (int, float))
+    ]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+metrics = MetricsRegistry()
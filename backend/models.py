@@ -12,6 +12,7 @@ class Classification(BaseModel):
     category: Optional[str] = None  # 'support', 'bug', 'feature', 'question'
     confidence: float
     reasoning: str
+    title: Optional[str] = None  # Candidate ticket title (fused classification only)
 
 
 class Ticket(BaseModel):
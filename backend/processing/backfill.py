@@ -0,0 +1,288 @@
+"""
+Streaming bulk backfill of existing channel history through the pipeline
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from backend.config import settings
+from backend.processing.message_processor import MessageProcessor
+from backend.slack import history
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillCheckpoint:
+    """
+    Per-channel resume cursors persisted as a small JSON file
+    
+    Keys are "{source}:{channel_id}"; the file is replaced atomically on every
+    save so an interrupted run never leaves a truncated checkpoint.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.cursors: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.cursors = json.load(f)
+    
+    def get(self, key: str) -> Optional[str]:
+        return self.cursors.get(key) or None
+    
+    def save(self, key: str, cursor: str) -> None:
+        self.cursors[key] = cursor
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.cursors, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class BackfillRunner:
+    """
+    Streams historical messages through MessageProcessor
+    
+    - Channels run concurrently (at most `channel_concurrency` at a time)
+    - Each channel is read as a stream, `batch_size` messages at a time; a
+      batch is classified with one chat call and its relevant messages are
+      embedded in batched requests, then stored through the normal pipeline
+    - Within a batch, threads are processed in parallel but the messages of
+      one thread strictly in order (like the live ingestion queue)
+    - After every batch the channel's resume cursor is checkpointed; a failed
+      message pins the cursor before it, so a rerun picks it up again
+      (messages already stored are skipped by de-duplication)
+    - `max_messages_per_second` caps throughput across all channels
+    - Messages are grouped on their own ts (thread, then the high band over
+      tickets whose root is within RECENT_TICKETS_HOURS of it), so the
+      newest-first history walk can't merge messages months apart
+    
+    Memory is bounded by the channels in flight times the batch size (an
+    export is read one day file at a time).
+    """
+    
+    def __init__(
+        self,
+        processor: MessageProcessor,
+        slack_client=None,
+        checkpoint_path: str = None,
+        channel_concurrency: int = None,
+        batch_size: int = None,
+        max_messages_per_second: float = None
+    ):
+        self.processor = processor
+        self.slack_client = slack_client
+        self.checkpoint = BackfillCheckpoint(checkpoint_path or settings.BACKFILL_CHECKPOINT_PATH)
+        self.channel_concurrency = channel_concurrency or settings.BACKFILL_CHANNEL_CONCURRENCY
+        self.batch_size = batch_size or settings.BACKFILL_BATCH_SIZE
+        self.max_messages_per_second = (
+            settings.BACKFILL_MAX_MESSAGES_PER_SECOND
+            if max_messages_per_second is None else max_messages_per_second
+        )
+        
+        self._channel_slots = asyncio.Semaphore(self.channel_concurrency)
+        self._next_slot = 0.0
+        self._started = time.monotonic()
+        self.stats: Dict[str, float] = {
+            "read": 0,
+            "skipped": 0,
+            "classified": 0,
+            "processed": 0,
+            "failed": 0,
+            "batches": 0,
+            "channels_done": 0,
+        }
+    
+    async def run_export(self, export_dir: str, channels: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Backfill from a Slack export directory
+        
+        Args:
+            export_dir: Export root (one folder of per-day JSON files per channel)
+            channels: Channel folder names or IDs to include (default: all)
+        """
+        # Names come with the export; no users.info call per author
+        for user_id, name in history.read_export_users(export_dir).items():
+            self.processor.slack_utils.user_names.set(user_id, name)
+        
+        folders = history.read_export_channels(export_dir)
+        jobs = []
+        for folder, channel_id in folders.items():
+            if channels and folder not in channels and channel_id not in channels:
+                continue
+            self.processor.slack_utils.channel_names.set(channel_id, folder)
+            key = f"export:{channel_id}"
+            items = history.iter_export_channel(
+                export_dir, folder, channel_id, after_ts=self.checkpoint.get(key)
+            )
+            jobs.append(self._run_channel(key, _aiter(items)))
+        
+        logger.info(f"Backfilling {len(jobs)} channels from export {export_dir}")
+        await asyncio.gather(*jobs)
+        return self.report()
+    
+    async def run_history(self, channel_ids: List[str], oldest_ts: Optional[str] = None) -> Dict[str, float]:
+        """
+        Backfill through conversations.history
+        
+        Args:
+            channel_ids: Channels to read (the bot must be a member)
+            oldest_ts: Don't go further back than this ts
+        """
+        jobs = []
+        for channel_id in channel_ids:
+            key = f"history:{channel_id}"
+            items = history.iter_conversation_history(
+                self.slack_client,
+                channel_id,
+                before_ts=self.checkpoint.get(key),
+                oldest_ts=oldest_ts
+            )
+            jobs.append(self._run_channel(key, items))
+        
+        logger.info(f"Backfilling {len(jobs)} channels via conversations.history")
+        await asyncio.gather(*jobs)
+        return self.report()
+    
+    def report(self) -> Dict[str, float]:
+        """Counters plus overall throughput"""
+        elapsed = time.monotonic() - self._started
+        return {
+            **self.stats,
+            "elapsed_seconds": round(elapsed, 2),
+            "messages_per_second": round(self.stats["read"] / elapsed, 2) if elapsed else 0.0,
+        }
+    
+    async def _run_channel(self, key: str, items: AsyncIterator[history.HistoryItem]) -> None:
+        async with self._channel_slots:
+            pinned = False  # A message failed: keep the cursor before it for this run
+            batch: List[history.HistoryItem] = []
+            try:
+                async for item in items:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        pinned = await self._run_batch(key, batch, pinned)
+                        batch = []
+                if batch:
+                    pinned = await self._run_batch(key, batch, pinned)
+            except Exception as e:
+                logger.error(f"Backfill of {key} stopped: {e}", exc_info=True)
+                return
+            self.stats["channels_done"] += 1
+            logger.info(f"Backfill of {key} finished ({self._progress()})")
+    
+    async def _run_batch(self, key: str, batch: List[history.HistoryItem], pinned: bool) -> bool:
+        """Process one batch and advance the checkpoint; returns whether the cursor is pinned"""
+        await self._throttle(len(batch))
+        self.stats["read"] += len(batch)
+        self.stats["batches"] += 1
+        
+        events = [event for event, _ in batch if self._is_candidate(event)]
+        self.stats["skipped"] += len(batch) - len(events)
+        precomputed = await self._precompute(events)
+        
+        # Threads in parallel, each thread in order
+        lanes: "OrderedDict[Tuple[str, str], List[Dict[str, Any]]]" = OrderedDict()
+        for event in events:
+            lanes.setdefault((event["channel"], event.get("thread_ts") or event["ts"]), []).append(event)
+        lane_results = await asyncio.gather(*(
+            self._run_lane(lane, precomputed) for lane in lanes.values()
+        ))
+        failed = {ts for failures in lane_results for ts in failures}
+        
+        if not pinned:
+            cursor = None
+            for event, item_cursor in batch:
+                if event.get("ts") in failed:
+                    pinned = True
+                    logger.warning(f"Backfill of {key}: message {event['ts']} failed, cursor held")
+                    break
+                cursor = item_cursor
+            if cursor:
+                self.checkpoint.save(key, cursor)
+        
+        if self.stats["batches"] % 10 == 0:
+            logger.info(f"Backfill progress: {self._progress()}")
+        return pinned
+    
+    async def _precompute(self, events: List[Dict[str, Any]]) -> Dict[str, Tuple[Any, Optional[List[float]]]]:
+        """Batched classification, then batched embeddings for the relevant messages"""
+        prefilter = self.processor.prefilter
+        texts = {
+            event["ts"]: event["text"] for event in events
+            if prefilter is None or prefilter.check(event["text"]) is None
+        }
+        if not texts:
+            return {}
+        
+        classifications = await self.processor.classifier.classify_batch(list(texts.values()))
+        self.stats["classified"] += len(classifications)
+        relevant = [
+            (ts, text) for (ts, text), classification in zip(texts.items(), classifications)
+            if classification.is_relevant
+        ]
+        embeddings = await self.processor.embedder.generate_batch([text for _, text in relevant])
+        vectors = {ts: embedding for (ts, _), embedding in zip(relevant, embeddings)}
+        
+        return {
+            ts: (classification, vectors.get(ts))
+            for ts, classification in zip(texts, classifications)
+        }
+    
+    async def _run_lane(
+        self,
+        lane: List[Dict[str, Any]],
+        precomputed: Dict[str, Tuple[Any, Optional[List[float]]]]
+    ) -> List[str]:
+        """Process one thread's messages in order; returns the ts of failed ones"""
+        failures = []
+        for event in lane:
+            # Messages without precomputed results were rejected by the prefilter,
+            # which process_message runs again before any model call
+            handled = await self.processor.process_message(
+                event, self.slack_client, precomputed=precomputed.get(event["ts"]), historical=True
+            )
+            if handled:
+                self.stats["processed"] += 1
+            else:
+                self.stats["failed"] += 1
+                failures.append(event["ts"])
+        return failures
+    
+    def _is_candidate(self, event: Dict[str, Any]) -> bool:
+        """Same filters as the live listener: no bots, FDE, subtypes or empty text"""
+        return bool(
+            event.get("text")
+            and event.get("user")
+            and event.get("ts")
+            and not event.get("bot_id")
+            and not event.get("subtype")
+            and event.get("user") != settings.FDE_SLACK_USER_ID
+        )
+    
+    async def _throttle(self, messages: int) -> None:
+        """Space batches so the overall rate stays under max_messages_per_second"""
+        if self.max_messages_per_second <= 0:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + messages / self.max_messages_per_second
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    def _progress(self) -> str:
+        report = self.report()
+        return (
+            f"{int(report['read'])} read, {int(report['processed'])} processed, "
+            f"{int(report['failed'])} failed, {report['messages_per_second']} msg/s"
+        )
+
+
+async def _aiter(items: Iterable[history.HistoryItem]) -> AsyncIterator[history.HistoryItem]:
+    """Async view of a blocking export reader that yields to the event loop between items"""
+    for item in items:
+        yield item
+        await asyncio.sleep(0)
@@ -0,0 +1,136 @@
+"""
+Burst coalescing of rapid-fire messages from the same user
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.config import settings
+from backend.processing.event_journal import event_id
+
+logger = logging.getLogger(__name__)
+
+BurstKey = Tuple[str, str]
+
+
+class _Burst:
+    """Messages of one user buffered for one (channel, thread root)"""
+    
+    def __init__(self, user: str):
+        self.user = user
+        self.events: List[Dict[str, Any]] = []
+        self.slack_client = None
+        self.started = time.monotonic()
+        self.timer: Optional[asyncio.Task] = None
+
+
+class BurstCoalescer:
+    """
+    Buffers consecutive messages of one user in one channel/thread
+    
+    - A burst is keyed by (channel_id, thread root ts), where a top-level
+      message is its own root: separate thread roots are never merged, so a
+      burst stays in one ingestion lane and one ticket
+    - A thread holds one burst at a time; a message from another user
+      flushes the pending burst first, keeping the thread in arrival order
+    - It is flushed once no new message arrived for `window` seconds, after
+      `max_wait` seconds in total, or at `max_messages` messages
+    - `flush(events, slack_client)` receives the burst in arrival order
+      (usually a single message)
+    
+    An isolated message is delayed by `window` at most, so keep it short.
+    """
+    
+    def __init__(
+        self,
+        flush: Callable[[List[Dict[str, Any]], Any], Awaitable[None]],
+        window: float = None,
+        max_wait: float = None,
+        max_messages: int = None
+    ):
+        self.flush = flush
+        self.window = window if window is not None else settings.COALESCE_WINDOW_SECONDS
+        self.max_wait = max_wait if max_wait is not None else settings.COALESCE_MAX_WAIT_SECONDS
+        self.max_messages = max_messages or settings.COALESCE_MAX_MESSAGES
+        self._bursts: Dict[BurstKey, _Burst] = {}
+        self._buffered: Set[str] = set()  # Event ids waiting in a burst
+        
+        self.stats: Dict[str, int] = {
+            "buffered": 0,
+            "flushed_single": 0,
+            "flushed_bursts": 0,
+            "coalesced_messages": 0,
+        }
+    
+    @staticmethod
+    def burst_key(event: Dict[str, Any]) -> BurstKey:
+        return (event.get("channel", ""), event.get("thread_ts") or event.get("ts", ""))
+    
+    @property
+    def pending(self) -> int:
+        """Messages waiting for their burst to be flushed"""
+        return len(self._buffered)
+    
+    def holds(self, event: Dict[str, Any]) -> bool:
+        """Whether this event is waiting in a burst"""
+        return event_id(event) in self._buffered
+    
+    async def add(self, event: Dict[str, Any], slack_client) -> None:
+        """Buffer an event, flushing its burst right away when it is full"""
+        key = event_id(event)
+        if key in self._buffered:
+            return  # Redelivery of a buffered message
+        burst_key = self.burst_key(event)
+        user = event.get("user", "")
+        burst = self._bursts.get(burst_key)
+        if burst is not None and burst.user != user:
+            if burst.timer is not None:
+                burst.timer.cancel()
+            await self._flush(burst_key)
+            burst = None
+        if burst is None:
+            burst = self._bursts[burst_key] = _Burst(user)
+        burst.events.append(event)
+        burst.slack_client = slack_client
+        self._buffered.add(key)
+        self.stats["buffered"] += 1
+        
+        if burst.timer is not None:
+            burst.timer.cancel()
+            burst.timer = None
+        if len(burst.events) >= self.max_messages:
+            await self._flush(burst_key)
+            return
+        
+        delay = min(self.window, self.max_wait - (time.monotonic() - burst.started))
+        burst.timer = asyncio.create_task(self._flush_later(burst_key, max(0.0, delay)))
+    
+    async def drain(self) -> None:
+        """Flush every buffered burst now (shutdown)"""
+        for burst_key in list(self._bursts):
+            burst = self._bursts.get(burst_key)
+            if burst is not None and burst.timer is not None:
+                burst.timer.cancel()
+            await self._flush(burst_key)
+    
+    async def _flush_later(self, burst_key: BurstKey, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await self._flush(burst_key)
+        except Exception as e:
+            logger.error(f"Failed to flush message burst {burst_key}: {e}", exc_info=True)
+    
+    async def _flush(self, burst_key: BurstKey) -> None:
+        burst = self._bursts.pop(burst_key, None)
+        if burst is None:
+            return
+        for event in burst.events:
+            self._buffered.discard(event_id(event))
+        if len(burst.events) > 1:
+            self.stats["flushed_bursts"] += 1
+            self.stats["coalesced_messages"] += len(burst.events)
+            logger.info(f"Coalesced {len(burst.events)} messages from {burst.user} in {burst_key[0]}")
+        else:
+            self.stats["flushed_single"] += 1
+        await self.flush(burst.events, burst.slack_client)
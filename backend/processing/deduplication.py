@@ -1,18 +1,160 @@
 """
 De-duplication logic to prevent duplicate messages
 """
+import hashlib
 import logging
-from typing import Optional
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
 from backend.database.messages import MessageRepository
+from backend.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+class RecentIdCache:
+    """Bounded LRU set of recently seen message IDs with per-entry TTL"""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+    
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False
+        self._entries.move_to_end(key)
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def add(self, key: str) -> None:
+        self._entries[key] = time.monotonic() + self.ttl_seconds
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class BloomFilter:
+    """Compact probabilistic set: no false negatives, tunable false positive rate"""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
 class DeduplicationChecker:
-    """Checks if a message has already been processed"""
+    """
+    Checks if a message has already been processed
+    
+    Layers (cheapest first):
+    1. In-flight set - rejects concurrent deliveries of the same event
+    2. Recent LRU/TTL cache - exact, answers redeliveries with no DB call
+    3. Bloom filter warmed from the DB - with DEDUP_EXCLUSIVE_WRITER, a miss
+       for a message newer than the warm-up window means "definitely new"
+       (no DB call)
+    4. DB lookup - for every other message
     
-    def __init__(self):
+    A bloom negative is only trustworthy if every id stored after warm-up
+    passed through this process's mark_processed(). Another writer (a
+    backfill run, a second bot instance) stores ids the filter never sees,
+    so by default negatives are advisory and confirmed with the DB; set
+    DEDUP_EXCLUSIVE_WRITER only when nothing else writes messages.
+    """
+    
+    def __init__(self, exclusive_writer: bool = None):
         self.message_repo = MessageRepository()
+        if exclusive_writer is None:
+            exclusive_writer = settings.DEDUP_EXCLUSIVE_WRITER
+        self.exclusive_writer = exclusive_writer
+        self.recent = RecentIdCache(
+            max_size=settings.DEDUP_CACHE_SIZE,
+            ttl_seconds=settings.DEDUP_CACHE_TTL_SECONDS
+        )
+        self.bloom = BloomFilter(
+            capacity=settings.DEDUP_BLOOM_CAPACITY,
+            error_rate=settings.DEDUP_BLOOM_ERROR_RATE
+        )
+        self.in_flight: Set[str] = set()
+        # Slack ts (epoch seconds) from which the bloom filter is authoritative
+        self._bloom_covers_since: Optional[float] = None
+        self.stats: Dict[str, int] = {
+            "in_flight_rejections": 0,
+            "cache_hits": 0,
+            "bloom_negatives": 0,
+            "db_checks": 0,
+        }
+    
+    async def warm_up(self) -> None:
+        """Load recently stored message IDs into the bloom filter and recent cache"""
+        window = timedelta(hours=settings.DEDUP_WARMUP_HOURS)
+        cutoff = datetime.utcnow() - window
+        cutoff_epoch = time.time() - window.total_seconds()
+        try:
+            slack_ids = await self.message_repo.get_slack_ids_since(
+                cutoff.isoformat(),
+                max_rows=settings.DEDUP_BLOOM_CAPACITY
+            )
+        except Exception as e:
+            logger.warning(f"De-dup warm-up failed, falling back to DB checks: {e}")
+            return
+        
+        for slack_message_id in slack_ids:
+            self.bloom.add(slack_message_id)
+        for slack_message_id in slack_ids[-settings.DEDUP_CACHE_SIZE:]:
+            self.recent.add(slack_message_id)
+        
+        if self.exclusive_writer and len(slack_ids) < settings.DEDUP_BLOOM_CAPACITY:
+            # created_at trails the Slack ts, so a small margin keeps this conservative
+            self._bloom_covers_since = cutoff_epoch + 60
+        logger.info(f"De-dup warm-up loaded {len(slack_ids)} message IDs")
+    
+    def claim(self, slack_message_id: str) -> bool:
+        """
+        Mark a message as in-flight
+        
+        Returns:
+            False if another delivery of the same message is already in flight
+        """
+        if slack_message_id in self.in_flight:
+            self.stats["in_flight_rejections"] += 1
+            logger.info(f"Message {slack_message_id} already in flight")
+            return False
+        self.in_flight.add(slack_message_id)
+        return True
+    
+    def release(self, slack_message_id: str) -> None:
+        """Clear the in-flight marker (always call after claim)"""
+        self.in_flight.discard(slack_message_id)
+    
+    def mark_processed(self, slack_message_id: str) -> None:
+        """Record a message as handled (stored or rejected as irrelevant)"""
+        self.recent.add(slack_message_id)
+        self.bloom.add(slack_message_id)
     
     async def is_processed(self, slack_message_id: str) -> bool:
         """
@@ -20,13 +162,24 @@ class DeduplicationChecker:
         
         Args:
             slack_message_id: Format "{channel_id}:{ts}"
-            
+        
         Returns:
             True if already processed, False otherwise
         """
+        if slack_message_id in self.recent:
+            self.stats["cache_hits"] += 1
+            logger.info(f"Message {slack_message_id} already processed (cache)")
+            return True
+        
+        if slack_message_id not in self.bloom and self._bloom_is_authoritative(slack_message_id):
+            self.stats["bloom_negatives"] += 1
+            return False
+        
         try:
+            self.stats["db_checks"] += 1
             message = await self.message_repo.find_by_slack_id(slack_message_id)
             if message:
+                self.recent.add(slack_message_id)
                 logger.info(f"Message {slack_message_id} already processed")
                 return True
             return False
@@ -34,4 +187,13 @@ class DeduplicationChecker:
             logger.error(f"Error checking de-duplication: {e}", exc_info=True)
             # On error, assume not processed (safer to process than skip)
             return False
-
+    
+    def _bloom_is_authoritative(self, slack_message_id: str) -> bool:
+        """True if the message is recent enough to be covered by the warmed bloom filter"""
+        if self._bloom_covers_since is None:
+            return False
+        try:
+            message_ts = float(slack_message_id.rsplit(":", 1)[1])
+        except (IndexError, ValueError):
+            return False
+        return message_ts >= self._bloom_covers_since
@@ -0,0 +1,174 @@
+"""
+Durable local journal of accepted Slack events
+"""
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def event_id(event: Dict[str, Any]) -> str:
+    """Journal key: same "{channel}:{ts}" id the pipeline de-duplicates on"""
+    return f"{event.get('channel')}:{event.get('ts')}"
+
+
+class EventJournal:
+    """
+    SQLite (WAL) journal of events between acceptance and completion
+    
+    - An event is written before it is queued and deleted once processed, so
+      the table only ever holds unfinished work
+    - A failed event is rescheduled with exponential backoff (with jitter);
+      after `max_attempts` failures it moves to the dead_letters table
+    - Rows with no scheduled attempt were queued or in flight when the
+      process stopped; they are replayed on startup
+    
+    Methods are blocking (one short transaction each); async callers run
+    them in a thread.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = None,
+        retry_base_seconds: float = None,
+        retry_max_seconds: float = None
+    ):
+        self.path = path
+        self.max_attempts = max_attempts or settings.EVENT_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds or settings.EVENT_RETRY_BASE_SECONDS
+        self.retry_max_seconds = retry_max_seconds or settings.EVENT_RETRY_MAX_SECONDS
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                event_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL,  -- NULL: queued or being processed
+                last_error TEXT,
+                received_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_events_next_attempt ON events(next_attempt_at)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS dead_letters (
+                event_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                received_at REAL NOT NULL,
+                failed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+    
+    @classmethod
+    def from_settings(cls) -> Optional["EventJournal"]:
+        """Journal at EVENT_JOURNAL_PATH (None when disabled or unavailable)"""
+        if not settings.EVENT_JOURNAL_PATH:
+            return None
+        try:
+            return cls(settings.EVENT_JOURNAL_PATH)
+        except sqlite3.Error as e:
+            logger.error(f"Event journal unavailable ({settings.EVENT_JOURNAL_PATH}): {e}")
+            return None
+    
+    def record(self, key: str, event: Dict[str, Any]) -> None:
+        """Journal an accepted event (a redelivery of a journaled event is a no-op)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO events (event_id, payload, received_at) VALUES (?, ?, ?)",
+                (key, json.dumps(event), time.time())
+            )
+            self._conn.commit()
+    
+    def complete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE event_id = ?", (key,))
+            self._conn.commit()
+    
+    def fail(self, key: str, event: Dict[str, Any], error: str) -> Optional[float]:
+        """
+        Record a failed attempt
+        
+        Returns:
+            Seconds until the retry, or None if the event was dead-lettered
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO events (event_id, payload, attempts, last_error, received_at)
+                   VALUES (?, ?, 1, ?, ?)
+                   ON CONFLICT(event_id) DO UPDATE SET
+                       attempts = attempts + 1, last_error = excluded.last_error""",
+                (key, json.dumps(event), error, now)
+            )
+            attempts = self._conn.execute(
+                "SELECT attempts FROM events WHERE event_id = ?", (key,)
+            ).fetchone()[0]
+            
+            if attempts >= self.max_attempts:
+                self._conn.execute(
+                    """INSERT OR REPLACE INTO dead_letters
+                       (event_id, payload, attempts, last_error, received_at, failed_at)
+                       SELECT event_id, payload, attempts, last_error, received_at, ?
+                       FROM events WHERE event_id = ?""",
+                    (now, key)
+                )
+                self._conn.execute("DELETE FROM events WHERE event_id = ?", (key,))
+                self._conn.commit()
+                return None
+            
+            delay = self._backoff(attempts)
+            self._conn.execute(
+                "UPDATE events SET next_attempt_at = ? WHERE event_id = ?", (now + delay, key)
+            )
+            self._conn.commit()
+        return delay
+    
+    def claim_due(self, limit: int) -> List[Dict[str, Any]]:
+        """Events whose retry time has come, marked as queued"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT event_id, payload FROM events
+                   WHERE next_attempt_at IS NOT NULL AND next_attempt_at <= ?
+                   ORDER BY next_attempt_at LIMIT ?""",
+                (time.time(), limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE events SET next_attempt_at = NULL WHERE event_id = ?",
+                [(key,) for key, _ in rows]
+            )
+            self._conn.commit()
+        return [json.loads(payload) for _, payload in rows]
+    
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Events that were queued or in flight when the process last stopped"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM events WHERE next_attempt_at IS NULL ORDER BY received_at"
+            ).fetchall()
+        return [json.loads(payload) for payload, in rows]
+    
+    def _backoff(self, attempts: int) -> float:
+        """Exponential in the attempt count, jittered to 50-100% so retries spread out"""
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,22 +1,40 @@
 """
 Intelligent grouping engine for related messages
 """
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
+
 from backend.database.tickets import TicketRepository
 from backend.database.messages import MessageRepository
 from backend.config import settings
 from backend.ai.grouping_classifier import GroupingClassifier
 from backend.ai.title_generator import TitleGenerator
+from backend.processing.vector_index import TicketVectorIndex
+from backend.processing.thread_map import ThreadTicketMap
+from backend.processing import ticket_digest
+from backend.slack.history import ts_to_iso
+from backend.metrics import metrics
+from backend import deadline
+from backend.ai import hedging
 
 logger = logging.getLogger(__name__)
 
+# Ticket fields ingest_message changes (trigger counters, digest, channel name)
+INGEST_SYNC_FIELDS = (
+    "message_count", "last_user_id", "last_user_name",
+    "updated_at", "digest", "channel_name",
+)
+
 
 class GroupingEngine:
     """
     Groups related messages into tickets using:
     P1: Thread-based grouping (strongest signal)
-    P2: Semantic similarity (AI-powered)
+    P2: Embedding cascade (AI-powered for ambiguous matches only)
+    P3: Semantic similarity (only when the deadline left no AI verdict)
     """
     
     def __init__(self):
@@ -24,9 +42,28 @@ class GroupingEngine:
         self.message_repo = MessageRepository()
         self.grouping_classifier = GroupingClassifier()
         self.title_generator = TitleGenerator()
+        self.ticket_index = TicketVectorIndex()
+        self.thread_map = ThreadTicketMap()
+        self.ticket_index.on_status_change = self.thread_map.invalidate_ticket
         self.SIMILARITY_THRESHOLD = settings.SIMILARITY_THRESHOLD
         self.TIME_WINDOW_MINUTES = settings.TIME_WINDOW_MINUTES
+        self.RECENT_TICKETS_HOURS = settings.RECENT_TICKETS_HOURS
         self.AI_GROUPING_CONFIDENCE_THRESHOLD = 0.75  # Minimum confidence for AI grouping
+        self.AI_GROUPING_MAX_CONCURRENCY = settings.AI_GROUPING_MAX_CONCURRENCY
+        self.AI_GROUPING_MODE = settings.AI_GROUPING_MODE
+        self.HIGH_SIMILARITY = settings.GROUPING_HIGH_SIMILARITY
+        self.LOW_SIMILARITY = settings.GROUPING_LOW_SIMILARITY
+        self.LLM_TOP_K = settings.GROUPING_LLM_TOP_K
+        
+        # Cascade counters (how often each band decided, LLM calls made/avoided)
+        self.cascade_stats: Dict[str, int] = {
+            "high_band": 0,
+            "low_band": 0,
+            "ambiguous_band": 0,
+            "deadline_skips": 0,
+            "llm_calls": 0,
+            "llm_calls_avoided": 0,
+        }
     
     async def find_or_create_ticket(
         self,
@@ -35,15 +72,21 @@ class GroupingEngine:
         category: str,
         channel_id: str,
         thread_ts: Optional[str],
-        message_ts: str
-    ) -> Dict[str, Any]:
+        message_ts: str,
+        title: Optional[str] = None,
+        create: bool = True,
+        recent_tickets: Optional[List[Dict[str, Any]]] = None,
+        historical: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Find existing ticket or create new one
         
         Priority order:
         1. Thread-based (if thread_ts exists)
-        2. Semantic similarity (vector search)
-        3. Create new ticket
+        2. Embedding cascade over recent tickets (AI only for the ambiguous band)
+        3. Semantic similarity (vector search), only if the message deadline
+           skipped or cut short the AI check - an AI "no match" is final
+        4. Create new ticket
         
         Args:
             message_text: Message text
@@ -52,139 +95,487 @@ class GroupingEngine:
             channel_id: Slack channel ID
             thread_ts: Thread timestamp (if in thread)
             message_ts: Message timestamp
-            
+            title: Candidate title from fused classification, used only if a
+                new ticket is created (otherwise a title call is made)
+            create: If False, return None instead of creating a ticket (the
+                caller creates it, e.g. through ingest_message)
+            recent_tickets: Candidates already fetched with the thread lookup
+                (ingest_message); skips the thread and recent-ticket queries
+            historical: Backfilled message - grouped on its own ts instead of
+                the clock (see _group_historical)
+        
         Returns:
-            Ticket dict
+            Ticket dict (None only when create is False and nothing matched)
         """
         
         # PRIORITY 1: Thread-based grouping
-        if thread_ts:
+        if thread_ts and recent_tickets is None:
             ticket = await self._find_by_thread(thread_ts, channel_id)
             if ticket:
                 logger.info(f"Grouped by thread: {ticket['id']}")
+                metrics.grouping_path("thread")
                 return ticket
         
-        # PRIORITY 2: AI-based grouping (check recent tickets with AI)
+        if historical:
+            return await self._group_historical(
+                message_text, embedding, category, channel_id, thread_ts, message_ts, title
+            )
+        
+        # PRIORITY 2: Embedding cascade over recent tickets
+        # High band -> group with no LLM call, low band -> new ticket,
+        # only the ambiguous middle band (top-k) reaches the AI grouping classifier
         # NOTE: Category is ignored - we group purely by relevance
-        logger.info(f"🔍 Searching for related tickets using AI in channel {channel_id}")
-        ticket = await self._find_by_ai_grouping(
-            message_text,
-            channel_id
-        )
+        logger.info(f"🔍 Searching for related tickets in channel {channel_id}")
+        if recent_tickets is None:
+            recent_tickets = await self._find_recent_tickets(channel_id)
+        ranked = self._rank_by_similarity(embedding, recent_tickets)
+        # LLM calls the AI grouping would have made over every recent ticket
+        baseline_calls = self._ai_grouping_calls(len(recent_tickets))
+        
+        if ranked and ranked[0][1] >= self.HIGH_SIMILARITY:
+            ticket, similarity = ranked[0]
+            self.cascade_stats["high_band"] += 1
+            self.cascade_stats["llm_calls_avoided"] += baseline_calls
+            logger.info(
+                f"✅ Grouped by similarity (high band): {ticket['id']} "
+                f"(score: {similarity:.3f})"
+            )
+            metrics.grouping_path("high_band")
+            return ticket
+        
+        shortlist = [
+            ticket for ticket, similarity in ranked
+            if similarity >= self.LOW_SIMILARITY
+        ][:self.LLM_TOP_K]
+        
+        if not shortlist:
+            self.cascade_stats["low_band"] += 1
+            self.cascade_stats["llm_calls_avoided"] += baseline_calls
+            best = f"{ranked[0][1]:.3f}" if ranked else "n/a"
+            logger.info(f"No candidate above low band (best: {best}) - creating new ticket")
+            metrics.grouping_path("low_band")
+            if not create:
+                return None
+            return await self._create_ticket(
+                message_text,
+                embedding,
+                category,
+                channel_id,
+                thread_ts or message_ts,
+                title
+            )
+        
+        self.cascade_stats["ambiguous_band"] += 1
+        ticket = None
+        # Set when the deadline leaves the ambiguous band without an AI verdict
+        similarity_fallback = False
+        if deadline.has_time_for(hedging.expected_seconds("grouping")):
+            llm_calls = self._ai_grouping_calls(len(shortlist))
+            self.cascade_stats["llm_calls"] += llm_calls
+            self.cascade_stats["llm_calls_avoided"] += baseline_calls - llm_calls
+            logger.info(f"Checking {len(shortlist)} ambiguous candidates with AI")
+            try:
+                ticket = await self._find_by_ai_grouping(
+                    message_text,
+                    shortlist
+                )
+            except deadline.DeadlineExceeded:
+                self.cascade_stats["deadline_skips"] += 1
+                logger.warning("AI grouping cut short by the message deadline - trying similarity search")
+                similarity_fallback = True
+        else:
+            # Message deadline too close for an LLM round: similarity search or a new ticket
+            self.cascade_stats["deadline_skips"] += 1
+            self.cascade_stats["llm_calls_avoided"] += baseline_calls
+            metrics.degradation("skip_ai_grouping")
+            logger.warning(f"Skipping AI grouping: {deadline.remaining():.2f}s left for this message")
+            similarity_fallback = True
         if ticket:
             logger.info(f"✅ Grouped by AI: {ticket['id']}")
+            metrics.grouping_path("ai")
             return ticket
-        else:
-            logger.info("No AI grouping match found - trying similarity search")
         
         # PRIORITY 3: Semantic similarity (fallback)
+        # Only without an AI verdict: the search would return the same ambiguous
+        # candidates, so after an AI "no match" it would overrule the AI
         # NOTE: Category is ignored - we group purely by semantic similarity
-        logger.debug(f"Searching for similar tickets using embeddings in channel {channel_id}")
-        ticket = await self._find_by_similarity(
-            embedding,
-            channel_id
-        )
-        if ticket:
-            similarity_score = ticket.get('similarity', 0)
-            logger.info(
-                f"✅ Grouped by similarity: {ticket['id']} "
-                f"(score: {similarity_score:.3f})"
+        if similarity_fallback:
+            logger.debug(f"Searching for similar tickets using embeddings in channel {channel_id}")
+            ticket = await self._find_by_similarity(
+                embedding,
+                channel_id
             )
-            return ticket
+            if ticket:
+                similarity_score = ticket.get('similarity', 0)
+                logger.info(
+                    f"✅ Grouped by similarity: {ticket['id']} "
+                    f"(score: {similarity_score:.3f})"
+                )
+                metrics.grouping_path("similarity")
+                return ticket
+            else:
+                logger.debug("No similar tickets found - will create new ticket")
         else:
-            logger.debug("No similar tickets found - will create new ticket")
+            logger.info("AI rejected every ambiguous candidate - creating new ticket")
         
         # No match found -> Create new ticket
         logger.info(f"Creating new ticket for: {message_text[:50]}")
+        metrics.grouping_path("new")
+        if not create:
+            return None
         ticket = await self._create_ticket(
             message_text,
             embedding,
             category,
             channel_id,
-            thread_ts or message_ts
+            thread_ts or message_ts,
+            title
         )
         
         return ticket
     
+    async def _group_historical(
+        self,
+        message_text: str,
+        embedding: List[float],
+        category: str,
+        channel_id: str,
+        thread_ts: Optional[str],
+        message_ts: str,
+        title: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Group a backfilled message by its own time (thread already checked)
+        
+        The live cascade measures "recent" against the clock, so during a
+        backfill every ticket created minutes ago looks recent, however old
+        its messages. Here the candidates are open tickets whose thread root
+        is within RECENT_TICKETS_HOURS of message_ts, only the high band
+        groups (no AI check, no similarity search over live tickets) and a
+        new ticket is stamped with the message's time.
+        """
+        candidates = await self.ticket_repo.find_open_near_ts(
+            channel_id,
+            message_ts,
+            hours=self.RECENT_TICKETS_HOURS,
+            limit=10
+        )
+        ranked = self._rank_by_similarity(embedding, candidates)
+        if ranked and ranked[0][1] >= self.HIGH_SIMILARITY:
+            ticket, similarity = ranked[0]
+            self.cascade_stats["high_band"] += 1
+            logger.info(f"✅ Grouped historical message by similarity: {ticket['id']} (score: {similarity:.3f})")
+            metrics.grouping_path("high_band")
+            return ticket
+        
+        metrics.grouping_path("new")
+        return await self._create_ticket(
+            message_text,
+            embedding,
+            category,
+            channel_id,
+            thread_ts or message_ts,
+            title,
+            created_at=ts_to_iso(message_ts)
+        )
+    
+    async def start(self) -> None:
+        """Load the local ticket index (call once at startup)"""
+        await self.ticket_index.start()
+    
+    async def _find_recent_tickets(self, channel_id: str) -> List[Dict[str, Any]]:
+        """Recent open tickets in a channel, from the local index when it is loaded"""
+        if self.ticket_index.ready:
+            return self.ticket_index.recent(
+                channel_id,
+                hours=self.RECENT_TICKETS_HOURS,
+                limit=10  # Check top 10 most recent
+            )
+        return await self.ticket_repo.find_recent_tickets(
+            channel_id=channel_id,
+            hours=self.RECENT_TICKETS_HOURS,
+            limit=10  # Check top 10 most recent
+        )
+    
     async def _find_by_thread(
         self,
         thread_ts: str,
         channel_id: str
     ) -> Optional[Dict[str, Any]]:
-        """Find ticket by thread timestamp (strongest signal)"""
-        return await self.ticket_repo.find_by_thread(thread_ts, channel_id)
+        """Find ticket by thread timestamp (strongest signal), via the thread map"""
+        found, ticket = self.thread_map.lookup(channel_id, thread_ts)
+        if found:
+            return ticket
+        
+        ticket = await self.ticket_repo.find_by_thread(thread_ts, channel_id)
+        if ticket:
+            self.thread_map.put(ticket)
+        else:
+            self.thread_map.put_negative(channel_id, thread_ts)
+        return ticket
+    
+    def record_message(self, ticket: Dict[str, Any], user_id: str, user_name: str) -> None:
+        """
+        Mirror the increment_ticket_message_count trigger on local ticket copies
+        
+        Updates the indexed copy and, when the caller holds a different dict
+        (e.g. one cached in the thread map), that one too.
+        """
+        indexed = self.ticket_index.get(ticket["id"])
+        self.ticket_index.record_message(ticket["id"], user_id, user_name)
+        if indexed is not ticket:
+            ticket["message_count"] = ticket.get("message_count", 0) + 1
+            ticket["last_user_id"] = user_id
+            ticket["last_user_name"] = user_name
+    
+    def sync_ticket(self, ticket: Dict[str, Any]) -> None:
+        """Refresh local copies from a ticket row written by ingest_message"""
+        self.ticket_index.update(ticket["id"], {
+            field: ticket[field] for field in INGEST_SYNC_FIELDS if field in ticket
+        })
+        self.thread_map.put(self.ticket_index.get(ticket["id"]) or ticket)
     
     async def _find_by_ai_grouping(
         self,
         message_text: str,
-        channel_id: str
+        candidates: List[Dict[str, Any]]
     ) -> Optional[Dict[str, Any]]:
         """
         Find related tickets using AI-based grouping
-        Checks recent tickets (last 24 hours) to see if they're about the same issue
+        Checks candidate tickets (best first) to see if they're about the same issue
+        
+        AI_GROUPING_MODE selects how candidates are checked:
+        - "pairwise": one classifier call per candidate (see _find_by_pairwise)
+        - "listwise": one classifier call ranking all candidates (see _find_by_listwise)
+        
+        Raises:
+            DeadlineExceeded: The message deadline cut the check short (no verdict)
         """
         try:
-            # Get recent tickets from same channel (last 24 hours, no time limit for AI)
-            # We'll search a wider window since AI can handle context better
-            logger.info(f"Fetching recent tickets (last 24h) for AI grouping check...")
-            recent_tickets = await self.ticket_repo.find_recent_tickets(
-                channel_id=channel_id,
-                hours=24,  # Check last 24 hours
-                limit=10  # Check top 10 most recent
-            )
-            
-            logger.info(f"Found {len(recent_tickets)} recent tickets to check with AI")
-            
-            if not recent_tickets:
-                logger.debug("No recent tickets found for AI grouping")
-                return None
-            
-            # Get first message from each ticket for comparison
-            for ticket in recent_tickets:
-                ticket_id = ticket.get("id")
-                ticket_title = ticket.get("title", "")
+            if self.AI_GROUPING_MODE == "listwise":
+                return await self._find_by_listwise(message_text, candidates)
+            return await self._find_by_pairwise(message_text, candidates)
+        
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Error in AI-based grouping: {e}", exc_info=True)
+            # No match (safer than grouping into an unverified ticket)
+            return None
+    
+    def _ai_grouping_calls(self, num_candidates: int) -> int:
+        """LLM calls the AI grouping makes for this many candidates"""
+        if not num_candidates:
+            return 0
+        return 1 if self.AI_GROUPING_MODE == "listwise" else num_candidates
+    
+    @staticmethod
+    def _rank_by_similarity(
+        embedding: List[float],
+        tickets: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Score tickets by cosine similarity to the message embedding
+        
+        Returns:
+            (ticket, similarity) pairs, most similar first; tickets without an
+            embedding are skipped
+        """
+        scored_tickets = []
+        vectors = []
+        # Candidates from ingest_message come scored by the DB instead
+        precomputed = []
+        for ticket in tickets:
+            ticket_embedding = ticket.get("embedding")
+            if ticket_embedding is None or len(ticket_embedding) == 0:
+                if ticket.get("similarity") is not None:
+                    precomputed.append((ticket, float(ticket["similarity"])))
+                continue
+            # PostgREST returns pgvector columns as a "[...]" string
+            if isinstance(ticket_embedding, str):
+                ticket_embedding = json.loads(ticket_embedding)
+            scored_tickets.append(ticket)
+            vectors.append(ticket_embedding)
+        
+        if not vectors:
+            return sorted(precomputed, key=lambda pair: -pair[1])
+        
+        matrix = np.asarray(vectors, dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = matrix @ query / np.where(norms == 0, 1, norms)
+        
+        ranked = precomputed + [
+            (ticket, float(similarity)) for ticket, similarity in zip(scored_tickets, similarities)
+        ]
+        return sorted(ranked, key=lambda pair: -pair[1])
+    
+    async def _find_by_pairwise(
+        self,
+        message_text: str,
+        recent_tickets: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Check each candidate ticket with its own classifier call
+        
+        Candidates are checked concurrently (capped by AI_GROUPING_MAX_CONCURRENCY).
+        The earliest matching candidate in list order wins - the same answer the
+        sequential scan would give - and outstanding checks are cancelled as soon
+        as it is known.
+        """
+        semaphore = asyncio.Semaphore(self.AI_GROUPING_MAX_CONCURRENCY)
+        
+        async def check(index: int, ticket: Dict[str, Any]) -> Tuple[int, bool]:
+            async with semaphore:
+                return index, await self._ai_matches_ticket(message_text, ticket)
+        
+        # Candidates are ranked best first: lower index wins
+        tasks = {
+            asyncio.create_task(check(index, ticket)): index
+            for index, ticket in enumerate(recent_tickets)
+        }
+        results: Dict[int, bool] = {}
+        cut_short = False
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        index, matched = task.result()
+                    except deadline.DeadlineExceeded:
+                        cut_short = True
+                        index, matched = tasks[task], False
+                    except Exception as e:
+                        logger.warning(f"AI grouping check failed: {e}")
+                        index, matched = tasks[task], False
+                    results[index] = matched
                 
-                # Get first message from this ticket
-                messages = await self.message_repo.get_by_ticket(ticket_id)
-                if not messages:
+                matches = [index for index, matched in results.items() if matched]
+                if not matches:
                     continue
+                best = min(matches)
                 
-                first_message = messages[0].get("text", "")
+                # Less recent candidates can no longer win
+                for task in list(pending):
+                    if tasks[task] > best:
+                        task.cancel()
+                        pending.discard(task)
                 
-                # Use AI to check if messages are about same issue
-                logger.info(
-                    f"🤖 AI checking: '{message_text[:50]}...' vs ticket '{ticket_title[:50]}...'"
-                )
-                is_same, confidence, reasoning = await self.grouping_classifier.are_same_issue(
-                    message1=first_message,
-                    message2=message_text,
-                    ticket_title=ticket_title
-                )
-                
-                logger.info(
-                    f"AI result: same={is_same}, confidence={confidence:.2f}, "
-                    f"reasoning={reasoning[:100]}"
-                )
-                
-                if is_same and confidence >= self.AI_GROUPING_CONFIDENCE_THRESHOLD:
-                    logger.info(
-                        f"✅ AI grouping match: confidence={confidence:.2f}, "
-                        f"reasoning={reasoning}"
-                    )
-                    return ticket
-                else:
-                    logger.debug(
-                        f"❌ AI grouping: not same (confidence={confidence:.2f}, "
-                        f"threshold={self.AI_GROUPING_CONFIDENCE_THRESHOLD}, "
-                        f"reasoning={reasoning[:100]})"
-                    )
+                # Winner is final once every more recent candidate has answered
+                if all(index in results for index in range(best)):
+                    return recent_tickets[best]
             
+            if cut_short:
+                # Some candidates never got a verdict: not a real "no match"
+                raise deadline.DeadlineExceeded("AI grouping cut short")
             return None
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _find_by_listwise(
+        self,
+        message_text: str,
+        recent_tickets: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Rank all candidate tickets against the message with one classifier call
+        """
+        semaphore = asyncio.Semaphore(self.AI_GROUPING_MAX_CONCURRENCY)
         
-        except Exception as e:
-            logger.error(f"Error in AI-based grouping: {e}", exc_info=True)
-            # Fall back to similarity-based grouping
+        async def first_message(ticket: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self._first_message(ticket)
+        
+        first_messages = await asyncio.gather(
+            *(first_message(ticket) for ticket in recent_tickets)
+        )
+        candidates = [
+            {
+                "id": ticket["id"],
+                "title": ticket.get("title", ""),
+                "first_message": text
+            }
+            for ticket, text in zip(recent_tickets, first_messages)
+            if text
+        ]
+        if not candidates:
             return None
+        
+        logger.info(
+            f"🤖 AI ranking: '{message_text[:50]}...' against {len(candidates)} tickets"
+        )
+        ticket_id, confidence, reasoning = await self.grouping_classifier.find_best_match(
+            message=message_text,
+            candidates=candidates
+        )
+        
+        logger.info(
+            f"AI result: ticket={ticket_id}, confidence={confidence:.2f}, "
+            f"reasoning={reasoning[:100]}"
+        )
+        
+        if ticket_id and confidence >= self.AI_GROUPING_CONFIDENCE_THRESHOLD:
+            logger.info(
+                f"✅ AI grouping match: confidence={confidence:.2f}, "
+                f"reasoning={reasoning}"
+            )
+            return next(ticket for ticket in recent_tickets if ticket["id"] == ticket_id)
+        
+        return None
+    
+    async def _first_message(self, ticket: Dict[str, Any]) -> str:
+        """First message text of a ticket, from its digest when it has one"""
+        text = ticket_digest.first_message_text(ticket.get("digest")) or ticket.get("first_message")
+        if text is not None:
+            return text
+        # Tickets created before digests existed
+        messages = await self.message_repo.get_by_ticket(ticket["id"])
+        return messages[0].get("text", "") if messages else ""
+    
+    async def _ai_matches_ticket(
+        self,
+        message_text: str,
+        ticket: Dict[str, Any]
+    ) -> bool:
+        """Ask the grouping classifier whether a message belongs to one ticket"""
+        ticket_title = ticket.get("title", "")
+        
+        first_message = await self._first_message(ticket)
+        if not first_message:
+            return False
+        
+        # Use AI to check if messages are about same issue
+        logger.info(
+            f"🤖 AI checking: '{message_text[:50]}...' vs ticket '{ticket_title[:50]}...'"
+        )
+        is_same, confidence, reasoning = await self.grouping_classifier.are_same_issue(
+            message1=first_message,
+            message2=message_text,
+            ticket_title=ticket_title
+        )
+        
+        logger.info(
+            f"AI result: same={is_same}, confidence={confidence:.2f}, "
+            f"reasoning={reasoning[:100]}"
+        )
+        
+        if is_same and confidence >= self.AI_GROUPING_CONFIDENCE_THRESHOLD:
+            logger.info(
+                f"✅ AI grouping match: confidence={confidence:.2f}, "
+                f"reasoning={reasoning}"
+            )
+            return True
+        
+        logger.debug(
+            f"❌ AI grouping: not same (confidence={confidence:.2f}, "
+            f"threshold={self.AI_GROUPING_CONFIDENCE_THRESHOLD}, "
+            f"reasoning={reasoning[:100]})"
+        )
+        return False
     
     async def _find_by_similarity(
         self,
@@ -199,14 +590,26 @@ class GroupingEngine:
         - Same channel (avoid cross-contamination)
         - Recent tickets (last 30 min)
         - Open tickets only
+        
+        Answered from the local ticket index when loaded, otherwise by the
+        find_similar_tickets RPC.
         """
-        similar_tickets = await self.ticket_repo.find_similar(
-            embedding=embedding,
-            channel_id=channel_id,
-            time_window_minutes=self.TIME_WINDOW_MINUTES,
-            similarity_threshold=self.SIMILARITY_THRESHOLD,
-            max_results=5
-        )
+        if self.ticket_index.ready:
+            similar_tickets = self.ticket_index.search(
+                embedding=embedding,
+                channel_id=channel_id,
+                time_window_minutes=self.TIME_WINDOW_MINUTES,
+                similarity_threshold=self.SIMILARITY_THRESHOLD,
+                max_results=5
+            )
+        else:
+            similar_tickets = await self.ticket_repo.find_similar(
+                embedding=embedding,
+                channel_id=channel_id,
+                time_window_minutes=self.TIME_WINDOW_MINUTES,
+                similarity_threshold=self.SIMILARITY_THRESHOLD,
+                max_results=5
+            )
         
         if not similar_tickets:
             logger.debug(f"No similar tickets found (threshold: {self.SIMILARITY_THRESHOLD})")
@@ -242,29 +645,22 @@ class GroupingEngine:
     
     async def _get_full_ticket(self, ticket_id: str) -> Optional[Dict[str, Any]]:
         """Fetch full ticket data by ID"""
-        try:
-            from backend.database.client import supabase_client
-            result = supabase_client.table("tickets").select("*").eq("id", ticket_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error fetching full ticket {ticket_id}: {e}", exc_info=True)
-            return None
+        ticket = self.ticket_index.get(ticket_id)
+        if ticket is not None:
+            return ticket
+        return await self.ticket_repo.get_by_id(ticket_id)
     
-    async def _create_ticket(
+    async def new_ticket_title(
         self,
         message_text: str,
-        embedding: List[float],
         category: str,
-        channel_id: str,
-        first_message_ts: str
-    ) -> Dict[str, Any]:
-        """
-        Create new ticket with AI-generated title
+        title: Optional[str] = None
+    ) -> str:
+        """Title for a ticket opened by this message (fused title if there is one)"""
+        if title:
+            logger.info(f"Using title from classification: {title}")
+            return title
         
-        Note: category parameter is kept for backward compatibility but tickets
-        no longer have a single category - messages have individual categories.
-        We use the first message's category as the ticket's initial category.
-        """
         # Generate AI title based on message context
         try:
             title = await self.title_generator.generate_title(
@@ -278,6 +674,33 @@ class GroupingEngine:
             title = message_text[:80].strip()
             if len(message_text) > 80:
                 title += "..."
+        return title
+    
+    def register_ticket(self, ticket: Dict[str, Any], embedding: List[float]) -> None:
+        """Add a newly created ticket to the local index and thread map"""
+        self.ticket_index.upsert({**ticket, "embedding": embedding})
+        self.thread_map.put(ticket)
+    
+    async def _create_ticket(
+        self,
+        message_text: str,
+        embedding: List[float],
+        category: str,
+        channel_id: str,
+        first_message_ts: str,
+        title: Optional[str] = None,
+        created_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create new ticket with AI-generated title
+        
+        Note: category parameter is kept for backward compatibility but tickets
+        no longer have a single category - messages have individual categories.
+        We use the first message's category as the ticket's initial category.
+        A title from fused classification saves the separate title call.
+        created_at backdates a ticket created for a historical message.
+        """
+        title = await self.new_ticket_title(message_text, category, title)
         
         ticket_data = {
             "title": title,
@@ -287,6 +710,11 @@ class GroupingEngine:
             "first_message_ts": first_message_ts,
             "embedding": embedding
         }
+        if created_at:
+            ticket_data["created_at"] = created_at
         
-        return await self.ticket_repo.create(ticket_data)
+        ticket = await self.ticket_repo.create(ticket_data)
+        if ticket:
+            self.register_ticket(ticket, embedding)
+        return ticket
 
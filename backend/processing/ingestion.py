@@ -0,0 +1,336 @@
+"""
+Ingestion stage between the Slack listener and the processing pipeline
+"""
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.config import settings
+from backend.processing.message_processor import MessageProcessor
+from backend.processing.event_journal import EventJournal, event_id
+from backend.processing.coalescer import BurstCoalescer
+from backend.metrics import metrics, stats_samples
+
+logger = logging.getLogger(__name__)
+
+ThreadKey = Tuple[str, str]
+
+_JOURNAL_ERROR = object()  # Returned by _journal when the journal call raised
+
+
+class IngestionQueue:
+    """
+    Bounded queue + worker pool in front of MessageProcessor
+    
+    - At most `max_size` events are pending at once; `submit` waits when full
+      (backpressure on the listener instead of unbounded task pile-up)
+    - Events are grouped into per-thread lanes keyed by (channel_id, thread_ts),
+      where a thread root uses its own ts. A lane is owned by one worker at a
+      time, so replies in one thread are processed strictly in arrival order
+    - Different threads are processed in parallel by up to `workers` workers
+    - With an event journal (EVENT_JOURNAL_PATH), every accepted event is
+      written to disk before it is queued (`accept`, which the Slack
+      listener awaits before acking) and removed once processed; failed
+      events are retried with backoff, poison events end up dead-lettered and
+      events interrupted by a restart are replayed on start
+    - With COALESCE_WINDOW_SECONDS, new messages are first buffered per
+      (channel, thread root) and user; a burst is queued as one item in its
+      thread's lane and runs the pipeline once (MessageProcessor.process_burst)
+    """
+    
+    def __init__(
+        self,
+        processor: MessageProcessor,
+        max_size: int = None,
+        workers: int = None,
+        journal: Optional[EventJournal] = None
+    ):
+        self.processor = processor
+        self.max_size = max_size or settings.INGESTION_QUEUE_MAX_SIZE
+        self.num_workers = workers or settings.INGESTION_WORKERS
+        self.journal = journal if journal is not None else EventJournal.from_settings()
+        
+        self._ready: asyncio.Queue = asyncio.Queue()  # thread keys with pending work
+        self._lanes: Dict[ThreadKey, Deque[Tuple[List[Dict[str, Any]], Any, float]]] = {}
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._workers: List[asyncio.Task] = []
+        self._depth = 0
+        self._retry_task: Optional[asyncio.Task] = None
+        self._slack_client = None  # Used for replayed and retried events
+        # Deliveries of each event id queued or in flight (the journal row stays until the last one succeeds)
+        self._deliveries: Dict[str, int] = {}
+        # Last submit of each thread still on its way into the lane (keeps arrival order across awaits)
+        self._arrivals: Dict[ThreadKey, asyncio.Event] = {}
+        self.coalescer = BurstCoalescer(self._enqueue) if settings.COALESCE_WINDOW_SECONDS > 0 else None
+        
+        # Metrics
+        self.metrics: Dict[str, float] = {
+            "submitted": 0,
+            "processed": 0,
+            "failed": 0,
+            "backpressure_waits": 0,
+            "max_depth": 0,
+            "total_queue_wait_seconds": 0.0,
+            "replayed": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+            "journal_errors": 0,
+        }
+        metrics.register_collector(self._metric_samples)
+    
+    @staticmethod
+    def thread_key(event: Dict[str, Any]) -> ThreadKey:
+        """Ordering key: (channel_id, thread root ts)"""
+        return (event.get("channel", ""), event.get("thread_ts") or event.get("ts", ""))
+    
+    def in_flight(self, event: Dict[str, Any]) -> bool:
+        """Whether a delivery of this event is buffered, queued or being processed"""
+        if self.coalescer is not None and self.coalescer.holds(event):
+            return True
+        return event_id(event) in self._deliveries
+    
+    @property
+    def depth(self) -> int:
+        """Number of accepted events not yet finished"""
+        return self._depth
+    
+    async def start(self, slack_client=None) -> None:
+        """
+        Start the worker pool (and replay journaled events left unfinished)
+        
+        Args:
+            slack_client: Slack WebClient for replayed and retried events
+        """
+        if self._workers:
+            return
+        self._slack_client = slack_client
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        logger.info(
+            f"Ingestion queue started: workers={self.num_workers}, max_size={self.max_size}"
+        )
+        
+        if self.journal is not None:
+            unfinished = await asyncio.to_thread(self.journal.unfinished)
+            if unfinished:
+                logger.info(f"Replaying {len(unfinished)} unfinished events from the journal")
+            for event in unfinished:
+                self.metrics["replayed"] += 1
+                await self._enqueue([event], slack_client)
+            self._retry_task = asyncio.create_task(self._retry_loop(), name="ingestion-retries")
+    
+    async def accept(self, event: Dict[str, Any]) -> None:
+        """
+        Journal an event before Slack is acked (no-op without a journal)
+        
+        An event acked after this returned survives a crash before `submit`;
+        it is replayed on the next start. A journal failure is logged and the
+        event is only held in memory.
+        """
+        if self.journal is not None:
+            await self._journal(self.journal.record, event_id(event), event)
+    
+    async def submit(self, event: Dict[str, Any], slack_client, journaled: bool = False) -> None:
+        """
+        Queue an event for processing
+        
+        Waits (backpressure) while `max_size` events are already pending.
+        Events of one thread enter their lane in the order `submit` was
+        called, even when an earlier journal write finishes later.
+        
+        Args:
+            event: Slack event payload
+            slack_client: Slack WebClient instance
+            journaled: `accept` already ran for this event
+        """
+        if self._slack_client is None:
+            self._slack_client = slack_client
+        # Take a place in the thread's line before the first await
+        thread = self.thread_key(event)
+        previous = self._arrivals.get(thread)
+        turn = self._arrivals[thread] = asyncio.Event()
+        try:
+            if not journaled:
+                await self.accept(event)
+            if previous is not None:
+                await previous.wait()
+            if self.coalescer is not None:
+                await self.coalescer.add(event, slack_client)
+            else:
+                await self._enqueue([event], slack_client)
+        finally:
+            turn.set()
+            if self._arrivals.get(thread) is turn:
+                del self._arrivals[thread]
+    
+    async def _enqueue(self, events: List[Dict[str, Any]], slack_client) -> None:
+        """Put events (one, or a coalesced burst) in their thread lane (waits while the queue is full)"""
+        for event in events:
+            if self._slots.locked():
+                self.metrics["backpressure_waits"] += 1
+                logger.warning(f"Ingestion queue full ({self._depth}/{self.max_size}), waiting")
+            await self._slots.acquire()
+            
+            self._depth += 1
+            self.metrics["submitted"] += 1
+            key = event_id(event)
+            self._deliveries[key] = self._deliveries.get(key, 0) + 1
+        self.metrics["max_depth"] = max(self.metrics["max_depth"], self._depth)
+        
+        thread = self.thread_key(events[0])
+        lane = self._lanes.get(thread)
+        item = (events, slack_client, time.monotonic())
+        if lane is not None:
+            # Lane already queued or owned by a worker - it will drain this in order
+            lane.append(item)
+        else:
+            self._lanes[thread] = deque([item])
+            self._ready.put_nowait(thread)
+    
+    async def join(self) -> None:
+        """Wait until every accepted event has been processed"""
+        while self._depth or (self.coalescer is not None and self.coalescer.pending):
+            await asyncio.sleep(0.05)
+    
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the workers, optionally draining pending events first"""
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            await asyncio.gather(self._retry_task, return_exceptions=True)
+            self._retry_task = None
+        if drain:
+            if self.coalescer is not None:
+                await self.coalescer.drain()
+            await self.join()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+    
+    def stats(self) -> Dict[str, float]:
+        """Current queue metrics"""
+        return {
+            **self.metrics,
+            "depth": self._depth,
+            "active_threads": len(self._lanes),
+            "workers": len(self._workers),
+            "coalesce_pending": self.coalescer.pending if self.coalescer else 0,
+        }
+    
+    def _metric_samples(self) -> List[Any]:
+        """Queue depth gauges and counters for the metrics endpoint"""
+        counters = {
+            key: value for key, value in self.metrics.items()
+            if key not in ("max_depth", "total_queue_wait_seconds")  # wait: queue_wait stage histogram
+        }
+        gauges = {
+            "depth": self._depth,
+            "max_depth": self.metrics["max_depth"],
+            "active_threads": len(self._lanes),
+            "workers": len(self._workers),
+        }
+        if self.coalescer is not None:
+            gauges["coalesce_pending"] = self.coalescer.pending
+        samples = (
+            stats_samples("ingestion_queue_total", "counter", "Ingestion queue events", counters, "event")
+            + stats_samples("ingestion_queue", "gauge", "Ingestion queue state", gauges, "field")
+        )
+        if self.coalescer is not None:
+            samples += stats_samples(
+                "burst_coalescing_total", "counter", "Burst coalescing events", self.coalescer.stats, "event"
+            )
+        return samples
+    
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            key = await self._ready.get()
+            lane = self._lanes[key]
+            try:
+                while lane:
+                    events, slack_client, enqueued_at = lane.popleft()
+                    waited = time.monotonic() - enqueued_at
+                    self.metrics["total_queue_wait_seconds"] += waited
+                    metrics.observe_stage("queue_wait", waited)
+                    await self._process(events, slack_client)
+            finally:
+                # Lane is empty: release it so the next event for this thread opens a new one
+                if not lane:
+                    del self._lanes[key]
+                else:
+                    self._ready.put_nowait(key)
+                self._ready.task_done()
+    
+    async def _process(self, events: List[Dict[str, Any]], slack_client) -> None:
+        handled = False
+        error = "process_message reported a failure"
+        try:
+            if len(events) == 1:
+                handled = await self.processor.process_message(events[0], slack_client)
+            else:
+                handled = await self.processor.process_burst(events, slack_client)
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error processing queued message: {e}", exc_info=True)
+        finally:
+            self.metrics["processed" if handled else "failed"] += len(events)
+            for _ in events:
+                self._slots.release()
+        # A failed burst is journaled (and retried) message by message; the
+        # events count as pending until then so a draining stop waits for it
+        try:
+            for event in events:
+                await self._settle(event, handled, error)
+        finally:
+            self._depth -= len(events)
+    
+    async def _settle(self, event: Dict[str, Any], handled: bool, error: str) -> None:
+        """Complete or reschedule the event's journal row"""
+        key = event_id(event)
+        remaining = self._deliveries.get(key, 1) - 1
+        if remaining:
+            self._deliveries[key] = remaining
+        else:
+            self._deliveries.pop(key, None)
+        if self.journal is None:
+            return
+        
+        if handled:
+            if not remaining:
+                await self._journal(self.journal.complete, key)
+            return
+        delay = await self._journal(self.journal.fail, key, event, error)
+        if delay is _JOURNAL_ERROR:
+            logger.warning(f"Event {key} failed and its retry state could not be journaled: {error}")
+        elif delay is None:
+            self.metrics["dead_lettered"] += 1
+            logger.error(f"Event {key} dead-lettered after {self.journal.max_attempts} attempts: {error}")
+        else:
+            logger.warning(f"Event {key} failed, retrying in {delay:.1f}s")
+    
+    async def _retry_loop(self) -> None:
+        """Re-queue journaled events whose backoff has elapsed"""
+        while True:
+            await asyncio.sleep(settings.EVENT_RETRY_POLL_SECONDS)
+            due = await self._journal(self.journal.claim_due, max(1, self.max_size // 2))
+            if due is _JOURNAL_ERROR:
+                continue
+            for event in due:
+                self.metrics["retried"] += 1
+                await self._enqueue([event], self._slack_client)
+    
+    async def _journal(self, method, *args):
+        """Run a journal call in a thread; a journal failure is logged and counted, never fatal"""
+        try:
+            return await asyncio.to_thread(method, *args)
+        except sqlite3.Error as e:
+            self.metrics["journal_errors"] += 1
+            logger.error(f"Event journal {method.__name__} failed: {e}")
+            return _JOURNAL_ERROR
@@ -4,15 +4,24 @@ Main message processing pipeline orchestrator
 import asyncio
 import time
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 from backend.ai.classifier import MessageClassifier
 from backend.ai.embeddings import EmbeddingGenerator
+from backend.ai.prefilter import ChitChatPrefilter
 from backend.processing.grouping_engine import GroupingEngine
 from backend.processing.deduplication import DeduplicationChecker
+from backend.processing.title_refresh import TitleRefreshScheduler
+from backend.processing.ticket_writes import TicketWriteBuffer
+from backend.processing import ticket_digest
 from backend.database.tickets import TicketRepository
 from backend.database.messages import MessageRepository
 from backend.slack.utils import SlackUtils
+from backend.slack import history
+from backend.models import Classification
+from backend.config import settings
+from backend.metrics import metrics, stats_samples
+from backend import deadline
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +38,29 @@ class MessageProcessor:
     
     def __init__(self):
         self.classifier = MessageClassifier()
+        self.prefilter = ChitChatPrefilter() if settings.PREFILTER_ENABLED else None
         self.embedder = EmbeddingGenerator()
         self.grouper = GroupingEngine()
         self.dedup = DeduplicationChecker()
         self.ticket_repo = TicketRepository()
+        self.ticket_writes = TicketWriteBuffer(ticket_repo=self.ticket_repo)
+        self.title_refresh = TitleRefreshScheduler(
+            self.grouper.title_generator,
+            self.grouper.ticket_index,
+            ticket_writes=self.ticket_writes
+        )
         self.message_repo = MessageRepository()
         self.slack_utils = SlackUtils()
+        self._name_warm_up: Optional[asyncio.Task] = None
+        metrics.register_collector(self._metric_samples)
     
-    async def process_message(self, event: Dict[str, Any], slack_client) -> None:
+    async def process_message(
+        self,
+        event: Dict[str, Any],
+        slack_client,
+        precomputed: Optional[Tuple[Classification, List[float]]] = None,
+        historical: bool = False
+    ) -> bool:
         """
         Main processing pipeline
         
@@ -51,8 +75,21 @@ class MessageProcessor:
         Args:
             event: Slack event payload
             slack_client: Slack WebClient instance
+            precomputed: (classification, embedding) computed in a batch by the
+                caller (backfill); skips steps 2 and 3
+            historical: Message from channel history (backfill): grouped and
+                timestamped by its own ts, always through _group_and_store
+        
+        Returns:
+            True if the message was handled (stored, skipped or a duplicate),
+            False if processing failed and it should be retried
         """
         start_time = time.time()
+        slack_message_id = None
+        scope = metrics.start_message()
+        outcome = "skipped"
+        # Budget for every stage below (and the tasks they spawn)
+        deadline_token = deadline.start(settings.MESSAGE_DEADLINE_SECONDS)
         
         try:
             # Extract core fields
@@ -65,7 +102,7 @@ class MessageProcessor:
             # Skip if no text
             if not message_text or not user_id or not channel_id:
                 logger.warning(f"Skipping invalid event: {event}")
-                return
+                return True
             
             # Create unique message ID
             slack_message_id = f"{channel_id}:{message_ts}"
@@ -73,96 +110,63 @@ class MessageProcessor:
             logger.info(f"Processing message: {slack_message_id}")
             
             # STEP 1: De-duplication (CRITICAL)
-            if await self.dedup.is_processed(slack_message_id):
+            # Claim first so two concurrent deliveries can't both pass the check
+            outcome = "duplicate"
+            if not self.dedup.claim(slack_message_id):
+                slack_message_id = None  # Owned by the other delivery
+                return True
+            
+            with metrics.stage("dedup"):
+                already_processed = await self.dedup.is_processed(slack_message_id)
+            if already_processed:
                 logger.info(f"Message {slack_message_id} already processed")
-                return
+                return True
+            
+            # Obvious chit-chat is rejected locally: no LLM call, no embedding
+            if self.prefilter is not None:
+                with metrics.stage("prefilter"):
+                    rejection = self.prefilter.check(message_text)
+                if rejection is not None:
+                    logger.info(f"Message not relevant ({rejection.reasoning}): {message_text[:50]}")
+                    self._skip_irrelevant(slack_message_id, channel_id, message_ts, thread_ts)
+                    outcome = "prefiltered"
+                    return True
             
             # STEP 2 & 3: Classification + Embedding (PARALLEL for performance)
-            classification, embedding = await asyncio.gather(
-                self.classifier.classify(message_text),
-                self.embedder.generate(message_text)
-            )
+            if precomputed is not None:
+                classification, embedding = precomputed
+            else:
+                classification, embedding = await asyncio.gather(
+                    _timed("classification", self.classifier.classify(message_text)),
+                    _timed("embedding", self.embedder.generate(message_text))
+                )
             
             # STEP 4: Check relevance
             if not classification.is_relevant:
                 logger.info(f"Message not relevant: {message_text[:50]}")
-                return
-            
-            # STEP 5: Intelligent grouping
-            ticket = await self.grouper.find_or_create_ticket(
-                message_text=message_text,
-                embedding=embedding,
-                category=classification.category or "question",
-                channel_id=channel_id,
-                thread_ts=thread_ts,
-                message_ts=message_ts
-            )
-            
-            # STEP 6: Enrich with Slack data (parallel)
-            user_name, channel_name = await asyncio.gather(
-                self.slack_utils.get_user_name(user_id, slack_client),
-                self.slack_utils.get_channel_name(channel_id, slack_client)
-            )
+                self._skip_irrelevant(slack_message_id, channel_id, message_ts, thread_ts)
+                outcome = "irrelevant"
+                return True
             
-            # STEP 7: Store message with its category
-            # Ensure we have a valid category for relevant messages
-            if not classification.category and classification.is_relevant:
-                logger.warning(f"Classification returned relevant but no category for: {message_text[:50]}")
-                # Try to infer category from message text as fallback
-                message_lower = message_text.lower()
-                if any(word in message_lower for word in ["broken", "not working", "error", "bug", "crash", "doesn't work", "failed"]):
-                    message_category = "bug"
-                elif any(word in message_lower for word in ["add", "can we", "please add", "would be great", "need", "feature", "request"]):
-                    message_category = "feature"
-                elif any(word in message_lower for word in ["how do", "how to", "where is", "help", "support"]):
-                    message_category = "support"
-                else:
-                    message_category = "question"
+            # ingest_message picks candidates by the clock, so history goes through _group_and_store
+            if settings.INGEST_PROCEDURE_ENABLED and not historical:
+                # STEP 5-7 in one database round trip (see database/add_ingest_message.sql)
+                with metrics.stage("ingest"):
+                    ticket = await self._ingest(
+                        event, slack_message_id, classification, embedding, slack_client
+                    )
+                if ticket is None:
+                    outcome = "duplicate"
+                    return True
             else:
-                message_category = classification.category or "question"
-            
-            logger.info(f"Storing message with category: {message_category} (from classification: {classification.category})")
-            
-            await self.message_repo.create({
-                "ticket_id": ticket["id"],
-                "slack_message_id": slack_message_id,
-                "text": message_text,
-                "user_id": user_id,
-                "user_name": user_name or "Unknown",
-                "channel_id": channel_id,
-                "thread_ts": thread_ts,
-                "message_ts": message_ts,
-                "category": message_category  # Store category at message level
-            })
-            
-            # STEP 8: Update ticket title if this is a new message in existing ticket
-            # (Re-generate title with all messages for better context)
+                ticket = await self._group_and_store(
+                    event, slack_message_id, classification, embedding, slack_client,
+                    historical=historical
+                )
+            
+            # STEP 8: Refresh the ticket title in the background (debounced per ticket)
             if ticket.get("message_count", 0) > 1:
-                try:
-                    # Get all messages for this ticket
-                    all_messages = await self.message_repo.get_by_ticket(ticket["id"])
-                    message_texts = [msg.get("text", "") for msg in all_messages]
-                    
-                    # Generate new title with full context
-                    new_title = await self.grouper.title_generator.generate_title(
-                        messages=message_texts,
-                        category=ticket.get("category", "question")
-                    )
-                    
-                    # Update if title changed significantly
-                    if new_title != ticket.get("title"):
-                        await self.ticket_repo.update(ticket["id"], {
-                            "title": new_title
-                        })
-                        logger.info(f"Updated ticket title: {new_title}")
-                except Exception as e:
-                    logger.warning(f"Failed to update ticket title: {e}")
-            
-            # Update ticket channel name if needed
-            if ticket.get("channel_name") != channel_name and channel_name:
-                await self.ticket_repo.update(ticket["id"], {
-                    "channel_name": channel_name
-                })
+                self.title_refresh.notify(ticket)
             
             elapsed = time.time() - start_time
             logger.info(
@@ -171,8 +175,494 @@ class MessageProcessor:
             
             if elapsed > 8:
                 logger.warning(f"Processing took {elapsed:.2f}s (target: <8s)")
+            outcome = "stored"
+            return True
         
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
+            outcome = "failed"
             # Don't mark as processed so we can retry
+            return False
+        
+        finally:
+            if slack_message_id:
+                self.dedup.release(slack_message_id)
+            deadline.reset(deadline_token)
+            metrics.finish_message(scope, outcome)
+    
+    async def process_burst(self, events: List[Dict[str, Any]], slack_client) -> bool:
+        """
+        Process consecutive messages from one user (see BurstCoalescer) as one unit
+        
+        Duplicates and prefiltered chit-chat are dropped one by one; the rest
+        are classified and embedded as one combined text and grouped into one
+        ticket, but each is still stored as its own message row.
+        
+        Args:
+            events: Slack event payloads in arrival order (same channel, user and thread root)
+            slack_client: Slack WebClient instance
+        
+        Returns:
+            True if the burst was handled, False if processing failed and it should be retried
+        """
+        if len(events) == 1:
+            return await self.process_message(events[0], slack_client)
+        
+        start_time = time.time()
+        claimed: List[str] = []
+        scope = metrics.start_message()
+        outcome = "skipped"
+        deadline_token = deadline.start(settings.MESSAGE_DEADLINE_SECONDS)
+        
+        try:
+            # STEP 1: De-duplication and prefilter, message by message
+            fresh: List[Tuple[Dict[str, Any], str]] = []
+            for event in events:
+                if not event.get("text") or not event.get("user") or not event.get("channel"):
+                    logger.warning(f"Skipping invalid event: {event}")
+                    continue
+                slack_message_id = f"{event['channel']}:{event.get('ts')}"
+                if not self.dedup.claim(slack_message_id):
+                    outcome = "duplicate"
+                    continue
+                claimed.append(slack_message_id)
+                
+                with metrics.stage("dedup"):
+                    already_processed = await self.dedup.is_processed(slack_message_id)
+                if already_processed:
+                    logger.info(f"Message {slack_message_id} already processed")
+                    outcome = "duplicate"
+                    continue
+                
+                if self.prefilter is not None:
+                    with metrics.stage("prefilter"):
+                        rejection = self.prefilter.check(event["text"])
+                    if rejection is not None:
+                        logger.info(f"Message not relevant ({rejection.reasoning}): {event['text'][:50]}")
+                        self._skip_irrelevant(
+                            slack_message_id, event["channel"], event.get("ts"), event.get("thread_ts")
+                        )
+                        outcome = "prefiltered"
+                        continue
+                fresh.append((event, slack_message_id))
+            
+            if not fresh:
+                return True
+            
+            # STEP 2 & 3: One classification + embedding for the whole burst
+            combined_text = "\n".join(event["text"] for event, _ in fresh)
+            logger.info(f"Processing burst of {len(fresh)} messages: {', '.join(key for _, key in fresh)}")
+            classification, embedding = await asyncio.gather(
+                _timed("classification", self.classifier.classify(combined_text)),
+                _timed("embedding", self.embedder.generate(combined_text))
+            )
+            
+            # STEP 4: Check relevance
+            if not classification.is_relevant:
+                logger.info(f"Burst not relevant: {combined_text[:50]}")
+                for event, slack_message_id in fresh:
+                    self._skip_irrelevant(
+                        slack_message_id, event["channel"], event.get("ts"), event.get("thread_ts")
+                    )
+                outcome = "irrelevant"
+                return True
+            
+            # STEP 5-7: The first message is grouped (on the combined text), the rest follow it
+            ticket = None
+            stored = 0
+            for event, slack_message_id in fresh:
+                if settings.INGEST_PROCEDURE_ENABLED:
+                    with metrics.stage("ingest"):
+                        result = await self._ingest(
+                            event, slack_message_id, classification, embedding, slack_client,
+                            grouping_text=combined_text, ticket=ticket
+                        )
+                    if result is None:
+                        continue
+                    ticket = result
+                else:
+                    ticket = await self._group_and_store(
+                        event, slack_message_id, classification, embedding, slack_client,
+                        grouping_text=combined_text, ticket=ticket
+                    )
+                stored += 1
+            
+            if ticket is None:
+                outcome = "duplicate"
+                return True
+            
+            # STEP 8: Title refresh only if the burst joined an existing ticket
+            # (a ticket created by the burst was already titled from the combined text)
+            if ticket.get("message_count", 0) > stored:
+                self.title_refresh.notify(ticket)
+            
+            elapsed = time.time() - start_time
+            logger.info(
+                f"Burst of {stored} messages processed in {elapsed:.2f}s -> Ticket {ticket['id']}"
+            )
+            outcome = "stored"
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error processing message burst: {e}", exc_info=True)
+            outcome = "failed"
+            # Don't mark as processed so the messages are retried
+            return False
+        
+        finally:
+            for slack_message_id in claimed:
+                self.dedup.release(slack_message_id)
+            deadline.reset(deadline_token)
+            metrics.finish_message(scope, outcome)
+    
+    async def _group_and_store(
+        self,
+        event: Dict[str, Any],
+        slack_message_id: str,
+        classification: Classification,
+        embedding: List[float],
+        slack_client,
+        grouping_text: Optional[str] = None,
+        ticket: Optional[Dict[str, Any]] = None,
+        historical: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Group the message, then store it and update the ticket (several round trips)
+        
+        Args:
+            grouping_text: Text to group on instead of the message's own (a burst's combined text)
+            ticket: Ticket to store the message in without grouping (later messages of a burst)
+            historical: Backfilled message - grouped and stored with its own ts as its time
+        """
+        message_text = event["text"]
+        user_id = event["user"]
+        channel_id = event["channel"]
+        message_ts = event.get("ts")
+        thread_ts = event.get("thread_ts")
+        created_at = history.ts_to_iso(message_ts) if historical else None
+        
+        # STEP 5: Intelligent grouping
+        if ticket is None:
+            with metrics.stage("grouping"):
+                ticket = await self.grouper.find_or_create_ticket(
+                    message_text=grouping_text or message_text,
+                    embedding=embedding,
+                    category=classification.category or "question",
+                    channel_id=channel_id,
+                    thread_ts=thread_ts,
+                    message_ts=message_ts,
+                    title=classification.title,  # Discarded unless a new ticket is created
+                    historical=historical
+                )
+        
+        # STEP 6: Enrich with Slack data (name cache, API only on a miss)
+        with metrics.stage("enrichment"):
+            user_name, channel_name = await self._slack_names(user_id, channel_id, slack_client)
+        
+        # STEP 7: Store message with its category
+        message_category = self._message_category(message_text, classification)
+        
+        logger.info(f"Storing message with category: {message_category} (from classification: {classification.category})")
+        
+        message_data = {
+            "ticket_id": ticket["id"],
+            "slack_message_id": slack_message_id,
+            "text": message_text,
+            "user_id": user_id,
+            "user_name": user_name or "Unknown",
+            "channel_id": channel_id,
+            "thread_ts": thread_ts,
+            "message_ts": message_ts,
+            "category": message_category  # Store category at message level
+        }
+        if created_at:
+            message_data["created_at"] = created_at
+        with metrics.stage("insert"):
+            await self.message_repo.create(message_data)
+        self.dedup.mark_processed(slack_message_id)
+        self.grouper.record_message(ticket, user_id, user_name or "Unknown")
+        
+        # Fold the message into the ticket's rolling digest (O(1), no history read);
+        # digest and channel name go out as one update (buffered when write-behind is on)
+        digest = ticket_digest.append_message(
+            self._current_digest(ticket),
+            text=message_text,
+            user_name=user_name or "Unknown",
+            category=message_category,
+            created_at=created_at
+        )
+        ticket["digest"] = digest
+        ticket_updates = {"digest": digest}
+        if ticket.get("channel_name") != channel_name and channel_name:
+            ticket_updates["channel_name"] = channel_name
+        self.grouper.ticket_index.update(ticket["id"], ticket_updates)
+        try:
+            with metrics.stage("ticket_update"):
+                await self.ticket_writes.write(ticket["id"], ticket_updates)
+        except Exception as e:
+            logger.warning(f"Failed to update ticket digest: {e}")
+        
+        return ticket
+    
+    async def _ingest(
+        self,
+        event: Dict[str, Any],
+        slack_message_id: str,
+        classification: Classification,
+        embedding: List[float],
+        slack_client,
+        grouping_text: Optional[str] = None,
+        ticket: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Group and store the message through the ingest_message procedure
+        
+        Usually one round trip: a thread reply with an unknown thread asks the
+        procedure to resolve it (stored directly if the thread has a ticket),
+        everything else is grouped locally first and stored with the chosen
+        ticket or new-ticket fields. Ticket creation is race-free in the
+        database, so concurrent first replies of a thread share one ticket.
+        A reply whose thread ticket was closed is never added to it: if it
+        groups nowhere else, its new ticket is keyed on the reply's own ts.
+        
+        Args:
+            grouping_text: Text to group on instead of the message's own (a burst's combined text)
+            ticket: Ticket to store the message in without grouping (later messages of a burst)
+        
+        Returns:
+            The ticket the message was stored in, or None for a duplicate
+        """
+        message_text = event["text"]
+        user_id = event["user"]
+        channel_id = event["channel"]
+        message_ts = event.get("ts")
+        thread_ts = event.get("thread_ts")
+        thread_key = thread_ts or message_ts
+        category = classification.category or "question"
+        assigned = ticket
+        grouping_text = grouping_text or message_text
+        
+        user_name, channel_name = await self._slack_names(user_id, channel_id, slack_client)
+        message = {
+            "text": message_text,
+            "user_id": user_id,
+            "user_name": user_name or "Unknown",
+            "thread_ts": thread_ts,
+            "message_ts": message_ts,
+            "category": self._message_category(message_text, classification),
+            "channel_name": channel_name,
+        }
+        
+        async def ingest(ticket_id=None, new_ticket=None, key=thread_key) -> Dict[str, Any]:
+            return await self.ticket_repo.ingest_message(
+                slack_message_id, channel_id, key, embedding, message,
+                ticket_id=ticket_id,
+                new_ticket=new_ticket,
+                candidate_hours=self.grouper.RECENT_TICKETS_HOURS
+            )
+        
+        candidates = None
+        result = None
+        if assigned is None and thread_ts and thread_ts != message_ts:
+            found, _ = self.grouper.thread_map.lookup(channel_id, thread_ts)
+            if not found:
+                result = await ingest()
+                if result["status"] == "candidates":
+                    self.grouper.thread_map.put_negative(channel_id, thread_ts)
+                    candidates = result["candidates"]
+        
+        # At most two passes: the second one only if the chosen ticket was closed meanwhile
+        for attempt in range(2):
+            if result is not None and result["status"] != "candidates":
+                break
+            if assigned is not None and not attempt:
+                ticket = assigned
+            else:
+                ticket = await self.grouper.find_or_create_ticket(
+                    message_text=grouping_text,
+                    embedding=embedding,
+                    category=category,
+                    channel_id=channel_id,
+                    thread_ts=thread_ts,
+                    message_ts=message_ts,
+                    create=False,
+                    recent_tickets=candidates
+                )
+            new_ticket = None
+            if ticket is None or attempt:
+                new_ticket = {
+                    "title": await self.grouper.new_ticket_title(
+                        grouping_text, category, classification.title
+                    ),
+                    "category": category,
+                }
+            result = await ingest(ticket["id"] if ticket else None, new_ticket)
+            if result["status"] == "candidates":
+                self.grouper.thread_map.invalidate_ticket(ticket["id"])
+                candidates = result["candidates"]
+        
+        if result["status"] == "closed":
+            # The thread's ticket was closed and the reply joined no other ticket:
+            # it opens a new one under its own ts (one ticket per thread root)
+            closed = result.get("ticket") or {}
+            self.grouper.thread_map.invalidate_ticket(closed.get("id"))
+            self.grouper.thread_map.put_negative(channel_id, thread_key)
+            if closed and thread_key != message_ts:
+                logger.info(
+                    f"Thread {thread_key} belongs to closed ticket {closed['id']} - "
+                    f"new ticket keyed on {message_ts}"
+                )
+                result = await ingest(None, new_ticket, key=message_ts)
+            if result["status"] == "closed":
+                # A root whose own ticket is closed, or the conflicting row vanished: retry later
+                raise RuntimeError(f"No open ticket can take message {slack_message_id}")
+        
+        self.dedup.mark_processed(slack_message_id)
+        if result["status"] == "duplicate":
+            logger.info(f"Message {slack_message_id} already stored")
+            return None
+        
+        ticket = result["ticket"]
+        if result["created"]:
+            logger.info(f"Created ticket {ticket['id']} via ingest_message")
+            self.grouper.register_ticket(ticket, embedding)
+        else:
+            self.grouper.sync_ticket(ticket)
+        return ticket
+    
+    async def _slack_names(
+        self,
+        user_id: str,
+        channel_id: str,
+        slack_client
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """User and channel names (name cache, API only on a miss)"""
+        cached_names = self.slack_utils.cached_names(user_id, channel_id)
+        if cached_names:
+            return cached_names
+        return await asyncio.gather(
+            self.slack_utils.get_user_name(user_id, slack_client),
+            self.slack_utils.get_channel_name(channel_id, slack_client)
+        )
+    
+    def _message_category(self, message_text: str, classification: Classification) -> str:
+        """Category stored on the message (keyword fallback when the classifier gave none)"""
+        # Ensure we have a valid category for relevant messages
+        if not classification.category and classification.is_relevant:
+            logger.warning(f"Classification returned relevant but no category for: {message_text[:50]}")
+            # Try to infer category from message text as fallback
+            message_lower = message_text.lower()
+            if any(word in message_lower for word in ["broken", "not working", "error", "bug", "crash", "doesn't work", "failed"]):
+                return "bug"
+            elif any(word in message_lower for word in ["add", "can we", "please add", "would be great", "need", "feature", "request"]):
+                return "feature"
+            elif any(word in message_lower for word in ["how do", "how to", "where is", "help", "support"]):
+                return "support"
+            else:
+                return "question"
+        return classification.category or "question"
+    
+    def _skip_irrelevant(
+        self,
+        slack_message_id: str,
+        channel_id: str,
+        message_ts: str,
+        thread_ts: Optional[str]
+    ) -> None:
+        """Record an irrelevant message (and, for a thread root, that its thread has no ticket)"""
+        self.dedup.mark_processed(slack_message_id)
+        if not thread_ts or thread_ts == message_ts:
+            self.grouper.thread_map.put_negative(channel_id, message_ts)
+    
+    def _current_digest(self, ticket: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Latest digest for a ticket (buffered and index copies are ahead of fetched rows)"""
+        pending = self.ticket_writes.pending(ticket["id"]).get("digest")
+        if pending is not None:
+            return pending
+        indexed = self.grouper.ticket_index.get(ticket["id"])
+        if indexed is not None and indexed.get("digest") is not None:
+            return indexed["digest"]
+        return ticket.get("digest")
+    
+    async def warm_up(self, slack_client=None) -> None:
+        """
+        Warm process-local caches before events start flowing
+        
+        Args:
+            slack_client: Slack async WebClient used to bulk-load user/channel names
+        """
+        await asyncio.gather(
+            self.dedup.warm_up(),
+            self.grouper.start()
+        )
+        if slack_client is not None:
+            # Paginating a large workspace is rate limited; don't hold up startup
+            self._name_warm_up = asyncio.create_task(self.slack_utils.warm_up(slack_client))
+    
+    def llm_usage(self) -> Dict[str, Dict[str, float]]:
+        """Chat completion calls, tokens and latency for classification and titles"""
+        return {
+            f"classification_{settings.CLASSIFICATION_MODE}": dict(self.classifier.usage),
+            "title": dict(self.grouper.title_generator.usage),
+        }
+    
+    def _metric_samples(self) -> List[Any]:
+        """Scrape-time samples from the component stats dicts (see backend/metrics.py)"""
+        samples = []
+        samples += stats_samples(
+            "dedup_total", "counter", "De-duplication checks by result", self.dedup.stats, "result"
+        )
+        samples += stats_samples(
+            "embedding_cache_total", "counter", "Embedding cache lookups by result",
+            self.embedder.cache.stats, "result"
+        )
+        cascade = dict(self.grouper.cascade_stats)
+        samples.append((
+            "grouping_llm_calls_avoided_total", "counter",
+            "AI grouping calls saved by the similarity cascade", {}, cascade.pop("llm_calls_avoided", 0)
+        ))
+        cascade.pop("llm_calls", None)  # Counted per purpose in llm_calls_total
+        samples += stats_samples(
+            "grouping_band_total", "counter", "Similarity cascade decisions by band", cascade, "band"
+        )
+        samples += stats_samples(
+            "thread_map_total", "counter", "Thread-to-ticket map lookups by result",
+            self.grouper.thread_map.stats, "result"
+        )
+        for cache, name in ((self.slack_utils.user_names, "user"), (self.slack_utils.channel_names, "channel")):
+            samples += stats_samples(
+                "name_cache_total", "counter", "Slack name cache lookups by result",
+                cache.stats, "result", {"cache": name}
+            )
+        samples += stats_samples(
+            "title_refresh_total", "counter", "Background title refresh events",
+            self.title_refresh.stats, "event"
+        )
+        samples += stats_samples(
+            "ticket_writes_total", "counter", "Buffered ticket update events",
+            self.ticket_writes.stats, "event"
+        )
+        for name, usage in self.llm_usage().items():
+            samples += stats_samples(
+                "llm_usage_total", "counter", "Chat completion calls, tokens and latency seconds",
+                usage, "field", {"purpose": name}
+            )
+        return samples
+    
+    async def close(self) -> None:
+        """Flush background work (pending title refreshes, buffered ticket writes) on shutdown"""
+        await self.title_refresh.stop()
+        await self.ticket_writes.stop()
+        for name, usage in self.llm_usage().items():
+            if usage["calls"]:
+                logger.info(
+                    f"LLM usage [{name}]: {usage['calls']} calls, "
+                    f"{usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens, "
+                    f"mean latency {usage['latency_seconds'] / usage['calls'] * 1000:.0f}ms"
+                )
+
 
+async def _timed(stage: str, awaitable):
+    """Await one of several concurrent calls, timing it as its own stage"""
+    with metrics.stage(stage):
+        return await awaitable
@@ -0,0 +1,115 @@
+"""
+Process-local (channel_id, thread_ts) -> ticket map for thread replies
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+ThreadKey = Tuple[str, str]
+
+
+class ThreadTicketMap:
+    """
+    Write-through cache in front of TicketRepository.find_by_thread
+    
+    - Positive entries (thread -> open ticket) are written when a ticket is
+      created and when a DB lookup finds one; they live until the ticket
+      leaves 'open' (invalidate_ticket) or are evicted (LRU, `max_entries`)
+    - Negative entries ("no open ticket for this thread", e.g. the root was
+      irrelevant) expire after `negative_ttl_seconds`, so a ticket created by
+      another writer is picked up soon after
+    
+    Status changes made from the dashboard reach the map through the ticket
+    index reconciler, i.e. within TICKET_INDEX_RECONCILE_SECONDS.
+    """
+    
+    def __init__(self, max_entries: int = None, negative_ttl_seconds: float = None):
+        self.max_entries = max_entries or settings.THREAD_MAP_MAX_ENTRIES
+        self.negative_ttl_seconds = (
+            settings.THREAD_MAP_NEGATIVE_TTL_SECONDS
+            if negative_ttl_seconds is None else negative_ttl_seconds
+        )
+        # Value: ticket dict, or None for a negative entry
+        self._entries: "OrderedDict[ThreadKey, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._negative_expiry: Dict[ThreadKey, float] = {}
+        self._keys_by_ticket: Dict[str, ThreadKey] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+    
+    def lookup(self, channel_id: str, thread_ts: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a thread
+        
+        Args:
+            channel_id: Slack channel ID
+            thread_ts: Thread root timestamp
+        
+        Returns:
+            (found, ticket): found is False on a miss; ticket is None for a
+            cached negative result
+        """
+        key = (channel_id, thread_ts)
+        if key not in self._entries:
+            self.stats["misses"] += 1
+            return False, None
+        
+        ticket = self._entries[key]
+        if ticket is None:
+            if self._negative_expiry[key] < time.monotonic():
+                self._drop(key)
+                self.stats["misses"] += 1
+                return False, None
+            self.stats["negative_hits"] += 1
+        else:
+            self.stats["hits"] += 1
+        self._entries.move_to_end(key)
+        return True, ticket
+    
+    def put(self, ticket: Dict[str, Any]) -> None:
+        """Remember an open ticket under its thread root (replaces a negative entry)"""
+        if ticket.get("status", "open") != "open":
+            return
+        key = (ticket["channel_id"], ticket["first_message_ts"])
+        self._drop(key)
+        self._entries[key] = ticket
+        self._keys_by_ticket[ticket["id"]] = key
+        self._evict()
+    
+    def put_negative(self, channel_id: str, thread_ts: str) -> None:
+        """Remember that a thread has no open ticket (for a short TTL)"""
+        key = (channel_id, thread_ts)
+        if self._entries.get(key) is not None:
+            return
+        self._entries[key] = None
+        self._entries.move_to_end(key)
+        self._negative_expiry[key] = time.monotonic() + self.negative_ttl_seconds
+        self._evict()
+    
+    def invalidate_ticket(self, ticket_id: str) -> None:
+        """Forget a ticket's thread (its status changed away from 'open')"""
+        key = self._keys_by_ticket.get(ticket_id)
+        if key is not None:
+            self._drop(key)
+            self.stats["invalidations"] += 1
+    
+    def _drop(self, key: ThreadKey) -> None:
+        ticket = self._entries.pop(key, None)
+        self._negative_expiry.pop(key, None)
+        if ticket is not None:
+            self._keys_by_ticket.pop(ticket["id"], None)
+    
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,100 @@
+"""
+Compact per-ticket digest, updated incrementally as messages arrive
+
+Stored in tickets.digest so titles, grouping prompts and dashboard previews
+read a bounded amount of text instead of the ticket's whole message history:
+
+    {
+        "first_message": {"text", "user_name", "category", "created_at"},
+        "recent": [...last few messages after the first, oldest first...],
+        "summary": "one line per older message that rolled out of `recent`",
+        "categories": ["bug", ...]
+    }
+"""
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Messages kept verbatim after the first one
+DIGEST_RECENT_MESSAGES = 3
+# Budget for the rolling summary; oldest lines are dropped first
+DIGEST_SUMMARY_CHARS = 600
+# Per-line / per-message caps
+SUMMARY_LINE_CHARS = 160
+MESSAGE_CHARS = 1000
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def empty_digest() -> Dict[str, Any]:
+    return {"first_message": None, "recent": [], "summary": "", "categories": []}
+
+
+def append_message(
+    digest: Optional[Dict[str, Any]],
+    text: str,
+    user_name: str,
+    category: str,
+    created_at: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Return a new digest with one more message folded in (O(1) in ticket size)
+    
+    Args:
+        digest: Current digest (None for a ticket without one)
+        text: Message text
+        user_name: Author display name
+        category: Message-level category
+        created_at: Message time (default: now)
+    
+    Returns:
+        Updated digest dict
+    """
+    digest = {**empty_digest(), **(digest or {})}
+    entry = {
+        "text": text[:MESSAGE_CHARS],
+        "user_name": user_name,
+        "category": category,
+        "created_at": created_at or datetime.now(timezone.utc).isoformat(),
+    }
+    
+    if digest["first_message"] is None:
+        digest["first_message"] = entry
+    else:
+        recent = list(digest["recent"]) + [entry]
+        while len(recent) > DIGEST_RECENT_MESSAGES:
+            digest["summary"] = _fold(digest["summary"], recent.pop(0))
+        digest["recent"] = recent
+    
+    if category and category not in digest["categories"]:
+        digest["categories"] = list(digest["categories"]) + [category]
+    return digest
+
+
+def context_texts(digest: Optional[Dict[str, Any]]) -> List[str]:
+    """Digest as a list of texts (first message, summary, recent), oldest first"""
+    if not digest or not digest.get("first_message"):
+        return []
+    texts = [digest["first_message"]["text"]]
+    if digest.get("summary"):
+        texts.append(digest["summary"])
+    texts += [message["text"] for message in digest.get("recent", [])]
+    return texts
+
+
+def first_message_text(digest: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not digest or not digest.get("first_message"):
+        return None
+    return digest["first_message"]["text"]
+
+
+def _fold(summary: str, message: Dict[str, Any]) -> str:
+    """Append the first sentence of a message leaving `recent` to the summary"""
+    line = SENTENCE_END.split(message["text"].strip(), maxsplit=1)[0]
+    line = " ".join(line.split())
+    if len(line) > SUMMARY_LINE_CHARS:
+        line = line[:SUMMARY_LINE_CHARS - 3] + "..."
+    lines = [l for l in summary.split("\n") if l] + [f"{message['user_name']}: {line}"]
+    while len(lines) > 1 and len("\n".join(lines)) > DIGEST_SUMMARY_CHARS:
+        lines.pop(0)
+    return "\n".join(lines)
@@ -0,0 +1,141 @@
+"""
+Coalesced write-behind for non-critical ticket field updates
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from backend.config import settings
+from backend.database.tickets import TicketRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TicketWriteBuffer:
+    """
+    Merges ticket field updates (digest, channel name, title) into fewer writes
+    
+    Every message already updates its ticket row through the message-count
+    trigger, so each extra UPDATE contends on the same hot row during a thread
+    burst. With `window_seconds` > 0, `write` only merges the fields into a
+    per-ticket pending dict (later values win) and returns; pending tickets
+    are written `window_seconds` after the first queued update, so no update
+    is held back longer than the window (bounded staleness). Reaching
+    `max_pending` tickets flushes early, and `stop` flushes the rest.
+    A batch being written stays visible through `pending` until its UPDATEs
+    return, so readers never fall back to a row that is about to change.
+    
+    With `window_seconds` == 0 every `write` goes straight to the database.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: float = None,
+        max_pending: int = None,
+        ticket_repo: Optional[TicketRepository] = None
+    ):
+        self.window_seconds = (
+            settings.TICKET_WRITE_BEHIND_SECONDS if window_seconds is None else window_seconds
+        )
+        self.max_pending = max_pending or settings.TICKET_WRITE_BEHIND_MAX_PENDING
+        self.ticket_repo = ticket_repo or TicketRepository()
+        
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._in_flight: Dict[str, Dict[str, Any]] = {}  # Batch being written by flush
+        self._oldest: Optional[float] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.stats: Dict[str, int] = {
+            "queued": 0,
+            "writes": 0,
+            "coalesced": 0,
+            "failed": 0,
+        }
+    
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+    
+    async def write(self, ticket_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Update ticket fields (buffered when write-behind is enabled)
+        
+        Args:
+            ticket_id: Ticket UUID
+            fields: Fields to set; merged with anything already pending
+        """
+        if not fields:
+            return
+        if not self.enabled:
+            self.stats["writes"] += 1
+            await self.ticket_repo.update(ticket_id, fields)
+            return
+        
+        self.stats["queued"] += 1
+        pending = self._pending.get(ticket_id)
+        if pending is None:
+            self._pending[ticket_id] = dict(fields)
+        else:
+            self.stats["coalesced"] += 1
+            pending.update(fields)
+        
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window_seconds, self._start_flush
+            )
+        if len(self._pending) >= self.max_pending:
+            self._start_flush()
+    
+    def pending(self, ticket_id: str) -> Dict[str, Any]:
+        """Fields queued or being written for a ticket (newer than the DB row)"""
+        in_flight = self._in_flight.get(ticket_id)
+        if in_flight is None:
+            return self._pending.get(ticket_id, {})
+        return {**in_flight, **self._pending.get(ticket_id, {})}
+    
+    def _start_flush(self) -> None:
+        # Flushes are serialized by the lock; an empty one returns immediately
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+    
+    async def flush(self) -> None:
+        """Write every pending ticket (one UPDATE per ticket)"""
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            # Updates queued while this batch is written start a new window
+            batch, self._pending = self._pending, {}
+            self._oldest = None
+            if not batch:
+                return
+            
+            self._in_flight = batch
+            try:
+                results = await asyncio.gather(*(
+                    self.ticket_repo.update(ticket_id, fields)
+                    for ticket_id, fields in batch.items()
+                ), return_exceptions=True)
+            finally:
+                self._in_flight = {}
+            
+            for ticket_id, result in zip(batch, results):
+                self.stats["writes"] += 1
+                if isinstance(result, Exception):
+                    self.stats["failed"] += 1
+                    logger.warning(f"Buffered update for ticket {ticket_id} failed: {result}")
+    
+    async def stop(self) -> None:
+        """Flush everything still pending (call on shutdown)"""
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+        if self.stats["queued"]:
+            logger.info(
+                f"Ticket write-behind: {self.stats['queued']} updates -> "
+                f"{self.stats['writes']} writes ({self.stats['failed']} failed)"
+            )
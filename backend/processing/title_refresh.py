@@ -0,0 +1,185 @@
+"""
+Debounced background regeneration of ticket titles
+"""
+import asyncio
+import contextvars
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from backend.config import settings
+from backend.ai.title_generator import TitleGenerator, TITLE_CONTEXT_MESSAGES
+from backend.ai.embedding_cache import normalize_text
+from backend.database.messages import MessageRepository
+from backend.processing.vector_index import TicketVectorIndex
+from backend.metrics import metrics
+from backend.processing.ticket_writes import TicketWriteBuffer
+from backend.processing import ticket_digest
+
+logger = logging.getLogger(__name__)
+
+# Per-ticket refresh state kept for at most this many tickets
+MAX_TRACKED_TICKETS = 10000
+
+WORD = re.compile(r"[\w']+")
+
+
+class TitleRefreshScheduler:
+    """
+    Regenerates ticket titles off the message-processing path
+    
+    Notifications for a ticket are coalesced: a refresh runs `interval_seconds`
+    after the first pending message, or as soon as `max_messages` are pending,
+    and never runs twice concurrently for the same ticket. The title context is
+    the ticket's rolling digest; a refresh is skipped without an LLM call when
+    the digest brings fewer than `min_new_words` new content words since the
+    last regeneration.
+    """
+    
+    def __init__(
+        self,
+        title_generator: TitleGenerator,
+        ticket_index: Optional[TicketVectorIndex] = None,
+        interval_seconds: float = None,
+        max_messages: int = None,
+        min_new_words: int = None,
+        ticket_writes: Optional[TicketWriteBuffer] = None
+    ):
+        self.title_generator = title_generator
+        self.ticket_index = ticket_index
+        self.ticket_writes = ticket_writes or TicketWriteBuffer(window_seconds=0)
+        self.message_repo = MessageRepository()
+        self.interval_seconds = (
+            settings.TITLE_REFRESH_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        )
+        self.max_messages = max_messages or settings.TITLE_REFRESH_MAX_MESSAGES
+        self.min_new_words = (
+            settings.TITLE_REFRESH_MIN_NEW_WORDS if min_new_words is None else min_new_words
+        )
+        
+        self._state: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {
+            "notified": 0,
+            "refreshes": 0,
+            "skipped_unchanged": 0,
+            "llm_calls": 0,
+            "titles_changed": 0,
+        }
+    
+    def notify(self, ticket: Dict[str, Any]) -> None:
+        """
+        Record that a message was added to a ticket (non-blocking)
+        
+        Args:
+            ticket: Ticket dict the message was grouped into
+        """
+        ticket_id = ticket["id"]
+        self.stats["notified"] += 1
+        state = self._state.get(ticket_id)
+        if state is None:
+            state = {"pending": 0, "words": None}
+            self._state[ticket_id] = state
+            self._evict_idle()
+        self._state.move_to_end(ticket_id)
+        state["pending"] += 1
+        state["title"] = ticket.get("title")
+        state["category"] = ticket.get("category", "question")
+        state["digest"] = ticket.get("digest")
+        
+        if ticket_id not in self._running:
+            self._schedule(ticket_id)
+    
+    def _schedule(self, ticket_id: str) -> None:
+        """Arm the ticket's timer (or fire now if enough messages are pending)"""
+        loop = asyncio.get_running_loop()
+        timer = self._timers.get(ticket_id)
+        if self._state[ticket_id]["pending"] >= self.max_messages:
+            if timer is not None:
+                timer.cancel()
+            self._timers[ticket_id] = loop.call_soon(self._launch, ticket_id)
+        elif timer is None:
+            self._timers[ticket_id] = loop.call_later(self.interval_seconds, self._launch, ticket_id)
+    
+    def _launch(self, ticket_id: str) -> None:
+        self._timers.pop(ticket_id, None)
+        if ticket_id in self._running:
+            return
+        # Fresh context: a background refresh is not bound by the deadline of the message that queued it
+        task = asyncio.get_running_loop().create_task(self._refresh(ticket_id), context=contextvars.Context())
+        self._running[ticket_id] = task
+        task.add_done_callback(lambda _: self._finished(ticket_id))
+    
+    def _finished(self, ticket_id: str) -> None:
+        self._running.pop(ticket_id, None)
+        state = self._state.get(ticket_id)
+        # Messages that arrived during the refresh get their own (debounced) turn
+        if state and state["pending"]:
+            self._schedule(ticket_id)
+    
+    async def _refresh(self, ticket_id: str) -> None:
+        state = self._state[ticket_id]
+        state["pending"] = 0
+        self.stats["refreshes"] += 1
+        
+        try:
+            # The rolling digest is the title context; fall back to the history
+            # for tickets created before digests existed
+            message_texts = ticket_digest.context_texts(state.get("digest"))
+            if not message_texts:
+                all_messages = await self.message_repo.get_by_ticket(ticket_id)
+                message_texts = [msg.get("text", "") for msg in all_messages][:TITLE_CONTEXT_MESSAGES]
+            
+            words = self._content_words(message_texts)
+            if state["words"] is not None and len(words - state["words"]) < self.min_new_words:
+                self.stats["skipped_unchanged"] += 1
+                return
+            state["words"] = words
+            
+            self.stats["llm_calls"] += 1
+            with metrics.stage("title_refresh"):
+                new_title = await self.title_generator.generate_title(
+                    messages=message_texts,
+                    category=state["category"]
+                )
+                
+                if new_title != state.get("title"):
+                    await self.ticket_writes.write(ticket_id, {"title": new_title})
+                    if self.ticket_index is not None:
+                        self.ticket_index.update(ticket_id, {"title": new_title})
+                    state["title"] = new_title
+                    self.stats["titles_changed"] += 1
+                    logger.info(f"Updated ticket title: {new_title}")
+        except Exception as e:
+            logger.warning(f"Failed to update ticket title: {e}")
+    
+    @staticmethod
+    def _content_words(message_texts: List[str]) -> Set[str]:
+        """Normalized words that could matter to a title (drops short filler)"""
+        return {
+            word for text in message_texts
+            for word in WORD.findall(normalize_text(text))
+            if len(word) > 3
+        }
+    
+    def _evict_idle(self) -> None:
+        """Forget the least recently notified tickets with nothing pending"""
+        while len(self._state) > MAX_TRACKED_TICKETS:
+            ticket_id, state = next(iter(self._state.items()))
+            if state["pending"] or ticket_id in self._running:
+                self._state.move_to_end(ticket_id)
+                break
+            del self._state[ticket_id]
+    
+    async def stop(self, flush: bool = True) -> None:
+        """Cancel timers, optionally running pending refreshes first"""
+        pending = list(self._timers)
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if flush:
+            for ticket_id in pending:
+                self._launch(ticket_id)
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
@@ -0,0 +1,331 @@
+"""
+In-process vector index of open tickets, per channel
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.config import settings
+from backend.database.tickets import TicketRepository
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1536
+
+
+def _to_epoch(value: Any) -> float:
+    """Parse a PostgREST timestamp (or pass through an epoch) to epoch seconds"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return time.time()
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+class ChannelIndex:
+    """Open tickets of one channel: contiguous float32 matrix of unit vectors + metadata"""
+    
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.size = 0
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.tickets: Dict[str, Dict[str, Any]] = {}
+        self.created_at = np.zeros(16, dtype=np.float64)
+    
+    def upsert(self, ticket: Dict[str, Any], vector: np.ndarray) -> None:
+        ticket_id = ticket["id"]
+        row = self.rows.get(ticket_id)
+        if row is None:
+            if self.size == len(self.matrix):
+                self.matrix = np.resize(self.matrix, (self.size * 2, self.dim))
+                self.created_at = np.resize(self.created_at, self.size * 2)
+            row = self.size
+            self.size += 1
+            self.ids.append(ticket_id)
+            self.rows[ticket_id] = row
+        self.matrix[row] = vector
+        self.created_at[row] = _to_epoch(ticket.get("created_at"))
+        self.tickets[ticket_id] = ticket
+    
+    def remove(self, ticket_id: str) -> bool:
+        row = self.rows.pop(ticket_id, None)
+        if row is None:
+            return False
+        # Swap the last row into the hole to keep the matrix contiguous
+        last = self.size - 1
+        if row != last:
+            moved_id = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.created_at[row] = self.created_at[last]
+            self.ids[row] = moved_id
+            self.rows[moved_id] = row
+        self.ids.pop()
+        self.size -= 1
+        del self.tickets[ticket_id]
+        return True
+
+
+class TicketVectorIndex:
+    """
+    Local replacement for the find_similar_tickets RPC and recent-ticket query
+    
+    Holds the embeddings of open tickets created within the index horizon
+    (the larger of the AI grouping lookback and TIME_WINDOW_MINUTES), one
+    ChannelIndex per channel. It is loaded at startup, updated incrementally
+    by the grouping engine, and reconciled against the DB in the background
+    so status changes made from the dashboard (and any missed writes) are
+    repaired. Until the first load succeeds, `ready` is False and callers
+    should use the DB.
+    """
+    
+    def __init__(self):
+        self.ticket_repo = TicketRepository()
+        self.horizon_seconds = max(
+            settings.RECENT_TICKETS_HOURS * 3600,
+            settings.TIME_WINDOW_MINUTES * 60
+        )
+        self.channels: Dict[str, ChannelIndex] = {}
+        self.ready = False
+        self._last_sync: Optional[float] = None
+        self._syncs_since_rebuild = 0
+        self._reconcile_task: Optional[asyncio.Task] = None
+        # Called with the ticket ID whenever a ticket is seen leaving 'open'
+        self.on_status_change: Optional[Callable[[str], None]] = None
+    
+    async def load(self) -> None:
+        """(Re)build the index from all open tickets within the horizon"""
+        started = time.time()
+        since = _to_iso(started - self.horizon_seconds)
+        try:
+            tickets = await self.ticket_repo.find_open_since(since)
+        except Exception as e:
+            logger.warning(f"Ticket index load failed, using DB lookups: {e}")
+            return
+        
+        channels: Dict[str, ChannelIndex] = {}
+        for ticket in tickets:
+            vector = self._unit_vector(ticket.get("embedding"))
+            if vector is None:
+                continue
+            channel = channels.setdefault(ticket["channel_id"], ChannelIndex())
+            channel.upsert(self._strip(ticket), vector)
+        
+        self.channels = channels
+        self._last_sync = started
+        self._syncs_since_rebuild = 0
+        self.ready = True
+        logger.info(f"Ticket index loaded {len(tickets)} open tickets in {len(channels)} channels")
+    
+    async def reconcile(self) -> None:
+        """Apply DB changes since the last sync (full rebuild every few syncs)"""
+        if not self.ready:
+            await self.load()
+            return
+        
+        started = time.time()
+        # Overlap the previous sync slightly so clock skew can't drop changes
+        since = _to_iso(self._last_sync - 5)
+        try:
+            changed = await self.ticket_repo.find_updated_since(since)
+        except Exception as e:
+            logger.warning(f"Ticket index reconciliation failed: {e}")
+            return
+        
+        repaired = 0
+        for ticket in changed:
+            if ticket.get("status") == "open":
+                local = self.get(ticket["id"])
+                if local is None or local.get("status") != "open":
+                    repaired += 1
+                self.upsert(ticket)
+            else:
+                self._status_changed(ticket["id"])
+                if self.remove(ticket["id"]):
+                    repaired += 1
+        
+        evicted = self.evict_expired()
+        self._last_sync = started
+        self._syncs_since_rebuild += 1
+        if repaired or evicted:
+            logger.info(f"Ticket index reconciled: {repaired} repaired, {evicted} evicted")
+        
+        # Rebuilds still go through the incremental pass above so status
+        # change listeners see every change
+        if self._syncs_since_rebuild >= settings.TICKET_INDEX_REBUILD_EVERY:
+            await self.load()
+    
+    async def start(self) -> None:
+        """Load the index and start background reconciliation"""
+        await self.load()
+        if self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+    
+    async def stop(self) -> None:
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            await asyncio.gather(self._reconcile_task, return_exceptions=True)
+            self._reconcile_task = None
+    
+    async def _reconcile_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TICKET_INDEX_RECONCILE_SECONDS)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Ticket index reconciliation error: {e}", exc_info=True)
+    
+    def upsert(self, ticket: Dict[str, Any]) -> None:
+        """Add or refresh an open ticket (e.g. right after _create_ticket)"""
+        if not self.ready or ticket.get("status", "open") != "open":
+            return
+        if _to_epoch(ticket.get("created_at")) < time.time() - self.horizon_seconds:
+            return
+        vector = self._unit_vector(ticket.get("embedding"))
+        if vector is None:
+            # Keep the vector we already have (e.g. partial update rows)
+            channel = self.channels.get(ticket.get("channel_id"))
+            if channel is None or ticket["id"] not in channel.rows:
+                return
+            vector = channel.matrix[channel.rows[ticket["id"]]].copy()
+        channel = self.channels.setdefault(ticket["channel_id"], ChannelIndex())
+        channel.upsert(self._strip(ticket), vector)
+    
+    def update(self, ticket_id: str, fields: Dict[str, Any]) -> None:
+        """Merge updated ticket fields; tickets leaving 'open' are dropped"""
+        if fields.get("status", "open") != "open":
+            self._status_changed(ticket_id)
+            self.remove(ticket_id)
+            return
+        ticket = self.get(ticket_id)
+        if ticket is not None:
+            ticket.update({k: v for k, v in fields.items() if k != "embedding"})
+    
+    def record_message(self, ticket_id: str, user_id: str, user_name: str) -> None:
+        """Mirror the increment_ticket_message_count trigger for an indexed ticket"""
+        ticket = self.get(ticket_id)
+        if ticket is not None:
+            ticket["message_count"] = ticket.get("message_count", 0) + 1
+            ticket["updated_at"] = _to_iso(time.time())
+            ticket["last_user_id"] = user_id
+            ticket["last_user_name"] = user_name
+    
+    def _status_changed(self, ticket_id: str) -> None:
+        if self.on_status_change is not None:
+            self.on_status_change(ticket_id)
+    
+    def remove(self, ticket_id: str) -> bool:
+        return any(channel.remove(ticket_id) for channel in self.channels.values())
+    
+    def evict_expired(self) -> int:
+        """Drop tickets created before the index horizon"""
+        cutoff = time.time() - self.horizon_seconds
+        evicted = 0
+        for channel in self.channels.values():
+            expired = [
+                channel.ids[row] for row in range(channel.size)
+                if channel.created_at[row] < cutoff
+            ]
+            for ticket_id in expired:
+                channel.remove(ticket_id)
+            evicted += len(expired)
+        return evicted
+    
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        for channel in self.channels.values():
+            ticket = channel.tickets.get(ticket_id)
+            if ticket is not None:
+                return ticket
+        return None
+    
+    def recent(self, channel_id: str, hours: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Local equivalent of TicketRepository.find_recent_tickets
+        
+        Returns ticket dicts (with their unit-length "embedding") ordered by
+        updated_at DESC.
+        """
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            return []
+        cutoff = time.time() - hours * 3600
+        rows = [row for row in range(channel.size) if channel.created_at[row] >= cutoff]
+        rows.sort(
+            key=lambda row: _to_epoch(channel.tickets[channel.ids[row]].get("updated_at")),
+            reverse=True
+        )
+        return [
+            {**channel.tickets[channel.ids[row]], "embedding": channel.matrix[row].copy()}
+            for row in rows[:limit]
+        ]
+    
+    def search(
+        self,
+        embedding: List[float],
+        channel_id: str,
+        time_window_minutes: int,
+        similarity_threshold: float,
+        max_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Local equivalent of the find_similar_tickets RPC (vectorized top-k cosine)
+        
+        Returns rows shaped like the RPC result, most similar first.
+        """
+        channel = self.channels.get(channel_id)
+        query = self._unit_vector(embedding)
+        if channel is None or channel.size == 0 or query is None:
+            return []
+        
+        cutoff = time.time() - time_window_minutes * 60
+        similarities = channel.matrix[:channel.size] @ query
+        mask = (channel.created_at[:channel.size] > cutoff) & (similarities > similarity_threshold)
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+        
+        k = min(max_results, candidates.size)
+        top = candidates[np.argpartition(-similarities[candidates], k - 1)[:k]]
+        top = top[np.argsort(-similarities[top])]
+        
+        results = []
+        for row in top:
+            ticket = channel.tickets[channel.ids[row]]
+            results.append({
+                "ticket_id": ticket["id"],
+                "title": ticket.get("title"),
+                "category": ticket.get("category"),
+                "channel_id": channel_id,
+                "similarity": float(similarities[row]),
+                "created_at": ticket.get("created_at"),
+            })
+        return results
+    
+    @staticmethod
+    def _unit_vector(embedding: Any) -> Optional[np.ndarray]:
+        if embedding is None or (isinstance(embedding, (str, list)) and not embedding):
+            return None
+        # PostgREST returns pgvector columns as a "[...]" string
+        if isinstance(embedding, str):
+            embedding = json.loads(embedding)
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    @staticmethod
+    def _strip(ticket: Dict[str, Any]) -> Dict[str, Any]:
+        """Ticket metadata without the embedding (kept in the matrix instead)"""
+        return {k: v for k, v in ticket.items() if k != "embedding"}
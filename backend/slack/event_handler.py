@@ -3,10 +3,12 @@ Slack event handler using Socket Mode
 """
 import logging
 from slack_bolt.async_app import AsyncApp
-from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 
 from backend.config import settings
 from backend.processing.message_processor import MessageProcessor
+from backend.processing.ingestion import IngestionQueue
+from backend.api.metrics_server import MetricsServer
+from backend.slack.socket_mode import RetryAwareSocketModeHandler
 
 logger = logging.getLogger(__name__)
 
@@ -15,62 +17,87 @@ class SlackEventHandler:
     """Handles Slack events via Socket Mode"""
     
     def __init__(self):
-        self.app = AsyncApp(token=settings.SLACK_BOT_TOKEN)
+        # Listeners run before the ack is sent, so message handling is split
+        # into an immediate ack plus a lazy listener that does the work
+        self.app = AsyncApp(token=settings.SLACK_BOT_TOKEN, process_before_response=True)
         self.processor = MessageProcessor()
+        self.ingestion = IngestionQueue(self.processor)
+        self.metrics_server = MetricsServer()
         self.fde_user_id = settings.FDE_SLACK_USER_ID
         self._setup_handlers()
     
     def _setup_handlers(self):
         """Register Slack event handlers"""
         
-        @self.app.event("message")
-        async def handle_message(event, say, client):
-            """
-            Handle message events from Slack
-            
-            Filters out:
-            - Bot messages
-            - FDE's own messages
-            - Messages without text
-            """
-            # Skip bot messages
-            if event.get("bot_id"):
-                return
-            
-            # Skip FDE's own messages
-            user_id = event.get("user")
-            if user_id == self.fde_user_id:
-                logger.debug(f"Skipping FDE message from {user_id}")
-                return
-            
-            # Skip if no text
-            if not event.get("text"):
-                return
-            
-            # Skip if message is a subtype (e.g., channel_join, etc.)
-            if event.get("subtype"):
+        async def ack_event(ack, event):
+            """Journal the message, then ack; the lazy listener runs after the response is sent"""
+            if self._should_process(event):
+                # Durable before the ack: a crash after it replays the event on restart
+                await self.ingestion.accept(event)
+            await ack()
+        
+        async def handle_message(event, client):
+            """Handle message events from Slack (see _should_process for what is skipped)"""
+            if not self._should_process(event):
                 return
             
             logger.info(f"Received message event: {event.get('text', '')[:50]}")
             
-            # Process message asynchronously (don't block Slack response)
-            try:
-                await self.processor.process_message(event, client)
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
+            # Hand off to the ingestion queue (don't block Slack response);
+            # waits only when the queue is full (backpressure)
+            await self.ingestion.submit(event, client, journaled=True)
+        
+        self.app.event("message")(ack=ack_event, lazy=[handle_message])
+        
+        @self.app.event("user_change")
+        async def handle_user_change(event):
+            """Keep the cached user name current"""
+            self.processor.slack_utils.on_user_change(event.get("user") or {})
+        
+        @self.app.event("channel_rename")
+        @self.app.event("group_rename")
+        async def handle_channel_rename(event):
+            """Keep the cached channel name current"""
+            self.processor.slack_utils.on_channel_rename(event.get("channel") or {})
+        
+        # App mentions go through the same path as plain messages
+        self.app.event("app_mention")(ack=ack_event, lazy=[handle_message])
+    
+    def _should_process(self, event) -> bool:
+        """
+        Whether a message event goes to the pipeline
+        
+        Filters out:
+        - Bot messages
+        - FDE's own messages
+        - Messages without text
+        - Subtypes (e.g., channel_join)
+        """
+        if event.get("bot_id"):
+            return False
+        
+        user_id = event.get("user")
+        if user_id == self.fde_user_id:
+            logger.debug(f"Skipping FDE message from {user_id}")
+            return False
         
-        @self.app.event("app_mention")
-        async def handle_mention(event, say, client):
-            """Handle app mentions (optional - can process these too)"""
-            # Similar to message handler
-            await handle_message(event, say, client)
+        return bool(event.get("text")) and not event.get("subtype")
     
     async def start(self):
         """Start the Socket Mode handler"""
-        handler = AsyncSocketModeHandler(
+        handler = RetryAwareSocketModeHandler(
             self.app,
-            settings.SLACK_APP_TOKEN
+            settings.SLACK_APP_TOKEN,
+            is_in_flight=self.ingestion.in_flight
         )
+        await self.processor.warm_up(self.app.client)
+        await self.ingestion.start(self.app.client)
+        await self.metrics_server.start()
         logger.info("Starting Slack Socket Mode handler...")
-        await handler.start_async()
+        try:
+            await handler.start_async()
+        finally:
+            await self.ingestion.stop()
+            await self.processor.close()
+            await self.metrics_server.stop()
 
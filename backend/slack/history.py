@@ -0,0 +1,149 @@
+"""
+Message sources for backfills: Slack export directories and conversations.history
+"""
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (event, resume cursor) - once every item up to and including this one is
+# processed, the channel can be resumed from `cursor` without losing messages
+HistoryItem = Tuple[Dict[str, Any], str]
+
+
+def ts_to_iso(ts: str) -> str:
+    """Slack message ts ("1700000000.123456") as an ISO timestamp"""
+    return datetime.fromtimestamp(float(ts), tz=timezone.utc).isoformat()
+
+
+def read_export_channels(export_dir: str) -> Dict[str, str]:
+    """
+    Channel folder name -> channel ID for a Slack export
+    
+    Reads channels.json / groups.json / dms.json / mpims.json when present;
+    folders without an entry use the folder name as the ID.
+    """
+    root = Path(export_dir)
+    channels: Dict[str, str] = {}
+    for listing in ("channels.json", "groups.json", "mpims.json", "dms.json"):
+        path = root / listing
+        if path.exists():
+            for channel in json.loads(path.read_text()):
+                channels[channel.get("name") or channel["id"]] = channel["id"]
+    for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+        channels.setdefault(folder.name, folder.name)
+    return {name: channel_id for name, channel_id in channels.items() if (root / name).is_dir()}
+
+
+def read_export_users(export_dir: str) -> Dict[str, str]:
+    """User ID -> display name from an export's users.json (empty if missing)"""
+    path = Path(export_dir) / "users.json"
+    if not path.exists():
+        return {}
+    names = {}
+    for user in json.loads(path.read_text()):
+        profile = user.get("profile") or {}
+        name = profile.get("display_name") or profile.get("real_name") or user.get("real_name") or user.get("name")
+        if name:
+            names[user["id"]] = name
+    return names
+
+
+def iter_export_channel(
+    export_dir: str,
+    folder: str,
+    channel_id: str,
+    after_ts: Optional[str] = None
+) -> Iterator[HistoryItem]:
+    """
+    Stream one channel of a Slack export in timestamp order
+    
+    Only one per-day file is held in memory at a time. Replies are stored
+    inline in the day files, so thread order follows timestamp order.
+    
+    Args:
+        export_dir: Export root directory
+        folder: Channel folder name
+        channel_id: Channel ID set on every event
+        after_ts: Resume cursor - messages at or before this ts are skipped
+    """
+    after = float(after_ts) if after_ts else None
+    for day_file in sorted((Path(export_dir) / folder).glob("*.json")):
+        try:
+            messages = json.loads(day_file.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping unreadable export file {day_file}: {e}")
+            continue
+        messages.sort(key=lambda message: float(message.get("ts", 0)))
+        for message in messages:
+            ts = message.get("ts")
+            if not ts or (after is not None and float(ts) <= after):
+                continue
+            yield {**message, "channel": channel_id}, ts
+
+
+async def iter_conversation_history(
+    slack_client,
+    channel_id: str,
+    before_ts: Optional[str] = None,
+    oldest_ts: Optional[str] = None,
+    page_size: int = 200
+) -> AsyncIterator[HistoryItem]:
+    """
+    Stream a channel through conversations.history (+ conversations.replies)
+    
+    Slack pages history newest first, so the channel is walked backwards in
+    time; every thread root is followed by its replies in order, so ordering
+    within a thread is kept. The resume cursor is the oldest root that is
+    fully done, i.e. the next run continues with `latest` = cursor.
+    
+    Args:
+        slack_client: Slack async WebClient
+        channel_id: Channel to read
+        before_ts: Resume cursor - only messages older than this ts are read
+        oldest_ts: Don't go further back than this ts
+        page_size: Messages per history request
+    """
+    cursor = None
+    boundary = before_ts or ""
+    while True:
+        kwargs = {"channel": channel_id, "limit": page_size}
+        if cursor:
+            kwargs["cursor"] = cursor
+        if before_ts:
+            kwargs["latest"] = before_ts
+        if oldest_ts:
+            kwargs["oldest"] = oldest_ts
+        response = await slack_client.conversations_history(**kwargs)
+        
+        for root in response.get("messages", []):
+            thread = [root]
+            if root.get("reply_count") and root.get("thread_ts") == root.get("ts"):
+                thread.extend(await _thread_replies(slack_client, channel_id, root["ts"]))
+            for i, message in enumerate(thread):
+                # Only the thread's last message completes the root
+                done = root["ts"] if i == len(thread) - 1 else boundary
+                yield {**message, "channel": channel_id}, done
+            boundary = root["ts"]
+        
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return
+
+
+async def _thread_replies(slack_client, channel_id: str, thread_ts: str) -> List[Dict[str, Any]]:
+    """Replies of one thread, oldest first (the root itself is left out)"""
+    replies: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        kwargs = {"channel": channel_id, "ts": thread_ts, "limit": 200}
+        if cursor:
+            kwargs["cursor"] = cursor
+        response = await slack_client.conversations_replies(**kwargs)
+        replies.extend(m for m in response.get("messages", []) if m.get("ts") != thread_ts)
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return replies
@@ -0,0 +1,57 @@
+"""
+Socket Mode adapter that acks redeliveries of in-flight events without dispatching them
+"""
+import logging
+import time
+from typing import Any, Callable, Dict
+
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from slack_bolt.async_app import AsyncApp
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RetryAwareSocketModeHandler(AsyncSocketModeHandler):
+    """
+    AsyncSocketModeHandler plus retry short-circuiting and ack timing
+    
+    Slack marks a redelivered envelope with retry_attempt/retry_reason. When
+    the original event is still queued or being processed (`is_in_flight`),
+    the redelivery is acked right here and dropped: no Bolt dispatch, no
+    de-duplication query, no second classification. Other redeliveries go
+    through Bolt as usual (de-duplication still applies downstream).
+    """
+    
+    def __init__(
+        self,
+        app: AsyncApp,
+        app_token: str,
+        is_in_flight: Callable[[Dict[str, Any]], bool]
+    ):
+        super().__init__(app, app_token)
+        self.is_in_flight = is_in_flight
+    
+    async def handle(self, client, req: SocketModeRequest) -> None:
+        started = time.perf_counter()
+        
+        if req.retry_attempt:
+            reason = req.retry_reason or "unknown"
+            event = (req.payload or {}).get("event") or {}
+            if req.type == "events_api" and event.get("ts") and self.is_in_flight(event):
+                await client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+                metrics.redelivery(reason, "dropped")
+                metrics.observe_ack(time.perf_counter() - started)
+                logger.info(
+                    f"Dropped redelivery #{req.retry_attempt} ({reason}) of in-flight "
+                    f"event {event.get('channel')}:{event.get('ts')}"
+                )
+                return
+            metrics.redelivery(reason, "dispatched")
+        
+        # Listeners only journal the event before acking (see SlackEventHandler), so this is the ack latency
+        await super().handle(client, req)
+        metrics.observe_ack(time.perf_counter() - started)
@@ -1,15 +1,104 @@
 """
 Slack utility functions
 """
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+class NameCache:
+    """
+    TTL cache of Slack id -> display name with single-flight lookups
+    
+    Concurrent misses for the same id share one in-flight API call; if it
+    fails or its caller is cancelled, every waiter sees the failure.
+    Failed lookups (None) are not cached.
+    """
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "shared": 0,
+        }
+    
+    def get(self, key: str) -> Optional[str]:
+        """Cached name, or None on a miss or expired entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        name, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return name
+    
+    def set(self, key: str, name: Optional[str]) -> None:
+        if name:
+            self._entries[key] = (name, time.monotonic() + self.ttl_seconds)
+    
+    async def resolve(self, key: str, fetch: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """
+        Return the cached name or fetch it once for all concurrent callers
+        
+        Args:
+            key: Slack user or channel ID
+            fetch: Coroutine factory performing the API lookup
+        
+        Returns:
+            Name or None
+        """
+        name = self.get(key)
+        if name is not None:
+            self.stats["hits"] += 1
+            return name
+        
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(future)
+        
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            name = await fetch()
+            self.set(key, name)
+            future.set_result(name)
+            return name
+        except BaseException as e:
+            # Also on cancellation of this (owner) task, e.g. by the message
+            # deadline: waiters get an ordinary failure instead of hanging
+            if not future.done():
+                if not isinstance(e, Exception):
+                    e = RuntimeError(f"Lookup of {key} was cancelled")
+                future.set_exception(e)
+                # Mark retrieved so an unshared failure doesn't log "never retrieved"
+                future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class SlackUtils:
     """Utility functions for Slack API calls"""
     
+    def __init__(self):
+        ttl = settings.SLACK_NAME_CACHE_TTL_SECONDS
+        self.user_names = NameCache(ttl)
+        self.channel_names = NameCache(ttl)
+    
     async def get_user_name(self, user_id: str, slack_client) -> Optional[str]:
         """
         Get user display name from Slack
@@ -17,15 +106,18 @@ class SlackUtils:
         Args:
             user_id: Slack user ID
             slack_client: Slack async WebClient instance
-            
+        
         Returns:
             User display name or None
         """
-        try:
+        async def fetch() -> Optional[str]:
             response = await slack_client.users_info(user=user_id)
             if response and response.get("user"):
-                return response["user"].get("real_name") or response["user"].get("name")
+                return self._user_display_name(response["user"])
             return None
+        
+        try:
+            return await self.user_names.resolve(user_id, fetch)
         except Exception as e:
             logger.warning(f"Error fetching user name for {user_id}: {e}")
             return None
@@ -37,17 +129,91 @@ class SlackUtils:
         Args:
             channel_id: Slack channel ID
             slack_client: Slack async WebClient instance
-            
+        
         Returns:
             Channel name (with # prefix) or None
         """
-        try:
+        async def fetch() -> Optional[str]:
             response = await slack_client.conversations_info(channel=channel_id)
             if response and response.get("channel"):
-                channel_name = response["channel"].get("name")
-                return f"#{channel_name}" if channel_name else None
+                return self._channel_display_name(response["channel"])
             return None
+        
+        try:
+            return await self.channel_names.resolve(channel_id, fetch)
         except Exception as e:
             logger.warning(f"Error fetching channel name for {channel_id}: {e}")
             return None
-
+    
+    def cached_names(self, user_id: str, channel_id: str) -> Optional[Tuple[str, str]]:
+        """(user name, channel name) if both are cached, else None"""
+        user_name = self.user_names.get(user_id)
+        channel_name = self.channel_names.get(channel_id)
+        if user_name is None or channel_name is None:
+            return None
+        self.user_names.stats["hits"] += 1
+        self.channel_names.stats["hits"] += 1
+        return user_name, channel_name
+    
+    async def warm_up(self, slack_client) -> None:
+        """
+        Bulk-load all user and channel names (paginated users.list / conversations.list)
+        
+        Args:
+            slack_client: Slack async WebClient instance
+        """
+        started = time.time()
+        users, channels = await asyncio.gather(
+            self._paginate(slack_client.users_list, "members"),
+            self._paginate(
+                slack_client.conversations_list,
+                "channels",
+                types="public_channel,private_channel",
+                exclude_archived=True
+            )
+        )
+        for user in users:
+            if not user.get("deleted"):
+                self.on_user_change(user)
+        for channel in channels:
+            self.on_channel_rename(channel)
+        logger.info(
+            f"Name cache warmed with {len(self.user_names)} users and "
+            f"{len(self.channel_names)} channels in {time.time() - started:.2f}s"
+        )
+    
+    def on_user_change(self, user: Dict[str, Any]) -> None:
+        """Refresh a cached user name from a user object (users.list / user_change)"""
+        if user.get("id"):
+            self.user_names.set(user["id"], self._user_display_name(user))
+    
+    def on_channel_rename(self, channel: Dict[str, Any]) -> None:
+        """Refresh a cached channel name from a channel object (conversations.list / channel_rename)"""
+        if channel.get("id"):
+            self.channel_names.set(channel["id"], self._channel_display_name(channel))
+    
+    @staticmethod
+    async def _paginate(method, key: str, **kwargs) -> list:
+        """Collect every page of a cursor-paginated Web API list method"""
+        items = []
+        cursor = None
+        try:
+            while True:
+                response = await method(limit=200, cursor=cursor, **kwargs)
+                items.extend(response.get(key) or [])
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    return items
+        except Exception as e:
+            # Partial warm-up is fine; misses fall back to per-id lookups
+            logger.warning(f"Name cache warm-up stopped after {len(items)} {key}: {e}")
+            return items
+    
+    @staticmethod
+    def _user_display_name(user: Dict[str, Any]) -> Optional[str]:
+        return user.get("real_name") or user.get("name")
+    
+    @staticmethod
+    def _channel_display_name(channel: Dict[str, Any]) -> Optional[str]:
+        channel_name = channel.get("name")
+        return f"#{channel_name}" if channel_name else None
@@ -0,0 +1,18 @@
+"""
+Shared pytest setup: placeholder credentials so backend.config loads without a .env
+"""
+import os
+
+for name, value in {
+    "SLACK_BOT_TOKEN": "xoxb-test",
+    "SLACK_APP_TOKEN": "xapp-test",
+    "SLACK_SIGNING_SECRET": "test-secret",
+    "FDE_SLACK_USER_ID": "UFDE",
+    "OPENAI_API_KEY": "sk-test",
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_KEY": "test.service.key",
+    # No files under .cache/ from a test run
+    "EMBEDDING_CACHE_PATH": "",
+    "EVENT_JOURNAL_PATH": "",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,113 @@
+"""
+Tests for burst coalescing of rapid-fire messages
+"""
+import asyncio
+
+import pytest
+
+from backend.processing.coalescer import BurstCoalescer
+
+
+def message(ts, user="U1", thread_ts=None, channel="C1"):
+    event = {"channel": channel, "user": user, "text": f"part {ts}", "ts": ts}
+    if thread_ts:
+        event["thread_ts"] = thread_ts
+    return event
+
+
+class FlushRecorder:
+    def __init__(self):
+        self.bursts = []
+    
+    async def __call__(self, events, slack_client):
+        self.bursts.append([event["ts"] for event in events])
+
+
+def make_coalescer(window=0.05, max_wait=1.0, max_messages=8):
+    flushed = FlushRecorder()
+    return BurstCoalescer(flushed, window=window, max_wait=max_wait, max_messages=max_messages), flushed
+
+
+@pytest.mark.asyncio
+async def test_messages_within_the_window_are_flushed_together():
+    coalescer, flushed = make_coalescer(window=0.05)
+    await coalescer.add(message("1.0"), None)
+    await asyncio.sleep(0.02)
+    await coalescer.add(message("1.1", thread_ts="1.0"), None)
+    assert coalescer.pending == 2
+    
+    await asyncio.sleep(0.1)
+    assert flushed.bursts == [["1.0", "1.1"]]
+    assert coalescer.pending == 0
+    assert coalescer.stats["flushed_bursts"] == 1 and coalescer.stats["coalesced_messages"] == 2
+
+
+@pytest.mark.asyncio
+async def test_isolated_message_waits_one_window():
+    coalescer, flushed = make_coalescer(window=0.05)
+    await coalescer.add(message("1.0"), None)
+    await asyncio.sleep(0.01)
+    assert flushed.bursts == []
+    
+    await asyncio.sleep(0.08)
+    assert flushed.bursts == [["1.0"]]
+    assert coalescer.stats["flushed_single"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_wait_bounds_a_continuous_burst():
+    coalescer, flushed = make_coalescer(window=0.05, max_wait=0.12)
+    for i in range(8):
+        await coalescer.add(message(f"1.{i}", thread_ts="1.0"), None)
+        await asyncio.sleep(0.03)
+    await asyncio.sleep(0.1)
+    
+    # Never quiet for a whole window, yet the first message waited at most max_wait
+    assert len(flushed.bursts) >= 2
+    assert [ts for burst in flushed.bursts for ts in burst] == [f"1.{i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_full_burst_is_flushed_immediately():
+    coalescer, flushed = make_coalescer(window=10, max_messages=3)
+    for i in range(3):
+        await coalescer.add(message(f"1.{i}", thread_ts="1.0"), None)
+    assert flushed.bursts == [["1.0", "1.1", "1.2"]]
+
+
+@pytest.mark.asyncio
+async def test_bursts_are_per_thread_root():
+    coalescer, flushed = make_coalescer(window=10)
+    await coalescer.add(message("1.0"), None)
+    await coalescer.add(message("1.1"), None)
+    await coalescer.add(message("1.2", thread_ts="1.1"), None)
+    await coalescer.add(message("1.3", thread_ts="0.5"), None)
+    await coalescer.add(message("1.4", thread_ts="1.0"), None)
+    
+    await coalescer.drain()
+    # Separate top-level messages are separate threads, so never one burst
+    assert sorted(flushed.bursts) == [["1.0", "1.4"], ["1.1", "1.2"], ["1.3"]]
+
+
+@pytest.mark.asyncio
+async def test_another_user_in_the_thread_flushes_the_pending_burst_first():
+    coalescer, flushed = make_coalescer(window=10)
+    await coalescer.add(message("1.0", user="U1"), None)
+    await coalescer.add(message("1.1", user="U2", thread_ts="1.0"), None)
+    assert flushed.bursts == [["1.0"]]
+    await coalescer.add(message("1.2", user="U2", thread_ts="1.0"), None)
+    
+    await coalescer.drain()
+    assert flushed.bursts == [["1.0"], ["1.1", "1.2"]]
+
+
+@pytest.mark.asyncio
+async def test_redelivery_of_a_buffered_message_is_ignored():
+    coalescer, flushed = make_coalescer(window=10)
+    await coalescer.add(message("1.0"), None)
+    assert coalescer.holds(message("1.0"))
+    await coalescer.add(message("1.0"), None)
+    
+    await coalescer.drain()
+    assert flushed.bursts == [["1.0"]]
+    assert not coalescer.holds(message("1.0"))
@@ -0,0 +1,19 @@
+"""
+Tests for the pooled async PostgREST client
+"""
+from backend.config import settings
+from backend.database import client as database_client
+from backend.database import tickets, messages, history
+
+
+def test_async_client_uses_bounded_pool():
+    session = database_client.async_supabase_client.session
+    pool = session._transport._pool
+    assert pool._max_connections == settings.SUPABASE_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS
+    assert str(session.base_url).rstrip("/").endswith("/rest/v1")
+
+
+def test_repositories_share_the_async_client():
+    for module in (tickets, messages, history):
+        assert module.async_supabase_client is database_client.async_supabase_client
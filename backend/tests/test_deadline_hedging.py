@@ -0,0 +1,148 @@
+"""
+Tests for the per-message deadline and deadline-bounded, hedged LLM calls
+"""
+import asyncio
+
+import pytest
+
+from backend import deadline
+from backend.ai import hedging
+from backend.config import settings
+
+
+@pytest.fixture
+def hedging_on(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MAX_FRACTION", 1.0)
+
+
+def seed(stage, seconds):
+    stats = hedging.tracker(stage)
+    for _ in range(hedging.MIN_SAMPLES):
+        stats.record(seconds)
+    return stats
+
+
+def test_no_deadline_means_time_for_anything():
+    token = deadline.start(0)
+    try:
+        assert deadline.remaining() is None
+        assert deadline.has_time_for(1000)
+    finally:
+        deadline.reset(token)
+
+
+def test_budget_is_per_context():
+    token = deadline.start(5)
+    try:
+        assert 4.9 < deadline.remaining() <= 5
+        assert deadline.has_time_for(1) and not deadline.has_time_for(10)
+    finally:
+        deadline.reset(token)
+    assert deadline.remaining() is None
+
+
+def test_p95_needs_enough_samples():
+    stats = hedging.tracker("test-p95")
+    for i in range(hedging.MIN_SAMPLES - 1):
+        stats.record(i)
+    assert hedging.expected_seconds("test-p95") is None
+    stats.record(100)
+    assert hedging.expected_seconds("test-p95") == 18
+
+
+@pytest.mark.asyncio
+async def test_call_past_the_deadline_raises_and_is_cancelled():
+    cancelled = asyncio.Event()
+    
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cancelled.set()
+    
+    token = deadline.start(0.05)
+    try:
+        with pytest.raises(deadline.DeadlineExceeded):
+            await hedging.call_llm("test-deadline", slow)
+    finally:
+        deadline.reset(token)
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_spent_budget_raises_without_calling():
+    calls = []
+    
+    async def request():
+        calls.append(1)
+    
+    token = deadline.start(0.001)
+    try:
+        await asyncio.sleep(0.01)
+        with pytest.raises(deadline.DeadlineExceeded):
+            await hedging.call_llm("test-spent", request)
+    finally:
+        deadline.reset(token)
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_the_hedge_wins(hedging_on):
+    seed("test-hedge", 0.02)
+    delays = [10, 0]
+    
+    async def request():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return f"answered after {delay}s"
+    
+    result = await asyncio.wait_for(hedging.call_llm("test-hedge", request), 2)
+    
+    assert result == "answered after 0s"
+    assert hedging.tracker("test-hedge").hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged(hedging_on):
+    seed("test-fast", 1.0)
+    calls = []
+    
+    async def request():
+        calls.append(1)
+        return "ok"
+    
+    assert await hedging.call_llm("test-fast", request) == "ok"
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_falls_back_to_the_hedge(hedging_on):
+    seed("test-failover", 0.02)
+    attempts = []
+    
+    async def request():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary failed")
+        await asyncio.sleep(0.1)
+        return "hedge"
+    
+    assert await asyncio.wait_for(hedging.call_llm("test-failover", request), 2) == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_hedges_are_capped_by_fraction(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MAX_FRACTION", 0.0)
+    seed("test-cap", 0.001)
+    calls = []
+    
+    async def request():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+    
+    assert await hedging.call_llm("test-cap", request) == "ok"
+    assert calls == [1]
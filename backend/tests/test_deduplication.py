@@ -0,0 +1,107 @@
+"""
+Tests for the de-duplication layers
+"""
+import time
+
+import pytest
+
+from backend.processing.deduplication import BloomFilter, DeduplicationChecker, RecentIdCache
+
+
+class FakeMessageRepository:
+    """The messages table as a set of slack_message_ids"""
+    
+    def __init__(self, stored=()):
+        self.stored = set(stored)
+        self.lookups = 0
+    
+    async def get_slack_ids_since(self, since_iso, max_rows=200000):
+        return sorted(self.stored)
+    
+    async def find_by_slack_id(self, slack_message_id):
+        self.lookups += 1
+        return {"slack_message_id": slack_message_id} if slack_message_id in self.stored else None
+
+
+def fresh_id(offset: float = 0.0) -> str:
+    """Message id with a ts inside the warm-up window"""
+    return f"C1:{time.time() + offset:.6f}"
+
+
+def checker(repo, exclusive_writer):
+    dedup = DeduplicationChecker(exclusive_writer=exclusive_writer)
+    dedup.message_repo = repo
+    return dedup
+
+
+def test_recent_cache_expires_and_evicts():
+    cache = RecentIdCache(max_size=2, ttl_seconds=60)
+    cache.add("a")
+    cache.add("b")
+    assert "a" in cache  # refreshes "a", so "b" is the oldest
+    cache.add("c")
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    
+    expired = RecentIdCache(max_size=2, ttl_seconds=-1)
+    expired.add("a")
+    assert "a" not in expired
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"C1:{i}.000" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"C2:{i}.000" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+@pytest.mark.asyncio
+async def test_exclusive_writer_trusts_bloom_negatives():
+    repo = FakeMessageRepository()
+    dedup = checker(repo, exclusive_writer=True)
+    await dedup.warm_up()
+    
+    assert await dedup.is_processed(fresh_id()) is False
+    assert repo.lookups == 0
+    assert dedup.stats["bloom_negatives"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bloom_negatives_are_confirmed_when_others_may_write():
+    repo = FakeMessageRepository()
+    dedup = checker(repo, exclusive_writer=False)
+    await dedup.warm_up()
+    
+    # Stored by a concurrent backfill after this process warmed up
+    backfilled = fresh_id()
+    repo.stored.add(backfilled)
+    
+    assert await dedup.is_processed(backfilled) is True
+    assert await dedup.is_processed(fresh_id(1)) is False
+    assert repo.lookups == 2
+    assert dedup.stats["bloom_negatives"] == 0
+
+
+@pytest.mark.asyncio
+async def test_marked_and_warmed_ids_are_answered_from_memory():
+    stored = fresh_id(-10)
+    repo = FakeMessageRepository([stored])
+    dedup = checker(repo, exclusive_writer=False)
+    await dedup.warm_up()
+    
+    handled = fresh_id()
+    dedup.mark_processed(handled)
+    assert await dedup.is_processed(stored) is True
+    assert await dedup.is_processed(handled) is True
+    assert repo.lookups == 0
+
+
+def test_claim_rejects_concurrent_delivery_until_released():
+    dedup = checker(FakeMessageRepository(), exclusive_writer=False)
+    assert dedup.claim("C1:1.0")
+    assert not dedup.claim("C1:1.0")
+    dedup.release("C1:1.0")
+    assert dedup.claim("C1:1.0")
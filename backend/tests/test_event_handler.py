@@ -0,0 +1,73 @@
+"""
+Tests for the Slack listener: journal before ack, then queue from the lazy listener
+"""
+import asyncio
+
+import pytest
+from slack_bolt.request.async_request import AsyncBoltRequest
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from backend.slack.event_handler import SlackEventHandler
+
+
+class RecordingIngestion:
+    def __init__(self):
+        self.calls = []
+    
+    async def accept(self, event):
+        self.calls.append(("accept started", event["ts"]))
+        await asyncio.sleep(0.05)  # A slow journal write still completes before the ack
+        self.calls.append(("accept done", event["ts"]))
+    
+    async def submit(self, event, slack_client, journaled=False):
+        self.calls.append(("submit", event["ts"], journaled))
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    async def auth_test(self, **kwargs):
+        return AsyncSlackResponse(
+            client=self, http_verb="POST", api_url="auth.test", req_args={}, headers={}, status_code=200,
+            data={"ok": True, "team_id": "T1", "user_id": "UBOT", "bot_id": "B1", "user": "bot"}
+        )
+    
+    monkeypatch.setattr(AsyncWebClient, "auth_test", auth_test)
+    handler = SlackEventHandler()
+    handler.ingestion = RecordingIngestion()
+    return handler
+
+
+async def deliver(handler, event):
+    body = {
+        "type": "event_callback", "team_id": "T1", "api_app_id": "A1",
+        "event_id": f"Ev{event['ts']}", "event_time": 1, "event": {"type": "message", "channel": "C1", **event},
+    }
+    response = await handler.app.async_dispatch(AsyncBoltRequest(body=body, mode="socket_mode"))
+    handler.ingestion.calls.append(("acked", response.status))
+    await asyncio.sleep(0.05)  # Lazy listener
+
+
+@pytest.mark.asyncio
+async def test_message_is_journaled_before_the_ack_and_queued_after(handler):
+    await deliver(handler, {"user": "U1", "text": "export is broken", "ts": "1.000000"})
+    
+    assert handler.ingestion.calls == [
+        ("accept started", "1.000000"),
+        ("accept done", "1.000000"),
+        ("acked", 200),
+        ("submit", "1.000000", True),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("event", [
+    {"user": "U1", "text": "hi", "ts": "2.000000", "bot_id": "B2"},
+    {"user": "UFDE", "text": "on it", "ts": "3.000000"},
+    {"user": "U1", "text": "", "ts": "4.000000"},
+    {"user": "U1", "text": "joined", "ts": "5.000000", "subtype": "channel_join"},
+])
+async def test_filtered_messages_are_acked_without_journaling(handler, event):
+    await deliver(handler, event)
+    
+    assert handler.ingestion.calls == [("acked", 200)]
@@ -0,0 +1,61 @@
+"""
+Tests for the durable event journal
+"""
+import time
+
+import pytest
+
+from backend.processing.event_journal import EventJournal, event_id
+
+EVENT = {"channel": "C1", "ts": "1.000000", "text": "export is broken"}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = EventJournal(str(tmp_path / "journal.sqlite3"), max_attempts=3,
+                           retry_base_seconds=0.01, retry_max_seconds=0.01)
+    yield journal
+    journal.close()
+
+
+def dead_letters(journal):
+    return journal._conn.execute("SELECT event_id, attempts, last_error FROM dead_letters").fetchall()
+
+
+def test_recorded_event_is_unfinished_until_completed(journal):
+    journal.record(event_id(EVENT), EVENT)
+    journal.record(event_id(EVENT), {**EVENT, "text": "redelivery"})
+    assert journal.unfinished() == [EVENT]
+    
+    journal.complete(event_id(EVENT))
+    assert journal.unfinished() == []
+
+
+def test_failed_event_is_claimed_once_its_backoff_elapsed(journal):
+    journal.record("C1:1.000000", EVENT)
+    delay = journal.fail("C1:1.000000", EVENT, "boom")
+    
+    assert 0 < delay <= 0.01
+    assert journal.unfinished() == []  # Scheduled, not replayed on startup
+    time.sleep(0.02)
+    assert journal.claim_due(10) == [EVENT]
+    assert journal.claim_due(10) == []
+    assert journal.unfinished() == [EVENT]  # Queued again
+
+
+def test_poison_event_is_dead_lettered(journal):
+    journal.record("C1:1.000000", EVENT)
+    assert journal.fail("C1:1.000000", EVENT, "boom") is not None
+    assert journal.fail("C1:1.000000", EVENT, "boom") is not None
+    assert journal.fail("C1:1.000000", EVENT, "still boom") is None
+    
+    assert dead_letters(journal) == [("C1:1.000000", 3, "still boom")]
+    assert journal.unfinished() == [] and journal.claim_due(10) == []
+
+
+def test_backoff_grows_and_is_capped(tmp_path):
+    journal = EventJournal(str(tmp_path / "journal.sqlite3"), retry_base_seconds=1, retry_max_seconds=4)
+    assert 0.5 <= journal._backoff(1) <= 1
+    assert 1 <= journal._backoff(2) <= 2
+    assert 2 <= journal._backoff(10) <= 4
+    journal.close()
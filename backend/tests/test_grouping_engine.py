@@ -0,0 +1,226 @@
+"""
+Tests for the grouping decisions (thread, similarity cascade, AI, fallback)
+"""
+import asyncio
+
+import pytest
+
+from backend import deadline
+from backend.processing.grouping_engine import GroupingEngine
+
+MESSAGE = [1.0, 0.0]
+
+
+def ticket(ticket_id: str, embedding, **fields):
+    return {"id": ticket_id, "title": f"Ticket {ticket_id}", "embedding": embedding,
+            "digest": None, "first_message": f"first message of {ticket_id}", **fields}
+
+
+class FakeGroupingClassifier:
+    """Answers are_same_issue from a {ticket title: verdict} map (an exception is raised)"""
+    
+    def __init__(self, verdicts, delays=None):
+        self.verdicts = verdicts
+        self.delays = delays or {}
+        self.calls = []
+    
+    async def are_same_issue(self, message1, message2, ticket_title=None):
+        self.calls.append(ticket_title)
+        await asyncio.sleep(self.delays.get(ticket_title, 0))
+        verdict = self.verdicts[ticket_title]
+        if isinstance(verdict, BaseException):
+            raise verdict
+        return verdict, 0.95 if verdict else 0.9, "test"
+    
+    async def find_best_match(self, message, candidates):
+        self.calls.append([candidate["id"] for candidate in candidates])
+        verdict = self.verdicts["listwise"]
+        if isinstance(verdict, BaseException):
+            raise verdict
+        return verdict, 0.9, "test"
+
+
+def make_engine(recent, verdicts, similar=None, mode="pairwise", delays=None):
+    engine = GroupingEngine()
+    engine.AI_GROUPING_MODE = mode
+    engine.grouping_classifier = FakeGroupingClassifier(verdicts, delays)
+    engine.similarity_calls = 0
+    engine.created = []
+    
+    async def find_recent_tickets(channel_id):
+        return recent
+    
+    async def find_by_similarity(embedding, channel_id):
+        engine.similarity_calls += 1
+        return similar
+    
+    async def create_ticket(message_text, embedding, category, channel_id, first_message_ts, title=None,
+                            created_at=None):
+        created = {"id": "new", "title": title or message_text, "created_at": created_at}
+        engine.created.append(created)
+        return created
+    
+    engine._find_recent_tickets = find_recent_tickets
+    engine._find_by_similarity = find_by_similarity
+    engine._create_ticket = create_ticket
+    return engine
+
+
+async def group(engine, thread_ts=None):
+    return await engine.find_or_create_ticket(
+        message_text="export to csv fails", embedding=MESSAGE, category="bug",
+        channel_id="C1", thread_ts=thread_ts, message_ts="100.000001"
+    )
+
+
+@pytest.mark.asyncio
+async def test_high_band_groups_without_llm():
+    engine = make_engine([ticket("a", [1.0, 0.05])], verdicts={})
+    assert (await group(engine))["id"] == "a"
+    assert engine.grouping_classifier.calls == []
+    assert engine.cascade_stats["high_band"] == 1
+
+
+@pytest.mark.asyncio
+async def test_low_band_creates_ticket_without_llm():
+    engine = make_engine([ticket("a", [0.0, 1.0])], verdicts={})
+    assert (await group(engine))["id"] == "new"
+    assert engine.grouping_classifier.calls == []
+    assert engine.similarity_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_ai_match_in_ambiguous_band():
+    engine = make_engine([ticket("a", [0.8, 0.6])], verdicts={"Ticket a": True})
+    assert (await group(engine))["id"] == "a"
+    assert engine.similarity_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_ai_no_match_creates_ticket_without_similarity_fallback():
+    ambiguous = ticket("a", [0.8, 0.6])
+    engine = make_engine([ambiguous], verdicts={"Ticket a": False}, similar=ambiguous)
+    assert (await group(engine))["id"] == "new"
+    assert engine.similarity_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_ai_error_is_no_match():
+    ambiguous = ticket("a", [0.8, 0.6])
+    engine = make_engine(
+        [ambiguous], verdicts={"listwise": RuntimeError("bad json")}, similar=ambiguous, mode="listwise"
+    )
+    assert (await group(engine))["id"] == "new"
+    assert engine.similarity_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_skip_falls_back_to_similarity():
+    ambiguous = ticket("a", [0.8, 0.6])
+    engine = make_engine([ambiguous], verdicts={"Ticket a": True}, similar=ambiguous)
+    token = deadline.start(0.001)
+    try:
+        await asyncio.sleep(0.01)
+        assert (await group(engine))["id"] == "a"
+    finally:
+        deadline.reset(token)
+    assert engine.grouping_classifier.calls == []
+    assert engine.similarity_calls == 1
+    assert engine.cascade_stats["deadline_skips"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_during_ai_check_falls_back_to_similarity():
+    ambiguous = ticket("a", [0.8, 0.6])
+    engine = make_engine(
+        [ambiguous], verdicts={"Ticket a": deadline.DeadlineExceeded("late")}, similar=None
+    )
+    assert (await group(engine))["id"] == "new"
+    assert engine.similarity_calls == 1
+    assert engine.cascade_stats["deadline_skips"] == 1
+
+
+@pytest.mark.asyncio
+async def test_thread_match_wins():
+    engine = make_engine([], verdicts={})
+    threaded = ticket("t", [0.0, 1.0], channel_id="C1", first_message_ts="99.000000", status="open")
+    engine.thread_map.put(threaded)
+    assert (await group(engine, thread_ts="99.000000"))["id"] == "t"
+
+
+@pytest.mark.asyncio
+async def test_historical_message_is_grouped_on_its_own_ts():
+    near = ticket("near", [1.0, 0.05])
+    ambiguous = ticket("ambiguous", [0.8, 0.6])
+    engine = make_engine([near], verdicts={"Ticket ambiguous": True}, similar=near)
+    lookups = []
+    
+    async def find_open_near_ts(channel_id, message_ts, hours, limit):
+        lookups.append((channel_id, message_ts, hours))
+        return candidates
+    
+    engine.ticket_repo.find_open_near_ts = find_open_near_ts
+    
+    candidates = [near]
+    assert (await engine.find_or_create_ticket(
+        message_text="export to csv fails", embedding=MESSAGE, category="bug",
+        channel_id="C1", thread_ts=None, message_ts="1700000000.000100", historical=True
+    ))["id"] == "near"
+    assert lookups == [("C1", "1700000000.000100", engine.RECENT_TICKETS_HOURS)]
+    
+    # Below the high band a historical message never reaches the AI or the clock-based search
+    candidates = [ambiguous]
+    created = await engine.find_or_create_ticket(
+        message_text="export to csv fails", embedding=MESSAGE, category="bug",
+        channel_id="C1", thread_ts=None, message_ts="1700000000.000100", historical=True
+    )
+    assert created["id"] == "new"
+    assert created["created_at"].startswith("2023-11-14T22:13:20")
+    assert engine.grouping_classifier.calls == []
+    assert engine.similarity_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_pairwise_earliest_match_wins_and_checks_run_concurrently():
+    candidates = [ticket(name, [0.8, 0.6]) for name in ("a", "b", "c")]
+    engine = make_engine(
+        candidates,
+        verdicts={"Ticket a": False, "Ticket b": True, "Ticket c": True},
+        delays={"Ticket a": 0.05, "Ticket b": 0.0, "Ticket c": 0.0}
+    )
+    started = asyncio.get_running_loop().time()
+    match = await engine._find_by_pairwise("message", candidates)
+    elapsed = asyncio.get_running_loop().time() - started
+    
+    # "b" answered first but only wins once the more recent "a" said no
+    assert match["id"] == "b"
+    assert sorted(engine.grouping_classifier.calls) == ["Ticket a", "Ticket b", "Ticket c"]
+    assert elapsed < 0.1
+
+
+@pytest.mark.asyncio
+async def test_pairwise_cancels_checks_that_can_no_longer_win():
+    candidates = [ticket(name, [0.8, 0.6]) for name in ("a", "b")]
+    engine = make_engine(
+        candidates,
+        verdicts={"Ticket a": True, "Ticket b": False},
+        delays={"Ticket a": 0.0, "Ticket b": 10.0}
+    )
+    match = await asyncio.wait_for(engine._find_by_pairwise("message", candidates), timeout=1)
+    assert match["id"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_listwise_returns_the_ranked_ticket_above_threshold():
+    candidates = [ticket(name, [0.8, 0.6]) for name in ("a", "b")]
+    engine = make_engine(candidates, verdicts={"listwise": "b"}, mode="listwise")
+    match = await engine._find_by_listwise("message", candidates)
+    assert match["id"] == "b"
+    assert engine.grouping_classifier.calls == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_listwise_no_pick_is_no_match():
+    candidates = [ticket("a", [0.8, 0.6])]
+    engine = make_engine(candidates, verdicts={"listwise": None}, mode="listwise")
+    assert await engine._find_by_listwise("message", candidates) is None
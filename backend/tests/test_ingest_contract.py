@@ -0,0 +1,151 @@
+"""
+Tests for MessageProcessor._ingest against the ingest_message result contract
+"""
+import pytest
+
+from backend.models import Classification
+from backend.processing.message_processor import MessageProcessor
+from backend.processing.thread_map import ThreadTicketMap
+
+
+class ScriptedTicketRepository:
+    """Answers ingest_message calls from a list of results, recording the arguments"""
+    
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+    
+    async def ingest_message(self, slack_message_id, channel_id, thread_key, embedding, message,
+                             ticket_id=None, new_ticket=None, candidate_hours=24, candidate_limit=10):
+        self.calls.append({"thread_key": thread_key, "ticket_id": ticket_id, "new_ticket": new_ticket})
+        return self.results.pop(0)
+
+
+class FakeGrouper:
+    RECENT_TICKETS_HOURS = 24
+    
+    def __init__(self, match=None):
+        self.match = match
+        self.thread_map = ThreadTicketMap(max_entries=100)
+        self.grouping_calls = 0
+        self.registered = []
+        self.synced = []
+    
+    async def find_or_create_ticket(self, **kwargs):
+        self.grouping_calls += 1
+        return self.match
+    
+    async def new_ticket_title(self, text, category, title=None):
+        return title or text
+    
+    def register_ticket(self, ticket, embedding):
+        self.registered.append(ticket["id"])
+    
+    def sync_ticket(self, ticket):
+        self.synced.append(ticket["id"])
+
+
+class FakeDedup:
+    def __init__(self):
+        self.processed = []
+    
+    def mark_processed(self, slack_message_id):
+        self.processed.append(slack_message_id)
+
+
+def make_processor(results, match=None):
+    processor = MessageProcessor.__new__(MessageProcessor)
+    processor.ticket_repo = ScriptedTicketRepository(results)
+    processor.grouper = FakeGrouper(match)
+    processor.dedup = FakeDedup()
+    
+    async def slack_names(user_id, channel_id, slack_client):
+        return "Ada", "support"
+    
+    processor._slack_names = slack_names
+    return processor
+
+
+def reply(ts="2.0", thread_ts="1.0"):
+    return {"text": "export is broken", "user": "U1", "channel": "C1", "ts": ts, "thread_ts": thread_ts}
+
+
+def stored(ticket_id, created=False):
+    return {"status": "stored", "created": created, "ticket": {"id": ticket_id, "message_count": 2}}
+
+
+CLASSIFICATION = Classification(is_relevant=True, category="bug", confidence=0.9,
+                                reasoning="test", title="Export broken")
+
+
+async def ingest(processor, event):
+    return await processor._ingest(event, f"C1:{event['ts']}", CLASSIFICATION, [0.0], None)
+
+
+@pytest.mark.asyncio
+async def test_known_thread_is_stored_in_one_round_trip():
+    processor = make_processor([stored("t1")])
+    
+    ticket = await ingest(processor, reply())
+    
+    assert ticket["id"] == "t1"
+    assert processor.ticket_repo.calls == [{"thread_key": "1.0", "ticket_id": None, "new_ticket": None}]
+    assert processor.grouper.grouping_calls == 0
+    assert processor.dedup.processed == ["C1:2.0"]
+
+
+@pytest.mark.asyncio
+async def test_candidates_are_grouped_locally_then_stored():
+    candidates = {"status": "candidates", "candidates": [{"id": "t2"}]}
+    processor = make_processor([candidates, stored("t2")], match={"id": "t2"})
+    
+    ticket = await ingest(processor, reply())
+    
+    assert ticket["id"] == "t2"
+    assert processor.ticket_repo.calls[1] == {"thread_key": "1.0", "ticket_id": "t2", "new_ticket": None}
+    assert processor.grouper.thread_map.lookup("C1", "1.0") == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_ticket_closed_meanwhile_is_regrouped_with_a_new_ticket_fallback():
+    processor = make_processor(
+        [{"status": "candidates", "candidates": []}, stored("new", created=True)],
+        match={"id": "t3"}
+    )
+    
+    ticket = await ingest(processor, reply(thread_ts=None, ts="5.0"))
+    
+    assert ticket["id"] == "new"
+    assert [call["ticket_id"] for call in processor.ticket_repo.calls] == ["t3", "t3"]
+    assert processor.ticket_repo.calls[1]["new_ticket"]["title"] == "Export broken"
+    assert processor.grouper.registered == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_reply_in_closed_thread_opens_a_ticket_on_its_own_ts():
+    closed = {"status": "closed", "ticket": {"id": "old", "status": "closed"}}
+    processor = make_processor([{"status": "candidates", "candidates": []}, closed, stored("new", created=True)])
+    
+    ticket = await ingest(processor, reply())
+    
+    assert ticket["id"] == "new"
+    assert [call["thread_key"] for call in processor.ticket_repo.calls] == ["1.0", "1.0", "2.0"]
+    assert processor.ticket_repo.calls[2]["new_ticket"] is not None
+
+
+@pytest.mark.asyncio
+async def test_closed_root_is_not_stored_and_retried():
+    closed = {"status": "closed", "ticket": {"id": "old", "status": "closed"}}
+    processor = make_processor([closed])
+    
+    with pytest.raises(RuntimeError):
+        await ingest(processor, reply(thread_ts=None, ts="1.0"))
+    assert processor.dedup.processed == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_returns_none():
+    processor = make_processor([{"status": "duplicate"}])
+    
+    assert await ingest(processor, reply()) is None
+    assert processor.dedup.processed == ["C1:2.0"]
@@ -0,0 +1,218 @@
+"""
+Tests for the ingestion queue (per-thread ordering, parallelism, backpressure, journal)
+"""
+import asyncio
+import random
+import sqlite3
+import time
+
+import pytest
+
+from backend.config import settings
+from backend.processing.event_journal import EventJournal
+from backend.processing.ingestion import IngestionQueue
+
+
+def message(ts: str, thread_ts: str = None, channel: str = "C1", text: str = "hello"):
+    event = {"type": "message", "channel": channel, "user": "U1", "text": text, "ts": ts}
+    if thread_ts:
+        event["thread_ts"] = thread_ts
+    return event
+
+
+class RecordingProcessor:
+    """Stands in for MessageProcessor: records the processing order"""
+    
+    def __init__(self, delay=lambda event: 0.0, results=None):
+        self.delay = delay
+        self.results = results or {}
+        self.order = []
+        self.active = 0
+        self.max_active = 0
+    
+    async def process_message(self, event, slack_client):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay(event))
+            self.order.append(event["ts"])
+            return self.results.get(event["ts"], True)
+        finally:
+            self.active -= 1
+    
+    async def process_burst(self, events, slack_client):
+        for event in events:
+            self.order.append(event["ts"])
+        return True
+
+
+@pytest.mark.asyncio
+async def test_replies_in_one_thread_are_processed_in_arrival_order():
+    rng = random.Random(1)
+    processor = RecordingProcessor(delay=lambda event: rng.uniform(0, 0.01))
+    queue = IngestionQueue(processor, workers=8, journal=None)
+    await queue.start()
+    
+    tss = [f"100.{i:06d}" for i in range(1, 30)]
+    await queue.submit(message("100.000000"), None)
+    for ts in tss:
+        await queue.submit(message(ts, thread_ts="100.000000"), None)
+    await queue.stop(drain=True)
+    
+    assert processor.order == ["100.000000"] + tss
+
+
+@pytest.mark.asyncio
+async def test_different_threads_run_in_parallel():
+    processor = RecordingProcessor(delay=lambda event: 0.05)
+    queue = IngestionQueue(processor, workers=4, journal=None)
+    await queue.start()
+    
+    for i in range(4):
+        await queue.submit(message(f"{200 + i}.000000"), None)
+    await queue.stop(drain=True)
+    
+    assert processor.max_active == 4
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_when_queue_is_full():
+    release = asyncio.Event()
+    
+    class BlockingProcessor(RecordingProcessor):
+        async def process_message(self, event, slack_client):
+            await release.wait()
+            return await super().process_message(event, slack_client)
+    
+    queue = IngestionQueue(BlockingProcessor(), max_size=2, workers=1, journal=None)
+    await queue.start()
+    await queue.submit(message("1.000000"), None)
+    await queue.submit(message("2.000000"), None)
+    
+    third = asyncio.create_task(queue.submit(message("3.000000"), None))
+    await asyncio.sleep(0.02)
+    assert not third.done()
+    assert queue.metrics["backpressure_waits"] == 1
+    
+    release.set()
+    await third
+    await queue.stop(drain=True)
+    assert queue.metrics["processed"] == 3
+
+
+class SlowJournal:
+    """EventJournal stand-in whose writes take `delay(key)` seconds (run in a thread)"""
+    
+    max_attempts = 3
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.recorded = []
+    
+    def record(self, key, event):
+        time.sleep(self.delay(key))
+        self.recorded.append(key)
+    
+    def complete(self, key):
+        pass
+    
+    def unfinished(self):
+        return []
+    
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_same_thread_submits_keep_arrival_order_behind_a_slow_journal():
+    # The first reply's journal write finishes last
+    journal = SlowJournal(delay=lambda key: 0.1 if key.endswith("100.000001") else 0.0)
+    processor = RecordingProcessor()
+    queue = IngestionQueue(processor, workers=4, journal=journal)
+    await queue.start()
+    
+    await asyncio.gather(
+        queue.submit(message("100.000001", thread_ts="100.000000"), None),
+        queue.submit(message("100.000002", thread_ts="100.000000"), None),
+        queue.submit(message("300.000000"), None),
+    )
+    await queue.stop(drain=True)
+    
+    assert journal.recorded[-1] == "C1:100.000001"
+    assert [ts for ts in processor.order if ts.startswith("100.")] == ["100.000001", "100.000002"]
+    assert queue._arrivals == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_event_is_retried_from_the_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_RETRY_POLL_SECONDS", 0.01)
+    journal = EventJournal(str(tmp_path / "journal.sqlite3"), max_attempts=3,
+                           retry_base_seconds=0.01, retry_max_seconds=0.01)
+    attempts = []
+    
+    class FlakyProcessor(RecordingProcessor):
+        async def process_message(self, event, slack_client):
+            attempts.append(event["ts"])
+            return len(attempts) > 1
+    
+    queue = IngestionQueue(FlakyProcessor(), workers=1, journal=journal)
+    await queue.start()
+    await queue.submit(message("1.000000"), None)
+    
+    async def until_done():
+        while len(attempts) < 2 or queue.depth:
+            await asyncio.sleep(0.01)
+    
+    await asyncio.wait_for(until_done(), 2)
+    assert queue.metrics["retried"] == 1
+    assert journal.unfinished() == [] and journal.claim_due(10) == []
+    await queue.stop(drain=True)
+
+
+@pytest.mark.asyncio
+async def test_unfinished_events_are_replayed_on_start(tmp_path):
+    path = str(tmp_path / "journal.sqlite3")
+    previous_run = EventJournal(path)
+    previous_run.record("C1:1.000000", message("1.000000"))
+    previous_run.close()
+    
+    processor = RecordingProcessor()
+    queue = IngestionQueue(processor, workers=1, journal=EventJournal(path))
+    await queue.start()
+    await queue.stop(drain=True)
+    
+    assert processor.order == ["1.000000"]
+    assert queue.metrics["replayed"] == 1
+    assert EventJournal(path).unfinished() == []
+
+
+@pytest.mark.asyncio
+async def test_accepted_event_is_not_journaled_again_on_submit():
+    journal = SlowJournal(delay=lambda key: 0.0)
+    processor = RecordingProcessor()
+    queue = IngestionQueue(processor, workers=1, journal=journal)
+    await queue.start()
+    
+    await queue.accept(message("1.000000"))
+    await queue.submit(message("1.000000"), None, journaled=True)
+    await queue.stop(drain=True)
+    
+    assert journal.recorded == ["C1:1.000000"]
+    assert processor.order == ["1.000000"]
+
+
+@pytest.mark.asyncio
+async def test_journal_error_on_failure_is_not_counted_as_dead_letter():
+    class BrokenJournal(SlowJournal):
+        def fail(self, key, event, error):
+            raise sqlite3.OperationalError("database is locked")
+    
+    processor = RecordingProcessor(results={"1.000000": False})
+    queue = IngestionQueue(processor, workers=1, journal=BrokenJournal(delay=lambda key: 0.0))
+    await queue.start()
+    await queue.submit(message("1.000000"), None)
+    await queue.stop(drain=True)
+    
+    assert queue.metrics["failed"] == 1
+    assert queue.metrics["journal_errors"] == 1
+    assert queue.metrics["dead_lettered"] == 0
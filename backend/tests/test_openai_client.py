@@ -0,0 +1,154 @@
+"""
+Tests for the shared OpenAI client's rate limiting, AIMD concurrency and retries
+"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from backend.ai import openai_client as openai_client_module
+from backend.ai.openai_client import (
+    AdaptiveConcurrency, SharedOpenAIClient, TokenBucket, estimate_tokens, parse_reset
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(openai_client_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_parse_reset_durations():
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("1.5s") == 1.5
+    assert parse_reset("") is None and parse_reset("soon") is None
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("embeddings", {"input": ["a" * 40, "b" * 40]}) == 20
+    chat = {"messages": [{"content": "x" * 400}], "max_tokens": 50}
+    assert estimate_tokens("chat", chat) == 150
+
+
+def test_bucket_queues_callers_in_order(clock):
+    bucket = TokenBucket(per_minute=60)  # One unit per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    
+    clock[0] += 2
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_oversized_request_drains_instead_of_waiting_forever(clock):
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(1000) == 0.0
+    assert bucket.level == 0.0
+
+
+def test_bucket_follows_rate_limit_headers(clock):
+    bucket = TokenBucket(per_minute=600)
+    bucket.sync(limit=120, remaining=10, reset_seconds=None)
+    assert bucket.capacity == 120 and bucket.level == 10
+    
+    bucket.sync(limit=None, remaining=0, reset_seconds=5)
+    assert bucket.reserve(0) == pytest.approx(5.0)
+
+
+def test_aimd_additive_increase_and_halving_with_cooldown(clock):
+    limiter = AdaptiveConcurrency(initial=4, minimum=2, maximum=6, cooldown_seconds=1.0)
+    for _ in range(4):
+        limiter.increase()
+    # About +1 per `limit` successes
+    assert 4.9 < limiter.limit < 5.0
+    
+    assert limiter.decrease() is True
+    assert limiter.decrease() is False  # Same burst of 429s
+    assert 2.45 < limiter.limit < 2.5
+    
+    clock[0] += 2
+    assert limiter.decrease() is True
+    assert limiter.limit == 2  # Floor
+    
+    for _ in range(100):
+        limiter.increase()
+    assert limiter.limit == 6  # Ceiling
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_blocks_until_release():
+    limiter = AdaptiveConcurrency(initial=1, minimum=1, maximum=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    
+    await limiter.release()
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.in_flight == 1
+
+
+def rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, request=request, headers={"retry-after": "0"})
+    return openai.RateLimitError("slow down", response=response, body=None)
+
+
+class FlakyCompletions:
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=10))
+
+
+def make_client(failures, max_retries=3):
+    completions = FlakyCompletions(failures)
+    client = SharedOpenAIClient(client=SimpleNamespace(
+        chat=SimpleNamespace(completions=completions), embeddings=completions
+    ))
+    client.max_retries = max_retries
+    client.retry_base_seconds = 0.0
+    return client, completions
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried_and_backs_off_concurrency():
+    client, completions = make_client([rate_limit_error()])
+    limiter = client.limiter("gpt-test")
+    before = limiter.concurrency.limit
+    
+    await client.chat.completions.create(model="gpt-test", messages=[{"content": "hi"}])
+    
+    assert completions.calls == 2
+    assert client.stats["retries"] == 1 and client.stats["rate_limited"] == 1
+    assert limiter.concurrency.limit < before
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_error_is_raised_once_retries_are_exhausted():
+    client, completions = make_client([rate_limit_error()] * 3, max_retries=2)
+    
+    with pytest.raises(openai.RateLimitError):
+        await client.chat.completions.create(model="gpt-test", messages=[{"content": "hi"}])
+    assert completions.calls == 3
+    assert client.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_not_retried():
+    client, completions = make_client([ValueError("bad request")])
+    
+    with pytest.raises(ValueError):
+        await client.embeddings.create(model="embed-test", input=["hi"])
+    assert completions.calls == 1
+    assert client.limiter("embed-test").concurrency.in_flight == 0
@@ -0,0 +1,42 @@
+"""
+Tests for the local chit-chat pre-filter
+"""
+import json
+
+import pytest
+
+from backend.ai.prefilter import SEED_CORPUS_PATH, ChitChatPrefilter, normalize
+from backend.benchmarks.prefilter_eval import FIXTURES
+
+
+@pytest.fixture(scope="module")
+def prefilter():
+    return ChitChatPrefilter()
+
+
+@pytest.mark.parametrize("text", ["thanks!", "ok", "👍", ":tada:", "<@U123> good morning"])
+def test_obvious_chit_chat_is_rejected(prefilter, text):
+    rejection = prefilter.check(text)
+    assert rejection is not None
+    assert rejection.is_relevant is False
+
+
+@pytest.mark.parametrize("text", [
+    "same here", "me too", "+1", "+1 same", "any luck?", "any update?",
+    "seeing this too", "anyone else?", "same issue",
+])
+def test_affected_user_replies_reach_the_classifier(prefilter, text):
+    assert prefilter.check(text) is None
+
+
+@pytest.mark.parametrize("text", ["login is broken again", "how do I export to csv?"])
+def test_issue_reports_reach_the_classifier(prefilter, text):
+    assert prefilter.check(text) is None
+
+
+def test_eval_fixtures_are_disjoint_from_seed_corpus():
+    with open(SEED_CORPUS_PATH, encoding="utf-8") as f:
+        seed = {normalize(example["text"]) for example in json.load(f)["examples"]}
+    with open(FIXTURES, encoding="utf-8") as f:
+        fixtures = [json.loads(line)["text"] for line in f if line.strip()]
+    assert [text for text in fixtures if normalize(text) in seed] == []
@@ -0,0 +1,118 @@
+"""
+Tests for MessageProcessor.process_burst against the benchmark fakes (no network)
+"""
+import asyncio
+
+import pytest
+
+from backend.ai.openai_client import openai_client
+from backend.benchmarks.pipeline import fakes
+from backend.config import settings
+from backend.database import history, messages, tickets
+from backend.processing.ingestion import IngestionQueue
+from backend.processing.message_processor import MessageProcessor
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    recorder = fakes.CallRecorder()
+    no_latency = fakes.LatencyModel(0)
+    db = fakes.FakeSupabase(recorder, no_latency)
+    for module in (tickets, messages, history):
+        monkeypatch.setattr(module, "async_supabase_client", db)
+    monkeypatch.setattr(openai_client, "client", fakes.FakeOpenAI(recorder, no_latency, no_latency))
+    processor = MessageProcessor()
+    processor.prefilter = None
+    return processor, db, recorder, fakes.FakeSlackClient(recorder, no_latency)
+
+
+def message(ts, text, thread_ts=None, user="U1"):
+    event = {"channel": "C1", "user": user, "text": text, "ts": ts}
+    if thread_ts:
+        event["thread_ts"] = thread_ts
+    return event
+
+
+def ticket_of(db, ts):
+    return next(row["ticket_id"] for row in db.tables["messages"].values() if row["message_ts"] == ts)
+
+
+@pytest.mark.asyncio
+async def test_burst_is_classified_once_and_stored_message_by_message(pipeline):
+    processor, db, recorder, slack = pipeline
+    burst = [
+        message("1.000001", "the csv export"),
+        message("1.000002", "is broken again for the billing dashboard", thread_ts="1.000001"),
+        message("1.000003", "every export fails with an error since yesterday", thread_ts="1.000001"),
+    ]
+    
+    assert await processor.process_burst(burst, slack)
+    
+    assert recorder.calls["openai.embeddings"] == 1
+    assert recorder.calls["openai.classify"] == 1
+    stored = list(db.tables["messages"].values())
+    assert [row["message_ts"] for row in stored] == ["1.000001", "1.000002", "1.000003"]
+    assert len({row["ticket_id"] for row in stored}) == 1
+    assert len(db.tables["tickets"]) == 1
+    
+    # The burst's ticket is keyed on its root, so later replies find it
+    found, ticket = processor.grouper.thread_map.lookup("C1", "1.000001")
+    assert found and ticket["id"] == stored[0]["ticket_id"]
+    reply = message("1.000004", "the export error shows up for other dashboards too", thread_ts="1.000001")
+    assert await processor.process_message(reply, slack)
+    assert ticket_of(db, "1.000004") == stored[0]["ticket_id"]
+
+
+@pytest.mark.asyncio
+async def test_already_stored_messages_are_dropped_from_the_burst(pipeline):
+    processor, db, recorder, slack = pipeline
+    first = message("2.000001", "the csv export is broken for the billing dashboard")
+    assert await processor.process_message(first, slack)
+    
+    burst = [
+        first,
+        message("2.000002", "every export fails with an error since yesterday", thread_ts="2.000001"),
+    ]
+    assert await processor.process_burst(burst, slack)
+    
+    # Only the new message was classified; the stored one never reached an insert
+    assert recorder.calls["openai.classify"] == 2
+    assert sorted(row["message_ts"] for row in db.tables["messages"].values()) == ["2.000001", "2.000002"]
+    assert db.constraint_violations == 0
+
+
+@pytest.mark.asyncio
+async def test_irrelevant_burst_stores_nothing(pipeline):
+    processor, db, recorder, slack = pipeline
+    
+    burst = [message("3.000001", "ok"), message("3.000002", "thanks", thread_ts="3.000001")]
+    assert await processor.process_burst(burst, slack)
+    
+    assert db.tables["messages"] == {}
+    assert db.tables["tickets"] == {}
+
+
+@pytest.mark.asyncio
+async def test_reply_to_the_second_of_several_top_level_messages(pipeline, monkeypatch):
+    processor, db, recorder, slack = pipeline
+    monkeypatch.setattr(settings, "COALESCE_WINDOW_SECONDS", 0.05)
+    queue = IngestionQueue(processor, workers=4, journal=None)
+    await queue.start(slack)
+    
+    # Two top-level messages in a row from one user, then a reply to the second
+    await queue.submit(message("4.000001", "the csv export is broken for the billing dashboard"), slack)
+    await queue.submit(message("4.000002", "sso login fails with a saml error for every user"), slack)
+    await queue.submit(message("4.000003", "same here, saml error", thread_ts="4.000002", user="U2"), slack)
+    await asyncio.wait_for(queue.stop(drain=True), 5)
+    
+    # Separate roots are never one burst, so each one starts its own ticket
+    assert queue.coalescer.stats["flushed_bursts"] == 0
+    assert len(db.tables["messages"]) == 3
+    second = ticket_of(db, "4.000002")
+    assert second != ticket_of(db, "4.000001")
+    assert db.tables["tickets"][second]["first_message_ts"] == "4.000002"
+    
+    # The reply waited for its root and joined the root's ticket
+    assert ticket_of(db, "4.000003") == second
+    found, ticket = processor.grouper.thread_map.lookup("C1", "4.000002")
+    assert found and ticket["id"] == second
@@ -0,0 +1,86 @@
+"""
+Tests for the Slack name cache
+"""
+import asyncio
+
+import pytest
+
+from backend.slack.utils import NameCache, SlackUtils
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_lookup():
+    cache = NameCache(ttl_seconds=60)
+    calls = 0
+    
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "Ada"
+    
+    names = await asyncio.gather(*(cache.resolve("U1", fetch) for _ in range(5)))
+    assert names == ["Ada"] * 5
+    assert calls == 1
+    assert cache.stats == {"hits": 0, "misses": 1, "shared": 4}
+    assert await cache.resolve("U1", fetch) == "Ada"
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_and_failed_lookups_are_not_served():
+    cache = NameCache(ttl_seconds=-1)
+    cache.set("U1", "Ada")
+    assert cache.get("U1") is None
+    
+    async def missing():
+        return None
+    
+    cache = NameCache(ttl_seconds=60)
+    assert await cache.resolve("U2", missing) is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_do_not_hang_when_the_owner_is_cancelled():
+    cache = NameCache(ttl_seconds=60)
+    started = asyncio.Event()
+    
+    async def slow_fetch():
+        started.set()
+        await asyncio.sleep(10)
+        return "Ada"
+    
+    owner = asyncio.create_task(cache.resolve("U1", slow_fetch))
+    await started.wait()
+    waiter = asyncio.create_task(cache.resolve("U1", slow_fetch))
+    await asyncio.sleep(0)
+    
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(waiter, timeout=1)
+    
+    # The next lookup starts afresh
+    async def fetch():
+        return "Ada"
+    assert await cache.resolve("U1", fetch) == "Ada"
+
+
+@pytest.mark.asyncio
+async def test_slack_utils_turns_a_cancelled_lookup_into_no_name():
+    utils = SlackUtils()
+    release = asyncio.Event()
+    
+    class SlowClient:
+        async def users_info(self, user):
+            await release.wait()
+            return {"user": {"profile": {"display_name": "Ada"}}}
+    
+    owner = asyncio.create_task(utils.get_user_name("U1", SlowClient()))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(utils.get_user_name("U1", SlowClient()))
+    await asyncio.sleep(0)
+    owner.cancel()
+    assert await asyncio.wait_for(waiter, timeout=1) is None
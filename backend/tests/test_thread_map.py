@@ -0,0 +1,65 @@
+"""
+Tests for the thread -> ticket map
+"""
+from backend.processing import thread_map as thread_map_module
+from backend.processing.thread_map import ThreadTicketMap
+
+
+def ticket(ticket_id, thread_ts, channel="C1", status="open"):
+    return {"id": ticket_id, "channel_id": channel, "first_message_ts": thread_ts, "status": status}
+
+
+def test_miss_then_hit():
+    threads = ThreadTicketMap(max_entries=10)
+    assert threads.lookup("C1", "1.0") == (False, None)
+    threads.put(ticket("t1", "1.0"))
+    assert threads.lookup("C1", "1.0") == (True, ticket("t1", "1.0"))
+    assert threads.stats["misses"] == 1 and threads.stats["hits"] == 1
+
+
+def test_closed_tickets_are_not_cached():
+    threads = ThreadTicketMap(max_entries=10)
+    threads.put(ticket("t1", "1.0", status="closed"))
+    assert threads.lookup("C1", "1.0") == (False, None)
+
+
+def test_negative_entry_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(thread_map_module.time, "monotonic", lambda: now[0])
+    threads = ThreadTicketMap(max_entries=10, negative_ttl_seconds=5)
+    threads.put_negative("C1", "1.0")
+    assert threads.lookup("C1", "1.0") == (True, None)
+    
+    now[0] += 6
+    assert threads.lookup("C1", "1.0") == (False, None)
+    assert len(threads) == 0
+
+
+def test_ticket_replaces_negative_entry_but_not_the_reverse():
+    threads = ThreadTicketMap(max_entries=10, negative_ttl_seconds=60)
+    threads.put_negative("C1", "1.0")
+    threads.put(ticket("t1", "1.0"))
+    threads.put_negative("C1", "1.0")
+    assert threads.lookup("C1", "1.0") == (True, ticket("t1", "1.0"))
+
+
+def test_invalidate_ticket_forgets_its_thread():
+    threads = ThreadTicketMap(max_entries=10)
+    threads.put(ticket("t1", "1.0"))
+    threads.invalidate_ticket("t1")
+    threads.invalidate_ticket("unknown")
+    assert threads.lookup("C1", "1.0") == (False, None)
+    assert threads.stats["invalidations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    threads = ThreadTicketMap(max_entries=2)
+    threads.put(ticket("t1", "1.0"))
+    threads.put(ticket("t2", "2.0"))
+    threads.lookup("C1", "1.0")
+    threads.put(ticket("t3", "3.0"))
+    
+    assert threads.lookup("C1", "2.0") == (False, None)
+    assert threads.lookup("C1", "1.0")[0] and threads.lookup("C1", "3.0")[0]
+    threads.invalidate_ticket("t2")
+    assert threads.stats["invalidations"] == 0
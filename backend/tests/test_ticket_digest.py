@@ -0,0 +1,48 @@
+"""
+Tests for incremental ticket digests
+"""
+from backend.processing import ticket_digest
+from backend.processing.ticket_digest import (
+    DIGEST_RECENT_MESSAGES, DIGEST_SUMMARY_CHARS, append_message, context_texts, first_message_text
+)
+
+
+def fold(texts, category="bug"):
+    digest = None
+    for i, text in enumerate(texts):
+        digest = append_message(digest, text, f"user{i}", category)
+    return digest
+
+
+def test_first_message_is_kept_and_recent_is_bounded():
+    digest = fold([f"Message {i}. More detail here." for i in range(10)])
+    assert first_message_text(digest) == "Message 0. More detail here."
+    assert [m["text"] for m in digest["recent"]] == [
+        f"Message {i}. More detail here." for i in range(10 - DIGEST_RECENT_MESSAGES, 10)
+    ]
+
+
+def test_messages_rolling_out_of_recent_are_summarized_by_first_sentence():
+    digest = fold(["root", "Second one. Extra.", "third", "fourth", "fifth"])
+    assert digest["summary"] == "user1: Second one."
+    assert context_texts(digest) == ["root", "user1: Second one.", "third", "fourth", "fifth"]
+
+
+def test_summary_stays_within_budget():
+    digest = fold(["x" * 500 for _ in range(50)])
+    assert len(digest["summary"]) <= DIGEST_SUMMARY_CHARS
+    assert all(len(line) <= ticket_digest.SUMMARY_LINE_CHARS + len("user00: ")
+               for line in digest["summary"].split("\n"))
+
+
+def test_append_does_not_mutate_its_input_and_tracks_categories():
+    digest = fold(["a", "b"], category="bug")
+    before = {**digest, "recent": list(digest["recent"])}
+    updated = append_message(digest, "c", "user9", "feature")
+    assert digest == before
+    assert updated["categories"] == ["bug", "feature"]
+
+
+def test_missing_digest_has_no_context():
+    assert context_texts(None) == []
+    assert first_message_text({"first_message": None}) is None
@@ -0,0 +1,102 @@
+"""
+Tests for the ticket write-behind buffer
+"""
+import asyncio
+
+import pytest
+
+from backend.processing.ticket_writes import TicketWriteBuffer
+
+
+class SlowTicketRepository:
+    """Records updates; each one waits for `release` (when given) before committing"""
+    
+    def __init__(self, release=None, fail=()):
+        self.release = release
+        self.fail = set(fail)
+        self.updates = []
+    
+    async def update(self, ticket_id, fields):
+        if self.release is not None:
+            await self.release.wait()
+        if ticket_id in self.fail:
+            raise RuntimeError("db down")
+        self.updates.append((ticket_id, dict(fields)))
+        return {"id": ticket_id, **fields}
+
+
+@pytest.mark.asyncio
+async def test_write_through_when_disabled():
+    repo = SlowTicketRepository()
+    buffer = TicketWriteBuffer(window_seconds=0, ticket_repo=repo)
+    
+    await buffer.write("t1", {"title": "a"})
+    
+    assert repo.updates == [("t1", {"title": "a"})]
+    assert buffer.pending("t1") == {}
+
+
+@pytest.mark.asyncio
+async def test_updates_are_merged_and_written_after_the_window():
+    repo = SlowTicketRepository()
+    buffer = TicketWriteBuffer(window_seconds=0.05, ticket_repo=repo)
+    
+    await buffer.write("t1", {"digest": 1, "title": "a"})
+    await buffer.write("t1", {"digest": 2})
+    assert repo.updates == []
+    assert buffer.pending("t1") == {"digest": 2, "title": "a"}
+    
+    await asyncio.sleep(0.1)
+    assert repo.updates == [("t1", {"digest": 2, "title": "a"})]
+    assert buffer.stats["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_pending_flushes_early():
+    repo = SlowTicketRepository()
+    buffer = TicketWriteBuffer(window_seconds=60, max_pending=2, ticket_repo=repo)
+    
+    await buffer.write("t1", {"digest": 1})
+    await buffer.write("t2", {"digest": 1})
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    
+    assert sorted(ticket_id for ticket_id, _ in repo.updates) == ["t1", "t2"]
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_stays_visible_until_its_write_commits():
+    release = asyncio.Event()
+    repo = SlowTicketRepository(release)
+    buffer = TicketWriteBuffer(window_seconds=60, ticket_repo=repo)
+    await buffer.write("t1", {"digest": 1, "title": "a"})
+    
+    flush = asyncio.create_task(buffer.flush())
+    await asyncio.sleep(0)
+    assert buffer.pending("t1") == {"digest": 1, "title": "a"}
+    
+    # An update made while the batch is written builds on it and wins over it
+    await buffer.write("t1", {"digest": 2})
+    assert buffer.pending("t1") == {"digest": 2, "title": "a"}
+    
+    release.set()
+    await flush
+    assert repo.updates == [("t1", {"digest": 1, "title": "a"})]
+    assert buffer.pending("t1") == {"digest": 2}
+    await buffer.stop()
+    assert repo.updates[-1] == ("t1", {"digest": 2})
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_counted_and_cleared():
+    repo = SlowTicketRepository(fail={"t1"})
+    buffer = TicketWriteBuffer(window_seconds=60, ticket_repo=repo)
+    await buffer.write("t1", {"digest": 1})
+    await buffer.write("t2", {"digest": 1})
+    
+    await buffer.stop()
+    
+    assert buffer.stats["failed"] == 1
+    assert repo.updates == [("t2", {"digest": 1})]
+    assert buffer.pending("t1") == {}
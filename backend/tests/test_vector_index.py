@@ -0,0 +1,95 @@
+"""
+Tests for the local ticket vector index
+"""
+import time
+
+import numpy as np
+import pytest
+
+from backend.processing.vector_index import EMBEDDING_DIM, TicketVectorIndex, _to_iso
+
+
+def vector(*values):
+    padded = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    padded[:len(values)] = values
+    return padded.tolist()
+
+
+def open_ticket(ticket_id, embedding, channel="C1", age_seconds=0, **fields):
+    stamp = _to_iso(time.time() - age_seconds)
+    return {"id": ticket_id, "channel_id": channel, "status": "open", "embedding": embedding,
+            "created_at": stamp, "updated_at": stamp, **fields}
+
+
+class FakeTicketRepository:
+    def __init__(self, open_tickets, updates=()):
+        self.open_tickets = open_tickets
+        self.updates = list(updates)
+    
+    async def find_open_since(self, since):
+        return list(self.open_tickets)
+    
+    async def find_updated_since(self, since):
+        return list(self.updates)
+
+
+async def loaded_index(tickets, updates=()):
+    index = TicketVectorIndex()
+    index.ticket_repo = FakeTicketRepository(tickets, updates)
+    await index.load()
+    return index
+
+
+@pytest.mark.asyncio
+async def test_search_matches_rpc_semantics():
+    index = await loaded_index([
+        open_ticket("near", vector(1, 0.1)),
+        open_ticket("far", vector(0, 1)),
+        open_ticket("old", vector(1, 0), age_seconds=7200),
+        open_ticket("other", vector(1, 0), channel="C2"),
+    ])
+    results = index.search(vector(1, 0), "C1", time_window_minutes=60, similarity_threshold=0.75)
+    assert [row["ticket_id"] for row in results] == ["near"]
+    assert results[0]["similarity"] == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_recent_orders_by_last_update():
+    index = await loaded_index([
+        open_ticket("a", vector(1), updated_at=_to_iso(time.time() - 60)),
+        open_ticket("b", vector(0, 1)),
+    ])
+    assert [ticket["id"] for ticket in index.recent("C1", hours=24, limit=10)] == ["b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_remove_keeps_rows_contiguous():
+    index = await loaded_index([open_ticket(str(i), vector(1, i)) for i in range(20)])
+    assert index.remove("3")
+    channel = index.channels["C1"]
+    assert channel.size == 19
+    assert all(channel.ids[channel.rows[ticket_id]] == ticket_id for ticket_id in channel.ids)
+    assert index.get("3") is None
+
+
+@pytest.mark.asyncio
+async def test_reconcile_drops_closed_tickets_and_notifies():
+    closed = []
+    index = await loaded_index(
+        [open_ticket("a", vector(1)), open_ticket("b", vector(0, 1))],
+        updates=[{"id": "a", "status": "closed", "channel_id": "C1"},
+                 open_ticket("c", vector(1, 1))]
+    )
+    index.on_status_change = closed.append
+    await index.reconcile()
+    assert closed == ["a"]
+    assert index.get("a") is None
+    assert index.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_update_keeps_vector_and_merges_fields():
+    index = await loaded_index([open_ticket("a", vector(1))])
+    index.update("a", {"title": "New title"})
+    assert index.get("a")["title"] == "New title"
+    assert index.search(vector(1), "C1", 60, 0.5)[0]["ticket_id"] == "a"
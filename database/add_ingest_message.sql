@@ -0,0 +1,238 @@
+-- ============================================
+-- INGEST_MESSAGE: ONE-ROUND-TRIP MESSAGE INGESTION
+-- ============================================
+-- Does the database side of processing one Slack message in a single call:
+-- de-duplication, thread -> ticket resolution, race-free ticket creation,
+-- message insert and ticket digest/channel update.
+-- Requires add_message_category.sql and add_ticket_digest.sql.
+-- Run this in Supabase SQL Editor
+
+-- Fold one message into a ticket digest
+-- (mirrors backend/processing/ticket_digest.py: first message, last 3
+-- messages, one summary line per older message within 600 chars, categories)
+CREATE OR REPLACE FUNCTION append_ticket_digest(digest JSONB, entry JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+  d JSONB := COALESCE(digest, '{}'::jsonb);
+  recent JSONB;
+  dropped JSONB;
+  line TEXT;
+  lines TEXT[];
+  category TEXT := entry->>'category';
+BEGIN
+  d := jsonb_build_object(
+    'first_message', d->'first_message',
+    'recent', COALESCE(d->'recent', '[]'::jsonb),
+    'summary', COALESCE(d->>'summary', ''),
+    'categories', COALESCE(d->'categories', '[]'::jsonb)
+  );
+
+  IF d->'first_message' IS NULL OR jsonb_typeof(d->'first_message') = 'null' THEN
+    d := jsonb_set(d, '{first_message}', entry);
+  ELSE
+    recent := (d->'recent') || jsonb_build_array(entry);
+    lines := array_remove(string_to_array(d->>'summary', E'\n'), '');
+    WHILE jsonb_array_length(recent) > 3 LOOP
+      dropped := recent->0;
+      recent := recent - 0;
+      -- First sentence, whitespace collapsed, capped at 160 chars
+      line := trim(dropped->>'text');
+      line := COALESCE(substring(line FROM '^(.*?[.!?])\s'), line);
+      line := regexp_replace(line, '\s+', ' ', 'g');
+      IF length(line) > 160 THEN
+        line := left(line, 157) || '...';
+      END IF;
+      lines := lines || ((dropped->>'user_name') || ': ' || line);
+      WHILE array_length(lines, 1) > 1 AND length(array_to_string(lines, E'\n')) > 600 LOOP
+        lines := lines[2:];
+      END LOOP;
+    END LOOP;
+    d := jsonb_set(d, '{recent}', recent);
+    d := jsonb_set(d, '{summary}', to_jsonb(COALESCE(array_to_string(lines, E'\n'), '')));
+  END IF;
+
+  IF category IS NOT NULL AND NOT (d->'categories') ? category THEN
+    d := jsonb_set(d, '{categories}', (d->'categories') || to_jsonb(category));
+  END IF;
+  RETURN d;
+END;
+$$;
+
+-- Parameters:
+--   p_slack_message_id  De-duplication key "{channel_id}:{ts}"
+--   p_channel_id        Slack channel ID
+--   p_thread_key        Thread root ts (thread_ts, or the message ts for a root)
+--   p_embedding         Message embedding (stored on a new ticket, used to score candidates)
+--   p_message           Message fields: text, user_id, user_name, thread_ts, message_ts,
+--                       category, and optionally channel_name for the ticket
+--   p_ticket_id         Ticket chosen by the caller (skips resolution)
+--   p_new_ticket        title/category for a new ticket; when given and neither
+--                       p_ticket_id nor the thread resolves, a ticket is created
+--   p_candidate_hours   Lookback for candidate tickets
+--   p_candidate_limit   Maximum candidates returned
+--
+-- Returns one of:
+--   {"status": "duplicate"}
+--   {"status": "stored", "created": bool, "ticket": {...}, "message": {...}}
+--   {"status": "candidates", "candidates": [{...ticket, "first_message", "similarity"}]}
+--     (nothing written: no ticket resolved and p_new_ticket was not given -
+--      the caller runs AI grouping and calls again with p_ticket_id or p_new_ticket)
+--   {"status": "closed", "ticket": {...}}
+--     (nothing written: p_new_ticket was given but the thread already has a
+--      ticket that is no longer open - the caller picks another thread key)
+CREATE OR REPLACE FUNCTION ingest_message(
+  p_slack_message_id TEXT,
+  p_channel_id TEXT,
+  p_thread_key TEXT,
+  p_embedding vector(1536),
+  p_message JSONB,
+  p_ticket_id UUID DEFAULT NULL,
+  p_new_ticket JSONB DEFAULT NULL,
+  p_candidate_hours INT DEFAULT 24,
+  p_candidate_limit INT DEFAULT 10
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_ticket tickets%ROWTYPE;
+  v_message messages%ROWTYPE;
+  v_created BOOLEAN := FALSE;
+BEGIN
+  -- 1. De-duplication
+  IF EXISTS (SELECT 1 FROM messages WHERE slack_message_id = p_slack_message_id) THEN
+    RETURN jsonb_build_object('status', 'duplicate');
+  END IF;
+
+  -- 2. Ticket chosen by the caller (must still be open)
+  IF p_ticket_id IS NOT NULL THEN
+    SELECT * INTO v_ticket FROM tickets
+    WHERE id = p_ticket_id AND status = 'open'
+    FOR UPDATE;
+  END IF;
+
+  -- 3. Thread ticket
+  IF v_ticket.id IS NULL THEN
+    SELECT * INTO v_ticket FROM tickets
+    WHERE channel_id = p_channel_id
+      AND first_message_ts = p_thread_key
+      AND status = 'open'
+    FOR UPDATE;
+  END IF;
+
+  -- 4. Nothing resolved and no new ticket requested: hand candidates back
+  IF v_ticket.id IS NULL AND p_new_ticket IS NULL THEN
+    RETURN jsonb_build_object(
+      'status', 'candidates',
+      'candidates', COALESCE((
+        SELECT jsonb_agg(c ORDER BY c.updated_at DESC)
+        FROM (
+          SELECT
+            t.id, t.title, t.category, t.status, t.channel_id, t.channel_name,
+            t.first_message_ts, t.message_count, t.last_user_id, t.last_user_name,
+            t.created_at, t.updated_at, t.digest,
+            COALESCE(
+              t.digest->'first_message'->>'text',
+              (SELECT m.text FROM messages m WHERE m.ticket_id = t.id ORDER BY m.created_at LIMIT 1)
+            ) AS first_message,
+            1 - (t.embedding <=> p_embedding) AS similarity
+          FROM tickets t
+          WHERE t.channel_id = p_channel_id
+            AND t.status = 'open'
+            AND t.created_at >= NOW() - (p_candidate_hours || ' hours')::interval
+          ORDER BY t.updated_at DESC
+          LIMIT p_candidate_limit
+        ) c
+      ), '[]'::jsonb)
+    );
+  END IF;
+
+  -- 5. Create the ticket; the unique (channel_id, first_message_ts) constraint
+  --    makes concurrent creators for the same thread converge on one row
+  IF v_ticket.id IS NULL THEN
+    INSERT INTO tickets (title, category, status, channel_id, channel_name, first_message_ts, embedding)
+    VALUES (
+      p_new_ticket->>'title',
+      p_new_ticket->>'category',
+      'open',
+      p_channel_id,
+      p_message->>'channel_name',
+      p_thread_key,
+      p_embedding
+    )
+    ON CONFLICT (channel_id, first_message_ts) DO NOTHING
+    RETURNING * INTO v_ticket;
+
+    IF v_ticket.id IS NULL THEN
+      -- Lost the race to a concurrent creator: join its ticket
+      SELECT * INTO v_ticket FROM tickets
+      WHERE channel_id = p_channel_id
+        AND first_message_ts = p_thread_key
+        AND status = 'open'
+      FOR UPDATE;
+
+      -- The thread's ticket is no longer open and the unique constraint
+      -- rules out a second one: write nothing, let the caller decide
+      IF v_ticket.id IS NULL THEN
+        RETURN jsonb_build_object(
+          'status', 'closed',
+          'ticket', (
+            SELECT to_jsonb(t) - 'embedding' FROM tickets t
+            WHERE t.channel_id = p_channel_id AND t.first_message_ts = p_thread_key
+          )
+        );
+      END IF;
+    ELSE
+      v_created := TRUE;
+    END IF;
+  END IF;
+
+  -- 6. Message insert (a concurrent duplicate delivery loses here)
+  INSERT INTO messages (ticket_id, slack_message_id, text, user_id, user_name, channel_id, thread_ts, message_ts, category)
+  VALUES (
+    v_ticket.id,
+    p_slack_message_id,
+    p_message->>'text',
+    p_message->>'user_id',
+    p_message->>'user_name',
+    p_channel_id,
+    p_message->>'thread_ts',
+    p_message->>'message_ts',
+    p_message->>'category'
+  )
+  ON CONFLICT (slack_message_id) DO NOTHING
+  RETURNING * INTO v_message;
+
+  IF v_message.id IS NULL THEN
+    IF v_created THEN
+      DELETE FROM tickets WHERE id = v_ticket.id;
+    END IF;
+    RETURN jsonb_build_object('status', 'duplicate');
+  END IF;
+
+  -- 7. Digest + channel name (message_count/last_user come from the insert trigger)
+  UPDATE tickets
+  SET
+    digest = append_ticket_digest(
+      digest,
+      jsonb_build_object(
+        'text', LEFT(v_message.text, 1000),
+        'user_name', v_message.user_name,
+        'category', v_message.category,
+        'created_at', v_message.created_at
+      )
+    ),
+    channel_name = COALESCE(p_message->>'channel_name', channel_name)
+  WHERE id = v_ticket.id
+  RETURNING * INTO v_ticket;
+
+  RETURN jsonb_build_object(
+    'status', 'stored',
+    'created', v_created,
+    'ticket', to_jsonb(v_ticket) - 'embedding',
+    'message', to_jsonb(v_message)
+  );
+END;
+$$;
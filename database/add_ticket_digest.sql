@@ -0,0 +1,47 @@
+-- ============================================
+-- ADD ROLLING DIGEST TO TICKETS TABLE
+-- ============================================
+-- Compact per-ticket digest (first message, last few messages, rolling
+-- summary, message categories) maintained by the backend as messages
+-- arrive. Read by title generation, AI grouping and dashboard previews
+-- instead of the full message history.
+-- Run this in Supabase SQL Editor
+
+ALTER TABLE tickets
+ADD COLUMN IF NOT EXISTS digest JSONB;
+
+-- Backfill existing tickets: first message + last 3 messages + categories
+-- (summary starts empty and fills as new messages roll over)
+WITH ordered AS (
+  SELECT
+    m.ticket_id,
+    jsonb_build_object(
+      'text', LEFT(m.text, 1000),
+      'user_name', m.user_name,
+      'category', m.category,
+      'created_at', m.created_at
+    ) AS entry,
+    m.category,
+    ROW_NUMBER() OVER (PARTITION BY m.ticket_id ORDER BY m.created_at ASC) AS position,
+    ROW_NUMBER() OVER (PARTITION BY m.ticket_id ORDER BY m.created_at DESC) AS from_end
+  FROM messages m
+)
+UPDATE tickets t
+SET digest = d.digest
+FROM (
+  SELECT
+    ticket_id,
+    jsonb_build_object(
+      'first_message', MAX(entry::text) FILTER (WHERE position = 1)::jsonb,
+      'recent', COALESCE(
+        jsonb_agg(entry ORDER BY position) FILTER (WHERE position > 1 AND from_end <= 3),
+        '[]'::jsonb
+      ),
+      'summary', '',
+      'categories', to_jsonb(ARRAY_AGG(DISTINCT category) FILTER (WHERE category IS NOT NULL))
+    ) AS digest
+  FROM ordered
+  GROUP BY ticket_id
+) d
+WHERE t.id = d.ticket_id
+  AND t.digest IS NULL;
@@ -13,7 +13,7 @@ import { Archive, X, Trash2 } from 'lucide-react'
 import { useState } from 'react'
 
 export default function Dashboard() {
-  const { tickets, loading, error, archiveAllTickets, archiveTicket, archivedCount, clearArchived, deleteAllTickets, deleteTicket, updateTicketStatus, hasNewUpdate } = useRealtimeTickets()
+  const { tickets, loading, error, archiveAllTickets, archiveTicket, archivedCount, clearArchived, deleteAllTickets, deleteTicket, updateTicketStatus, loadTicketMessages, hasNewUpdate } = useRealtimeTickets()
   const [showArchiveConfirm, setShowArchiveConfirm] = useState(false)
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false)
   const [isDeleting, setIsDeleting] = useState(false)
@@ -46,6 +46,9 @@ export default function Dashboard() {
   // Get unique categories present in all tickets (from messages)
   const getTicketCategories = (ticket: typeof tickets[0]) => {
     if (!ticket.messages || ticket.messages.length === 0) {
+      if (ticket.digest?.categories?.length) {
+        return ticket.digest.categories // Categories tracked by the digest
+      }
       return [ticket.category] // Fallback to ticket category if no messages
     }
     const categories = new Set(ticket.messages.map((m: any) => m.category))
@@ -209,6 +212,7 @@ export default function Dashboard() {
               onArchive={archiveTicket}
               onDelete={deleteTicket}
               onStatusChange={updateTicketStatus}
+              onLoadMessages={loadTicketMessages}
             />
           </div>
         )}
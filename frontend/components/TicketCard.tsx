@@ -3,11 +3,12 @@
  * 
  * Displays:
  * - Ticket title and status
- * - All messages in the ticket (each with its own category tag)
+ * - Ticket digest preview (first message, rolling summary, latest messages),
+ *   or all messages once loaded (each with its own category tag)
  * - Channel name and timestamps
  * - User names
  */
-import { Ticket } from '@/lib/types'
+import { DigestMessage, Message, Ticket } from '@/lib/types'
 import MessageBubble from './MessageBubble'
 import StatusBadge from './StatusBadge'
 import StatusSelector from './StatusSelector'
@@ -21,16 +22,40 @@ interface TicketCardProps {
   onArchive?: (ticketId: string) => void
   onDelete?: (ticketId: string) => void
   onStatusChange?: (ticketId: string, newStatus: Ticket['status']) => Promise<void>
+  onLoadMessages?: (ticketId: string) => Promise<void>
 }
 
-export default function TicketCard({ ticket, onArchive, onDelete, onStatusChange }: TicketCardProps) {
+export default function TicketCard({ ticket, onArchive, onDelete, onStatusChange, onLoadMessages }: TicketCardProps) {
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false)
   const [isDeleting, setIsDeleting] = useState(false)
   const [showHistory, setShowHistory] = useState(false)
+  const [isLoadingMessages, setIsLoadingMessages] = useState(false)
   
-  const sortedMessages = (ticket.messages || []).sort(
+  // The full history lives on the ticket (loaded on demand, kept current by realtime)
+  const fullMessages = ticket.messages
+  const sortedMessages = [...(fullMessages || [])].sort(
     (a, b) => new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
   )
+  
+  // Without the full history, preview the digest: first message + latest ones
+  const digest = ticket.digest
+  const previewMessages: DigestMessage[] = digest?.first_message
+    ? [digest.first_message, ...digest.recent]
+    : []
+  const hiddenCount = Math.max(0, ticket.message_count - previewMessages.length)
+  
+  const loadAllMessages = async () => {
+    if (!onLoadMessages) return
+    
+    setIsLoadingMessages(true)
+    try {
+      await onLoadMessages(ticket.id)
+    } catch (err) {
+      console.error('Error loading messages:', err)
+    } finally {
+      setIsLoadingMessages(false)
+    }
+  }
 
   const handleDelete = async () => {
     if (!onDelete) return
@@ -147,10 +172,30 @@ export default function TicketCard({ ticket, onArchive, onDelete, onStatusChange
 
       {/* Messages */}
       <div className="px-6 py-5 space-y-3 max-h-96 overflow-y-auto bg-transparent">
-        {sortedMessages.length > 0 ? (
+        {fullMessages && sortedMessages.length > 0 ? (
           sortedMessages.map((message) => (
             <MessageBubble key={message.id} message={message} />
           ))
+        ) : !fullMessages && previewMessages.length > 0 ? (
+          <>
+            <MessageBubble message={previewMessage(ticket, previewMessages[0], 0)} />
+            {(digest?.summary || hiddenCount > 0) && (
+              <div className="px-4 py-3 neumorphic-inset rounded-2xl text-xs leading-relaxed whitespace-pre-wrap" style={{ color: 'var(--text-600)' }}>
+                {digest?.summary}
+                <button
+                  onClick={loadAllMessages}
+                  disabled={isLoadingMessages}
+                  className="block mt-2 font-semibold disabled:opacity-50"
+                  style={{ color: 'var(--primary-500)' }}
+                >
+                  {isLoadingMessages ? 'Loading...' : `Show all ${ticket.message_count} messages`}
+                </button>
+              </div>
+            )}
+            {previewMessages.slice(1).map((message, i) => (
+              <MessageBubble key={i + 1} message={previewMessage(ticket, message, i + 1)} />
+            ))}
+          </>
         ) : (
           <div className="text-sm text-gray-500 italic py-4">
             No messages yet
@@ -167,3 +212,19 @@ export default function TicketCard({ ticket, onArchive, onDelete, onStatusChange
   )
 }
 
+// Digest entries rendered with the regular message bubble
+function previewMessage(ticket: Ticket, message: DigestMessage, index: number): Message {
+  return {
+    id: `${ticket.id}-preview-${index}`,
+    ticket_id: ticket.id,
+    slack_message_id: '',
+    text: message.text,
+    user_id: '',
+    user_name: message.user_name,
+    channel_id: ticket.channel_id,
+    thread_ts: null,
+    message_ts: '',
+    category: message.category,
+    created_at: message.created_at,
+  }
+}
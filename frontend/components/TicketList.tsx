@@ -11,9 +11,10 @@ interface TicketListProps {
   onArchive?: (ticketId: string) => void
   onDelete?: (ticketId: string) => void
   onStatusChange?: (ticketId: string, newStatus: Ticket['status']) => Promise<void>
+  onLoadMessages?: (ticketId: string) => Promise<void>
 }
 
-export default function TicketList({ title, tickets, color, onArchive, onDelete, onStatusChange }: TicketListProps) {
+export default function TicketList({ title, tickets, color, onArchive, onDelete, onStatusChange, onLoadMessages }: TicketListProps) {
   if (tickets.length === 0) return null
 
   return (
@@ -26,6 +27,7 @@ export default function TicketList({ title, tickets, color, onArchive, onDelete,
             onArchive={onArchive} 
             onDelete={onDelete}
             onStatusChange={onStatusChange}
+            onLoadMessages={onLoadMessages}
           />
         ))}
       </div>
@@ -6,7 +6,7 @@
  * - Updated tickets (UPDATE on tickets table)
  * - New messages (INSERT on messages table)
  */
-import { useEffect, useState, useCallback } from 'react'
+import { useEffect, useState, useCallback, useRef } from 'react'
 import { supabase } from '@/lib/supabase'
 import type { Ticket, Message } from '@/lib/types'
 
@@ -16,6 +16,9 @@ export function useRealtimeTickets() {
   const [error, setError] = useState<string | null>(null)
   const [archivedTicketIds, setArchivedTicketIds] = useState<Set<string>>(new Set())
   const [hasNewUpdate, setHasNewUpdate] = useState(false)
+  // Latest tickets for realtime callbacks (registered once, so state would be stale)
+  const allTicketsRef = useRef<Ticket[]>([])
+  allTicketsRef.current = allTickets
 
   const fetchTickets = useCallback(async () => {
     try {
@@ -51,9 +54,13 @@ export function useRealtimeTickets() {
         return
       }
 
-      // Fetch messages separately for each ticket (more reliable)
+      // Tickets with a digest render their preview from it; only older tickets
+      // without one need their full message history up front
       const ticketsWithMessages = await Promise.all(
         data.map(async (ticket: any) => {
+          if (ticket.digest) {
+            return ticket
+          }
           const { data: messages } = await supabase
             .from('messages')
             .select('*')
@@ -129,18 +136,28 @@ export function useRealtimeTickets() {
           console.log('✅ Ticket updated!', payload.new)
           const updatedTicket = payload.new as any
           
-          // Fetch messages for the updated ticket
-          const { data: messages } = await supabase
-            .from('messages')
-            .select('*')
-            .eq('ticket_id', updatedTicket.id)
-            .order('created_at', { ascending: true })
+          // Loaded messages are kept current by the messages subscription, and
+          // the digest arrives with the update itself - only refetch for a
+          // ticket we have neither for
+          let messages: Message[] | undefined
+          const needsMessages = !updatedTicket.digest && !allTicketsRef.current.some(
+            t => t.id === updatedTicket.id && t.messages
+          )
+          if (needsMessages) {
+            const { data } = await supabase
+              .from('messages')
+              .select('*')
+              .eq('ticket_id', updatedTicket.id)
+              .order('created_at', { ascending: true })
+            messages = data || []
+          }
           
           // Update ticket in state immediately (no loading)
           // Move updated ticket to the top since it's the most recent
           setAllTickets(prev => {
+            const existing = prev.find(t => t.id === updatedTicket.id)
             const otherTickets = prev.filter(t => t.id !== updatedTicket.id)
-            return [{ ...updatedTicket, messages: messages || [] }, ...otherTickets]
+            return [{ ...updatedTicket, messages: messages ?? existing?.messages }, ...otherTickets]
           })
           
           // Show notification indicator
@@ -200,10 +217,10 @@ export function useRealtimeTickets() {
                   return true // Keep in place if duplicate
                 }
                 
-                // Add new message and update message count
+                // Add new message (if the full history is loaded) and update message count
                 updatedTicket = {
                   ...ticket,
-                  messages: [...(ticket.messages || []), newMessage].sort((a, b) => 
+                  messages: ticket.messages && [...ticket.messages, newMessage].sort((a, b) => 
                     new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
                   ),
                   message_count: (ticket.message_count || 0) + 1,
@@ -328,6 +345,24 @@ export function useRealtimeTickets() {
     }
   }
 
+  const loadTicketMessages = async (ticketId: string) => {
+    const { data, error } = await supabase
+      .from('messages')
+      .select('*')
+      .eq('ticket_id', ticketId)
+      .order('created_at', { ascending: true })
+    
+    if (error) throw error
+    
+    // Stored on the ticket so the messages subscription appends new ones
+    setAllTickets(prev => prev.map(t => {
+      if (t.id !== ticketId) return t
+      const loaded = data || []
+      const arrived = (t.messages || []).filter(m => !loaded.some(l => l.id === m.id))
+      return { ...t, messages: [...loaded, ...arrived] }
+    }))
+  }
+
   // Filter out archived tickets from display
   const visibleTickets = allTickets.filter(ticket => !archivedTicketIds.has(ticket.id))
 
@@ -363,6 +398,7 @@ export function useRealtimeTickets() {
     deleteTicket,
     deleteAllTickets,
     updateTicketStatus,
+    loadTicketMessages,
     hasNewUpdate
   }
 }
@@ -16,6 +16,21 @@ export interface Message {
   created_at: string
 }
 
+export interface DigestMessage {
+  text: string
+  user_name: string
+  category: 'support' | 'bug' | 'feature' | 'question'
+  created_at: string
+}
+
+// Rolling per-ticket digest maintained by the backend (tickets.digest)
+export interface TicketDigest {
+  first_message: DigestMessage | null
+  recent: DigestMessage[]
+  summary: string
+  categories: Array<'support' | 'bug' | 'feature' | 'question'>
+}
+
 export interface Ticket {
   id: string
   title: string
@@ -29,7 +44,8 @@ export interface Ticket {
   last_user_name: string | null
   created_at: string
   updated_at: string
-  messages?: Message[]
+  digest?: TicketDigest | null
+  messages?: Message[]  // Full history; only loaded for tickets without a digest or on demand
 }
 
 export interface TicketHistory {